@@ -4,20 +4,53 @@ Performance benchmarking script for the Makaton Gesture Recognition Tool.
 This script measures:
 - End-to-end frame processing time (OpenCV + MediaPipe)
 - Approximate frames per second (FPS) over N frames
+- Throughput and capture-to-result latency of the multi-process
+  shared-memory pipeline, compared with the single-process path
+- Capture-to-result frame age, and how many frames came stale from the
+  driver queue (compare with and without --grab-latest)
+- Motion-gate skip ratio and CPU time saved on a recorded clip
+- With --profile N, a hot-function and allocation report in logs/ for the
+  single-process run (worker processes are not profiled)
+- With --classify N, recognize_gesture() throughput and accuracy on N
+  synthetic hands (no camera needed)
+- With --compare-backends, latency and throughput of each hand-landmark
+  backend on the same source (see hand_backends.py)
 
 Usage:
     python benchmark.py
+    python benchmark.py --mode both --workers 2
+    python benchmark.py --source recording.mp4 --frames 500
+    python benchmark.py --grab-latest --simulate-load-ms 40
+    python benchmark.py --motion-gate --source classroom_clip.mp4
+    python benchmark.py --source classroom_clip.mp4 --profile 300
+    python benchmark.py --classify 1000000
+    python benchmark.py --source clip.mp4 --compare-backends solutions,tasks_live_stream
 """
 
 from __future__ import annotations
 
+import argparse
+import contextlib
 import logging
 import statistics
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 
 import cv2
-import mediapipe as mp
+
+from camera_capture import FrameAgeStats, open_camera, read_frame
+from config_loader import (
+    CameraConfig,
+    HandBackendConfig,
+    MotionGateConfig,
+    load_config,
+)
+from gesture_rules import recognize_gesture
+from hand_backends import BACKENDS, HandResult, create_backend
+from motion_gate import MotionGate
+from profiling import FrameProfiler
+from shared_frame_ring import MultiprocessPipeline, probe_frame_shape
+from synthetic_hands import GESTURES, HandSpec, stream_batches
 
 try:
     from logging_config import setup_logging
@@ -29,6 +62,21 @@ except ImportError:
 class BenchmarkConfig:
     num_frames: int = 200
     camera_index: int = 0
+    source: str | None = None  # video file path; overrides camera_index when set
+    mode: str = "single"  # "single", "multiprocess" or "both"
+    num_workers: int = 1
+    camera: CameraConfig = field(default_factory=CameraConfig)
+    simulate_load_ms: float = 0.0  # extra per-frame work, e.g. GUI drawing
+    motion_gate: MotionGateConfig | None = None  # set to compare gated vs ungated
+    profile_frames: int = 0  # profile the first N frames of the single-process run
+    classify_hands: int = 0  # classify N synthetic hands instead of reading frames
+    hand_spec: HandSpec = field(default_factory=HandSpec)
+    backend: HandBackendConfig = field(default_factory=HandBackendConfig)
+    compare_backends: list[str] = field(default_factory=list)
+
+    @property
+    def capture_source(self) -> int | str:
+        return self.source if self.source is not None else self.camera_index
 
 
 def setup_logger() -> logging.Logger:
@@ -43,38 +91,46 @@ def setup_logger() -> logging.Logger:
     return logger
 
 
-def run_benchmark(config: BenchmarkConfig, logger: logging.Logger) -> None:
-    mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands(max_num_hands=1)
-
-    cap = cv2.VideoCapture(config.camera_index)
+def run_benchmark(config: BenchmarkConfig, logger: logging.Logger) -> float | None:
+    """Benchmark the single-process path. Returns the approximate FPS."""
+    cap = open_camera(config.capture_source, config.camera)
     if not cap.isOpened():
-        logger.error("Failed to open webcam on index %s", config.camera_index)
-        return
+        logger.error("Failed to open capture source %s", config.capture_source)
+        return None
+    hands = create_backend(config.backend)
 
     logger.info(
-        "Starting benchmark for %s frames on camera index %s",
+        "Starting benchmark for %s frames on source %s",
         config.num_frames,
-        config.camera_index,
+        config.capture_source,
     )
 
     frame_times: list[float] = []
+    frame_age = FrameAgeStats(window=config.num_frames)
+    profiler = None
+    if config.profile_frames:
+        profiler = FrameProfiler("benchmark", num_frames=config.profile_frames)
     processed_frames = 0
 
     while processed_frames < config.num_frames:
         start_time = time.perf_counter()
 
-        ok, frame = cap.read()
-        if not ok:
-            logger.warning("Failed to read frame %s from webcam", processed_frames)
-            break
+        with profiler.frame() if profiler else contextlib.nullcontext():
+            captured = read_frame(cap, grab_latest=config.camera.grab_latest)
+            if captured is None:
+                logger.warning("Failed to read frame %s from webcam", processed_frames)
+                break
+
+            # Convert BGR -> RGB for MediaPipe
+            rgb_frame = cv2.cvtColor(captured.frame, cv2.COLOR_BGR2RGB)
 
-        # Convert BGR -> RGB for MediaPipe
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Run hand landmark detection
+            _ = hands.detect(rgb_frame, captured.capture_ns // 1_000_000)
 
-        # Run hand landmark detection
-        _ = hands.process(rgb_frame)
+            if config.simulate_load_ms:
+                time.sleep(config.simulate_load_ms / 1000)
 
+        frame_age.record(captured)
         end_time = time.perf_counter()
         frame_time = end_time - start_time
         frame_times.append(frame_time)
@@ -82,10 +138,12 @@ def run_benchmark(config: BenchmarkConfig, logger: logging.Logger) -> None:
 
     cap.release()
     hands.close()
+    if profiler is not None and profiler.frames:
+        print(f"Profile report: {profiler.write_report()}")
 
     if not frame_times:
         logger.error("No frames processed, benchmark aborted.")
-        return
+        return None
 
     avg_time = statistics.mean(frame_times)
     median_time = statistics.median(frame_times)
@@ -100,6 +158,8 @@ def run_benchmark(config: BenchmarkConfig, logger: logging.Logger) -> None:
     logger.info("  Min frame time: %.4f s", min_time)
     logger.info("  Max frame time: %.4f s", max_time)
     logger.info("  Approx FPS: %.2f", fps)
+    frame_age.log_summary(logger)
+    age = frame_age.summary()
 
     print("\n=== Makaton Gesture Recognition Benchmark ===")
     print(f"Frames processed: {processed_frames}")
@@ -108,12 +168,422 @@ def run_benchmark(config: BenchmarkConfig, logger: logging.Logger) -> None:
     print(f"Min frame time:     {min_time:.4f} s")
     print(f"Max frame time:     {max_time:.4f} s")
     print(f"Approx FPS:         {fps:.2f}")
+    print(f"Frame age (mean):   {age['mean_ms']:.1f} ms")
+    print(f"Frame age (p95):    {age['p95_ms']:.1f} ms")
+    print(f"Stale frames:       {age['stale_ratio'] * 100:.0f}%")
+    print(f"Drained frames:     {int(age['drained'])}")
+    return fps
+
+
+def run_multiprocess_benchmark(
+    config: BenchmarkConfig, logger: logging.Logger
+) -> float | None:
+    """
+    Benchmark the shared-memory pipeline. Returns result throughput (results/s).
+
+    The ring runs without dropping frames here so every captured frame is
+    classified, which makes the throughput comparable with `run_benchmark`.
+    """
+    shape = probe_frame_shape(config.capture_source, config.camera)
+    if shape is None:
+        logger.error("Failed to open capture source %s", config.capture_source)
+        return None
+
+    pipeline = MultiprocessPipeline(
+        config.capture_source,
+        shape,
+        num_workers=config.num_workers,
+        drop_stale=False,
+        max_frames=config.num_frames,
+        backend=config.backend,
+        camera=config.camera,
+    )
+    logger.info(
+        "Starting multi-process benchmark for %s frames on source %s with %s worker(s)",
+        config.num_frames,
+        config.capture_source,
+        config.num_workers,
+    )
+
+    results = []
+    pipeline.start()
+    try:
+        while not pipeline.finished:
+            results.extend(pipeline.poll_results(timeout=0.05))
+        captured = pipeline.frames_captured()
+    finally:
+        results.extend(pipeline.stop())
+
+    latencies = [(r.done_ns - r.capture_ns) / 1e9 for r in results]
+    if not latencies:
+        logger.error("No results received, multi-process benchmark aborted.")
+        return None
+
+    # Measure from the first capture to the last result, excluding worker start-up.
+    elapsed = (
+        max(r.done_ns for r in results) - min(r.capture_ns for r in results)
+    ) / 1e9
+    throughput = len(latencies) / elapsed if elapsed > 0 else 0.0
+    dropped = max(captured - len(latencies), 0)
+    avg_latency = statistics.mean(latencies)
+    median_latency = statistics.median(latencies)
+    max_latency = max(latencies)
+
+    logger.info("Multi-process benchmark complete:")
+    logger.info("  Frames captured: %s", captured)
+    logger.info("  Results received: %s (dropped %s)", len(latencies), dropped)
+    logger.info("  Average capture-to-result latency: %.4f s", avg_latency)
+    logger.info("  Median capture-to-result latency: %.4f s", median_latency)
+    logger.info("  Max capture-to-result latency: %.4f s", max_latency)
+    logger.info("  Result throughput: %.2f FPS", throughput)
+
+    print(f"\n=== Multi-process Benchmark ({config.num_workers} worker(s)) ===")
+    print(f"Frames captured:   {captured}")
+    print(f"Results received:  {len(latencies)} (dropped {dropped})")
+    print(f"Average latency:   {avg_latency:.4f} s")
+    print(f"Median latency:    {median_latency:.4f} s")
+    print(f"Max latency:       {max_latency:.4f} s")
+    print(f"Result throughput: {throughput:.2f} FPS")
+    return throughput
+
+
+def _run_clip_pass(
+    config: BenchmarkConfig, gate: MotionGate, logger: logging.Logger
+) -> tuple[int, float, float] | None:
+    """Process the source once. Returns (frames, cpu seconds, wall seconds)."""
+    cap = open_camera(config.capture_source, config.camera)
+    if not cap.isOpened():
+        logger.error("Failed to open capture source %s", config.capture_source)
+        return None
+    hands = create_backend(config.backend)
+
+    frames = 0
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    while frames < config.num_frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        if gate.should_process(frame):
+            _ = hands.detect(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        frames += 1
+    cpu_time = time.process_time() - cpu_start
+    wall_time = time.perf_counter() - wall_start
+
+    cap.release()
+    hands.close()
+    return frames, cpu_time, wall_time
+
+
+def run_motion_gate_benchmark(
+    config: BenchmarkConfig, logger: logging.Logger
+) -> float | None:
+    """
+    Run the same clip with and without the motion gate.
+
+    Returns the fraction of CPU time saved. Use a recorded clip (--source)
+    so both passes see identical frames.
+    """
+    gate_config = config.motion_gate or MotionGateConfig()
+    gate_config.enabled = True
+    logger.info(
+        "Starting motion-gate benchmark for %s frames on source %s",
+        config.num_frames,
+        config.capture_source,
+    )
+
+    baseline = _run_clip_pass(
+        config, MotionGate(MotionGateConfig(enabled=False)), logger
+    )
+    gate = MotionGate(gate_config)
+    gated = _run_clip_pass(config, gate, logger)
+    if baseline is None or gated is None or not baseline[0]:
+        logger.error("No frames processed, motion-gate benchmark aborted.")
+        return None
+
+    frames, base_cpu, base_wall = baseline
+    _, gated_cpu, gated_wall = gated
+    cpu_saved = 1.0 - gated_cpu / base_cpu if base_cpu > 0 else 0.0
+
+    logger.info("Motion-gate benchmark complete:")
+    logger.info("  Frames per pass: %s", frames)
+    logger.info("  Skip ratio: %.1f%%", gate.skip_ratio * 100)
+    logger.info("  CPU time ungated/gated: %.2f s / %.2f s", base_cpu, gated_cpu)
+    logger.info("  CPU saved: %.1f%%", cpu_saved * 100)
 
+    print("\n=== Motion-gate Benchmark ===")
+    print(f"Frames per pass:   {frames}")
+    print(f"Frames skipped:    {gate.skipped} ({gate.skip_ratio * 100:.1f}%)")
+    print(f"CPU time ungated:  {base_cpu:.2f} s (wall {base_wall:.2f} s)")
+    print(f"CPU time gated:    {gated_cpu:.2f} s (wall {gated_wall:.2f} s)")
+    print(f"CPU saved:         {cpu_saved * 100:.1f}%")
+    return cpu_saved
 
-def main() -> None:
+
+def _run_backend_pass(
+    config: BenchmarkConfig, backend_config: HandBackendConfig, logger: logging.Logger
+) -> dict[str, float] | None:
+    """Feed the source to one backend; measure blocking time and result latency."""
+    results: list[HandResult] = []
+    try:
+        backend = create_backend(backend_config, on_result=results.append)
+    except (FileNotFoundError, RuntimeError, ValueError) as exc:
+        logger.error("Backend %s unavailable: %s", backend_config.name, exc)
+        return None
+    cap = open_camera(config.capture_source, config.camera)
+    if not cap.isOpened():
+        logger.error("Failed to open capture source %s", config.capture_source)
+        backend.close()
+        return None
+
+    call_ms = []
+    start = time.perf_counter()
+    while len(call_ms) < config.num_frames:
+        captured = read_frame(cap)
+        if captured is None:
+            break
+        rgb_frame = cv2.cvtColor(captured.frame, cv2.COLOR_BGR2RGB)
+        call_start = time.perf_counter()
+        backend.detect(rgb_frame, captured.capture_ns // 1_000_000)
+        call_ms.append((time.perf_counter() - call_start) * 1000)
+    # Let an asynchronous backend deliver the frames still in flight.
+    deadline = time.perf_counter() + 2.0
+    while backend.pending and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    cap.release()
+    backend.close()
+
+    if not results:
+        return None
+    latencies = sorted(r.latency_ms for r in results)
+    return {
+        "frames": len(call_ms),
+        "results": len(results),
+        "call_ms": statistics.mean(call_ms),
+        "latency_ms": statistics.median(latencies),
+        "latency_p95_ms": latencies[int(0.95 * (len(latencies) - 1))],
+        "throughput": len(results) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def run_backend_comparison(
+    config: BenchmarkConfig, logger: logging.Logger
+) -> dict[str, dict[str, float]]:
+    """
+    Run the same source through each backend in `config.compare_backends`.
+
+    "Blocking" is how long detect() holds the caller (the GUI thread);
+    "latency" is frame submission to result, which for the live-stream
+    backend happens on MediaPipe's thread.
+    """
+    stats = {}
+    for name in config.compare_backends:
+        logger.info("Benchmarking hand backend %s", name)
+        result = _run_backend_pass(config, replace(config.backend, name=name), logger)
+        if result is not None:
+            stats[name] = result
+
+    print("\n=== Hand Backend Comparison ===")
+    print(
+        f"{'backend':<18} {'frames':>6} {'results':>7} {'blocking':>9} "
+        f"{'latency':>8} {'p95':>8} {'results/s':>9}"
+    )
+    for name, s in stats.items():
+        print(
+            f"{name:<18} {s['frames']:>6} {s['results']:>7} "
+            f"{s['call_ms']:>7.1f}ms {s['latency_ms']:>6.1f}ms "
+            f"{s['latency_p95_ms']:>6.1f}ms {s['throughput']:>9.1f}"
+        )
+    for name in config.compare_backends:
+        if name not in stats:
+            print(f"{name:<18} unavailable (see log)")
+    return stats
+
+
+def run_classifier_benchmark(
+    config: BenchmarkConfig, logger: logging.Logger
+) -> float | None:
+    """
+    Classify synthetic hands with recognize_gesture().
+
+    Returns classifications per second. Hands are generated in chunks, and
+    generation and conversion to landmark objects are timed separately from
+    classification.
+    """
+    logger.info(
+        "Starting classifier benchmark on %s synthetic hands (%s)",
+        config.classify_hands,
+        config.hand_spec,
+    )
+    correct = dict.fromkeys(GESTURES, 0)
+    total = dict.fromkeys(GESTURES, 0)
+    prepare_time = 0.0
+    classify_time = 0.0
+    classified = 0
+
+    start = time.perf_counter()
+    for batch in stream_batches(config.classify_hands, spec=config.hand_spec, seed=0):
+        hands = batch.all_landmarks()
+        mid = time.perf_counter()
+        predictions = [recognize_gesture(hand) for hand in hands]
+        end = time.perf_counter()
+        prepare_time += mid - start
+        classify_time += end - mid
+        start = end
+
+        for label, predicted in zip(batch.labels, predictions, strict=True):
+            gesture = GESTURES[label]
+            total[gesture] += 1
+            correct[gesture] += predicted == gesture
+        classified += len(batch)
+
+    if not classified:
+        logger.error("No hands classified, classifier benchmark aborted.")
+        return None
+
+    rate = classified / classify_time if classify_time > 0 else 0.0
+    accuracy = sum(correct.values()) / classified
+    logger.info("Classifier benchmark complete:")
+    logger.info("  Hands classified: %s", classified)
+    logger.info("  Classifications per second: %.0f", rate)
+    logger.info("  Agreement with generated labels: %.1f%%", accuracy * 100)
+
+    print("\n=== Gesture Classifier Benchmark ===")
+    print(f"Hands classified:    {classified}")
+    print(f"Generate + convert:  {prepare_time:.2f} s")
+    print(f"Classify:            {classify_time:.2f} s ({rate:.0f} hands/s)")
+    print(f"Per classification:  {classify_time / classified * 1e6:.1f} us")
+    print(f"Agreement:           {accuracy * 100:.1f}%")
+    for gesture in GESTURES:
+        if total[gesture]:
+            print(f"  {gesture:<10} {correct[gesture] / total[gesture] * 100:5.1f}%")
+    return rate
+
+
+def parse_args(argv: list[str] | None = None) -> BenchmarkConfig:
+    defaults = BenchmarkConfig()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=defaults.num_frames)
+    parser.add_argument("--camera", type=int, default=defaults.camera_index)
+    parser.add_argument("--source", help="video file to read instead of the webcam")
+    parser.add_argument(
+        "--mode", choices=["single", "multiprocess", "both"], default=defaults.mode
+    )
+    parser.add_argument("--workers", type=int, default=defaults.num_workers)
+    parser.add_argument(
+        "--grab-latest",
+        action="store_true",
+        help="drain the driver frame queue before each read (overrides config.yaml)",
+    )
+    parser.add_argument(
+        "--simulate-load-ms",
+        type=float,
+        default=defaults.simulate_load_ms,
+        help="extra per-frame processing time, to make the camera outrun the loop",
+    )
+    parser.add_argument(
+        "--motion-gate",
+        action="store_true",
+        help="compare CPU use with and without the motion gate (config.yaml thresholds)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=int,
+        metavar="N",
+        default=0,
+        help="profile the first N single-process frames and write a hot-path "
+        "report to logs/ (not available with --mode multiprocess)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        help="hand-landmark backend (overrides config.yaml)",
+    )
+    parser.add_argument(
+        "--compare-backends",
+        metavar="NAMES",
+        help=f"comma-separated backends to compare, from {', '.join(BACKENDS)}",
+    )
+    parser.add_argument(
+        "--classify",
+        type=int,
+        metavar="N",
+        default=0,
+        help="benchmark recognize_gesture() on N synthetic hands",
+    )
+    parser.add_argument(
+        "--hand-noise",
+        type=float,
+        default=0.0,
+        help="landmark noise for --classify, in normalised image units",
+    )
+    parser.add_argument(
+        "--hand-rotation",
+        type=float,
+        default=0.0,
+        help="maximum in-plane hand rotation for --classify, in radians",
+    )
+    parser.add_argument(
+        "--handedness", choices=["right", "left", "both"], default="right"
+    )
+    args = parser.parse_args(argv)
+
+    app_config = load_config()
+    camera = app_config.camera
+    if args.grab_latest:
+        camera.grab_latest = True
+    backend = app_config.hand_backend
+    if args.backend:
+        backend.name = args.backend
+    compare = args.compare_backends.split(",") if args.compare_backends else []
+    unknown = set(compare) - set(BACKENDS)
+    if unknown:
+        parser.error(f"unknown backend(s): {', '.join(sorted(unknown))}")
+    if args.profile and args.mode == "multiprocess":
+        # The work runs in worker processes, which the in-process profiler cannot see.
+        parser.error("--profile needs --mode single or both")
+    return BenchmarkConfig(
+        num_frames=args.frames,
+        camera_index=args.camera,
+        source=args.source,
+        mode=args.mode,
+        num_workers=args.workers,
+        camera=camera,
+        simulate_load_ms=args.simulate_load_ms,
+        motion_gate=app_config.motion_gate if args.motion_gate else None,
+        profile_frames=args.profile,
+        classify_hands=args.classify,
+        hand_spec=HandSpec(
+            noise=args.hand_noise,
+            rotation=args.hand_rotation,
+            handedness=args.handedness,
+        ),
+        backend=backend,
+        compare_backends=compare,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
     logger = setup_logger()
-    config = BenchmarkConfig()
-    run_benchmark(config, logger)
+    config = parse_args(argv)
+    if config.classify_hands:
+        run_classifier_benchmark(config, logger)
+        return
+    if config.compare_backends:
+        run_backend_comparison(config, logger)
+        return
+    if config.motion_gate is not None:
+        run_motion_gate_benchmark(config, logger)
+        return
+    single_fps = None
+    multi_fps = None
+    if config.mode in ("single", "both"):
+        single_fps = run_benchmark(config, logger)
+    if config.mode in ("multiprocess", "both"):
+        multi_fps = run_multiprocess_benchmark(config, logger)
+    if single_fps and multi_fps:
+        print(f"\nMulti-process speed-up: {multi_fps / single_fps:.2f}x")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,195 @@
+"""
+Low-latency webcam capture helpers.
+
+`cv2.VideoCapture` keeps a small queue of frames inside the driver. When
+processing is slower than the camera, a plain `cap.read()` hands back the
+oldest queued frame, so the picture (and the recognised gesture) lags
+further and further behind the user. This module:
+
+- applies the resolution / FPS / FOURCC / buffer-size settings from
+  `CameraConfig` (0 or "" keeps the driver default), and
+- optionally drains the driver queue before decoding ("grab latest"), so
+  inference always sees the freshest frame.
+
+`FrameAgeStats` records how old each frame was by the time its result was
+shown, which makes the effect of these settings measurable. A frame's age
+starts at the driver's buffer timestamp (`CAP_PROP_POS_MSEC`) when the
+backend reports one on the `perf_counter` clock, as V4L2 does on Linux, so
+time spent waiting in the driver queue is included. Other backends report
+no such timestamp; their age starts when `grab()` returned and misses the
+queueing delay, which the `stale` flag then has to stand in for.
+"""
+
+from __future__ import annotations
+
+import logging
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from config_loader import CameraConfig
+
+logger = logging.getLogger(__name__)
+
+# A grab that returns faster than this was served from the driver's queue
+# rather than waiting for the sensor, i.e. the frame was already stale.
+STALE_GRAB_NS = 2_000_000
+
+# A driver timestamp is only trusted if it precedes the grab by less than
+# this; stream positions (video files, some backends) fail the check.
+MAX_DRIVER_AGE_NS = 2_000_000_000
+
+
+@dataclass(frozen=True)
+class CapturedFrame:
+    frame: np.ndarray
+    capture_ns: int  # driver timestamp if available, else when the grab completed
+    waited_ns: int  # how long the final grab blocked
+    drained: int  # queued frames discarded before this one
+    driver_timestamp: bool = False  # capture_ns came from the driver
+
+    @property
+    def stale(self) -> bool:
+        return self.waited_ns < STALE_GRAB_NS
+
+
+def open_camera(
+    source: int | str, camera: CameraConfig | None = None
+) -> cv2.VideoCapture:
+    """Open `source` and apply the capture settings from `camera`."""
+    cap = cv2.VideoCapture(source)
+    if camera is None or not cap.isOpened():
+        return cap
+
+    # FOURCC must be set before the resolution on most V4L2/DirectShow drivers.
+    if camera.fourcc:
+        cap.set(
+            cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*camera.fourcc[:4].ljust(4))
+        )
+    if camera.width:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, camera.width)
+    if camera.height:
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, camera.height)
+    if camera.fps:
+        cap.set(cv2.CAP_PROP_FPS, camera.fps)
+    if camera.buffer_size:
+        # Not every backend honours this; grab_latest covers the rest.
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, camera.buffer_size)
+
+    logger.info(
+        "Camera %s opened at %dx%d @ %.1f FPS (buffer_size=%s, grab_latest=%s)",
+        source,
+        int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        cap.get(cv2.CAP_PROP_FPS),
+        camera.buffer_size or "default",
+        camera.grab_latest,
+    )
+    return cap
+
+
+def read_frame(
+    cap: cv2.VideoCapture, grab_latest: bool = False, max_drain: int = 8
+) -> CapturedFrame | None:
+    """
+    Read one frame. With `grab_latest`, keep grabbing (without decoding) while
+    grabs return instantly from the driver queue, then decode the last one.
+    """
+    drained = 0
+    start = time.perf_counter_ns()
+    ok = cap.grab()
+    end = time.perf_counter_ns()
+    while ok and grab_latest and end - start < STALE_GRAB_NS and drained < max_drain:
+        drained += 1
+        start = time.perf_counter_ns()
+        ok = cap.grab()
+        end = time.perf_counter_ns()
+    if not ok:
+        return None
+
+    ok, frame = cap.retrieve()
+    if not ok:
+        return None
+    driver_ns = driver_timestamp_ns(cap, end)
+    return CapturedFrame(
+        frame=frame,
+        capture_ns=end if driver_ns is None else driver_ns,
+        waited_ns=end - start,
+        drained=drained,
+        driver_timestamp=driver_ns is not None,
+    )
+
+
+def driver_timestamp_ns(cap: cv2.VideoCapture, grabbed_ns: int) -> int | None:
+    """
+    The driver's capture time of the last grabbed frame on the perf_counter
+    clock, or None if the backend does not report one.
+
+    V4L2 buffer timestamps are CLOCK_MONOTONIC, the clock behind
+    `perf_counter_ns()` on Linux, and OpenCV returns them in milliseconds.
+    """
+    driver_ns = int(cap.get(cv2.CAP_PROP_POS_MSEC) * 1_000_000)
+    if driver_ns > 0 and 0 <= grabbed_ns - driver_ns <= MAX_DRIVER_AGE_NS:
+        return driver_ns
+    return None
+
+
+class FrameAgeStats:
+    """Rolling capture-to-result age statistics over the last `window` frames."""
+
+    def __init__(self, window: int = 300):
+        self.window = window
+        self._ages_ms: deque[float] = deque(maxlen=window)
+        self._stale: deque[bool] = deque(maxlen=window)
+        self._driver: deque[bool] = deque(maxlen=window)
+        self.frames = 0
+        self.drained = 0
+
+    def record(self, captured: CapturedFrame, result_ns: int | None = None) -> float:
+        """Record one frame and return its age in milliseconds."""
+        result_ns = time.perf_counter_ns() if result_ns is None else result_ns
+        age_ms = (result_ns - captured.capture_ns) / 1e6
+        self._ages_ms.append(age_ms)
+        self._stale.append(captured.stale)
+        self._driver.append(captured.driver_timestamp)
+        self.frames += 1
+        self.drained += captured.drained
+        return age_ms
+
+    def summary(self) -> dict[str, float]:
+        if not self._ages_ms:
+            return {}
+        ages = sorted(self._ages_ms)
+        p95_index = min(len(ages) - 1, int(round(0.95 * (len(ages) - 1))))
+        return {
+            "mean_ms": statistics.mean(ages),
+            "median_ms": statistics.median(ages),
+            "p95_ms": ages[p95_index],
+            "max_ms": ages[-1],
+            "stale_ratio": sum(self._stale) / len(self._stale),
+            "drained": float(self.drained),
+            "driver_timestamp_ratio": sum(self._driver) / len(self._driver),
+        }
+
+    def log_summary(self, log: logging.Logger) -> None:
+        stats = self.summary()
+        if not stats:
+            return
+        log.info(
+            "Frame age over last %s frames: mean %.1f ms, p95 %.1f ms, "
+            "stale %.0f%%, %d buffered frames drained, measured from %s",
+            len(self._ages_ms),
+            stats["mean_ms"],
+            stats["p95_ms"],
+            stats["stale_ratio"] * 100,
+            stats["drained"],
+            (
+                "driver timestamps"
+                if stats["driver_timestamp_ratio"] == 1.0
+                else "grab completion (driver queue time not included)"
+            ),
+        )
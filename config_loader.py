@@ -11,6 +11,12 @@ import yaml
 @dataclass
 class CameraConfig:
     index: int = 0
+    width: int = 0  # 0 keeps the driver default
+    height: int = 0
+    fps: int = 0
+    fourcc: str = ""  # e.g. "MJPG"; empty keeps the driver default
+    buffer_size: int = 0  # driver frame queue length (CAP_PROP_BUFFERSIZE)
+    grab_latest: bool = False  # drain queued frames so inference sees the newest
 
 
 @dataclass
@@ -24,6 +30,94 @@ class GestureThresholds:
     goodbye_max_distance: float = 0.1
 
 
+@dataclass
+class HandBackendConfig:
+    name: str = "solutions"  # "solutions", "tasks_video", "tasks_live_stream" or "stub"
+    max_num_hands: int = 1
+    min_detection_confidence: float = 0.5
+    min_tracking_confidence: float = 0.5
+    model_path: str = "models/hand_landmarker.task"  # Tasks backends only
+    stub_gestures: list[str | None] = field(default_factory=lambda: ["Hello"])
+    stub_latency_ms: float = 0.0  # simulated inference time of the stub
+
+
+@dataclass
+class MotionGateConfig:
+    enabled: bool = False
+    width: int = 64  # width of the grayscale thumbnail compared between frames
+    pixel_delta: int = 15  # grey-level change that counts a pixel as "moved"
+    threshold: float = 0.01  # fraction of moved pixels that triggers inference
+    max_skip: int = 15  # force inference after this many skipped frames
+
+
+@dataclass
+class TrackingConfig:
+    enabled: bool = False
+    detect_every: int = 1  # run hand detection every Nth frame, predict the rest
+    min_cutoff: float = 1.5  # One-Euro cut-off (Hz) for a still hand; lower = smoother
+    beta: float = 5.0  # how fast the cut-off rises with hand speed; higher = less lag
+    d_cutoff: float = 1.0  # cut-off (Hz) for the velocity estimate
+    max_predict_s: float = 0.5  # stop extrapolating this long after a detection
+    max_missed: int = 2  # detections a hand may be missing before its track ends
+
+
+@dataclass
+class PipelineConfig:
+    mode: str = "single"  # "single" or "multiprocess"
+    num_workers: int = 1
+    num_slots: int = 4
+
+
+@dataclass
+class RecordingConfig:
+    output_dir: str = "recordings"
+    queue_size: int = 64  # frames buffered for the encoder before dropping
+    codec: str = "mp4v"
+    fps: float = 0.0  # 0 measures the rate frames are recorded at
+
+
+@dataclass
+class PhrasesConfig:
+    enabled: bool = True
+    lexicon_path: str = "phrases.yaml"
+    hold_frames: int = 3  # frames a gesture must be stable to count as an event
+    max_gap_s: float = 2.0  # pause that ends the current phrase
+
+
+@dataclass
+class SpeechConfig:
+    enabled: bool = False
+    engine: str = "pyttsx3"  # "pyttsx3" or "stub" (silent)
+    speak: str = "phrases"  # "phrases" or "gestures"
+    rate: int = 0  # words per minute, 0 = engine default
+    cache_size: int = 128  # rendered utterances kept in memory
+    queue_size: int = 4  # pending utterances before new ones are dropped
+
+
+@dataclass
+class SoakConfig:
+    hours: float = 8.0  # simulated classroom hours (frames / nominal_fps)
+    nominal_fps: float = 30.0  # camera rate the simulated time is based on
+    sample_every_s: float = 60.0  # simulated seconds between samples
+    warmup_s: float = 300.0  # simulated seconds ignored before fitting trends
+    max_rss_slope_mb_per_hour: float = 20.0
+    max_object_growth_per_hour: float = 20000.0
+    max_p99_drift: float = 0.5  # allowed relative rise of p99 frame time
+
+
+@dataclass
+class FleetConfig:
+    enabled: bool = False  # push events from this station to the aggregator
+    host: str = "127.0.0.1"
+    port: int = 8765
+    station: str = ""  # station name, defaults to the host name
+    db_path: str = "logs/fleet.db"  # aggregator's SQLite store
+    batch_size: int = 1000  # events per send (station) and per transaction
+    flush_interval_s: float = 0.5  # aggregator's longest wait to fill a batch
+    queue_size: int = 10000  # buffered events before new ones are dropped
+    report_every_s: float = 10.0  # seconds between station perf summaries
+
+
 @dataclass
 class LoggingConfig:
     level: str = "INFO"
@@ -34,6 +128,15 @@ class AppConfig:
     camera: CameraConfig = field(default_factory=CameraConfig)
     gui: GUIConfig = field(default_factory=GUIConfig)
     gesture_thresholds: GestureThresholds = field(default_factory=GestureThresholds)
+    pipeline: PipelineConfig = field(default_factory=PipelineConfig)
+    hand_backend: HandBackendConfig = field(default_factory=HandBackendConfig)
+    motion_gate: MotionGateConfig = field(default_factory=MotionGateConfig)
+    tracking: TrackingConfig = field(default_factory=TrackingConfig)
+    recording: RecordingConfig = field(default_factory=RecordingConfig)
+    phrases: PhrasesConfig = field(default_factory=PhrasesConfig)
+    speech: SpeechConfig = field(default_factory=SpeechConfig)
+    soak: SoakConfig = field(default_factory=SoakConfig)
+    fleet: FleetConfig = field(default_factory=FleetConfig)
     logging: LoggingConfig = field(default_factory=LoggingConfig)
 
 
@@ -63,11 +166,29 @@ def load_config(path: str | Path = "config.yaml") -> AppConfig:
     camera = CameraConfig(**(raw.get("camera") or {}))
     gui = GUIConfig(**(raw.get("gui") or {}))
     thresholds = GestureThresholds(**(raw.get("gesture_thresholds") or {}))
+    pipeline = PipelineConfig(**(raw.get("pipeline") or {}))
+    hand_backend = HandBackendConfig(**(raw.get("hand_backend") or {}))
+    motion_gate = MotionGateConfig(**(raw.get("motion_gate") or {}))
+    tracking = TrackingConfig(**(raw.get("tracking") or {}))
+    recording = RecordingConfig(**(raw.get("recording") or {}))
+    phrases = PhrasesConfig(**(raw.get("phrases") or {}))
+    speech = SpeechConfig(**(raw.get("speech") or {}))
+    soak = SoakConfig(**(raw.get("soak") or {}))
+    fleet = FleetConfig(**(raw.get("fleet") or {}))
     logging_cfg = LoggingConfig(**(raw.get("logging") or {}))
 
     return AppConfig(
         camera=camera,
         gui=gui,
         gesture_thresholds=thresholds,
+        pipeline=pipeline,
+        hand_backend=hand_backend,
+        motion_gate=motion_gate,
+        tracking=tracking,
+        recording=recording,
+        phrases=phrases,
+        speech=speech,
+        soak=soak,
+        fleet=fleet,
         logging=logging_cfg,
     )
@@ -0,0 +1,548 @@
+"""
+Classroom fleet aggregator.
+
+Every station pushes its gesture events and periodic performance summaries
+to one aggregator over a local TCP socket; the aggregator stores them in an
+embedded SQLite database so usage can be reviewed across a whole school.
+
+Wire format: one JSON object per line, UTF-8.
+    {"kind": "gesture", "station": "room-3", "ts": 1760000000.5, "gesture": "Hello"}
+    {"kind": "perf", "station": "room-3", "ts": 1760000010.0, "fps": 29.7,
+     "frame_age_p95_ms": 41.2, "frames": 297}
+`ts` is wall-clock Unix time, so events from different stations line up.
+
+Throughput comes from batching on both sides:
+- `FleetReporter` (station side) never blocks the GUI: events go on a bounded
+  queue and a background thread sends whatever has accumulated in one write.
+- `FleetAggregator` (server side) parses lines on per-connection threads onto
+  a bounded queue; a single writer thread drains it and inserts up to
+  `batch_size` rows per transaction with `executemany`. The database runs in
+  WAL mode, so reports can be queried while stations are writing.
+
+Usage:
+    python fleet_aggregator.py serve                 # run the aggregator
+    python fleet_aggregator.py report --hours 8      # per-station FPS and gestures
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import queue
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from config_loader import FleetConfig, load_config
+
+try:
+    from logging_config import setup_logging
+except ImportError:  # pragma: no cover
+    setup_logging = None  # Fallback: use basicConfig
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS gesture_events (
+    station TEXT NOT NULL,
+    ts REAL NOT NULL,
+    gesture TEXT NOT NULL
+);
+-- Covering indexes: time-range counts are answered from the index alone.
+CREATE INDEX IF NOT EXISTS idx_gesture_station_ts
+    ON gesture_events (station, ts, gesture);
+CREATE INDEX IF NOT EXISTS idx_gesture_ts ON gesture_events (ts, station, gesture);
+CREATE INDEX IF NOT EXISTS idx_gesture_gesture_ts ON gesture_events (gesture, ts);
+
+CREATE TABLE IF NOT EXISTS perf_summaries (
+    station TEXT NOT NULL,
+    ts REAL NOT NULL,
+    fps REAL NOT NULL,
+    frame_age_p95_ms REAL,
+    frames INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_perf_station_ts ON perf_summaries (station, ts);
+CREATE INDEX IF NOT EXISTS idx_perf_ts ON perf_summaries (ts);
+"""
+
+
+@dataclass(frozen=True)
+class GestureCount:
+    station: str
+    gesture: str
+    count: int
+
+
+@dataclass(frozen=True)
+class StationFps:
+    station: str
+    summaries: int
+    frames: int
+    mean_fps: float
+    min_fps: float
+    frame_age_p95_ms: float | None  # worst reported p95 frame age
+
+
+def encode(message: dict) -> bytes:
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def decode(line: bytes) -> tuple[str, tuple] | None:
+    """One wire line -> ("gesture" | "perf", row), or None if malformed."""
+    try:
+        message = json.loads(line)
+        station, ts = str(message["station"]), float(message["ts"])
+        if message["kind"] == "gesture":
+            return "gesture", (station, ts, str(message["gesture"]))
+        if message["kind"] == "perf":
+            p95 = message.get("frame_age_p95_ms")
+            return "perf", (
+                station,
+                ts,
+                float(message["fps"]),
+                None if p95 is None else float(p95),
+                int(message.get("frames", 0)),
+            )
+    except (ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+class FleetStore:
+    """The SQLite store. Use one instance per thread."""
+
+    def __init__(self, path: str | Path):
+        path = Path(path)
+        if str(path) != ":memory:":
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL only syncs at checkpoints; a power cut can lose the last
+        # batch but never corrupts the database.
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def write_batch(
+        self, gestures: list[tuple], perf: list[tuple] | None = None
+    ) -> None:
+        """Insert rows from `decode()` in one transaction."""
+        with self.conn:
+            if gestures:
+                self.conn.executemany(
+                    "INSERT INTO gesture_events VALUES (?, ?, ?)", gestures
+                )
+            if perf:
+                self.conn.executemany(
+                    "INSERT INTO perf_summaries VALUES (?, ?, ?, ?, ?)", perf
+                )
+
+    def gesture_counts(
+        self, start: float, end: float, station: str | None = None
+    ) -> list[GestureCount]:
+        """Gesture frequency per station in [start, end), most frequent first."""
+        sql = "SELECT station, gesture, COUNT(*) FROM gesture_events WHERE "
+        if station is None:
+            sql += "ts >= ? AND ts < ?"
+            args: tuple = (start, end)
+        else:
+            sql += "station = ? AND ts >= ? AND ts < ?"
+            args = (station, start, end)
+        sql += " GROUP BY station, gesture ORDER BY station, COUNT(*) DESC, gesture"
+        return [GestureCount(*row) for row in self.conn.execute(sql, args)]
+
+    def station_fps(self, start: float, end: float) -> list[StationFps]:
+        """Per-station frame rate over the summaries reported in [start, end)."""
+        rows = self.conn.execute(
+            "SELECT station, COUNT(*), SUM(frames), AVG(fps), MIN(fps),"
+            " MAX(frame_age_p95_ms) FROM perf_summaries"
+            " WHERE ts >= ? AND ts < ? GROUP BY station ORDER BY station",
+            (start, end),
+        )
+        return [StationFps(*row) for row in rows]
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        aggregator: FleetAggregator = self.server.aggregator
+        if not aggregator._add_connection(self.request):
+            return
+        try:
+            for line in self.rfile:
+                aggregator.submit_line(line)
+        finally:
+            aggregator._remove_connection(self.request)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FleetAggregator:
+    """Receive station events over TCP and batch them into SQLite."""
+
+    def __init__(self, config: FleetConfig | None = None):
+        self.config = config or FleetConfig()
+        self.received = 0
+        self.inserted = 0
+        self.malformed = 0
+        self.dropped = 0
+        self.batches = 0
+        self._count_lock = threading.Lock()
+        # Open station connections and their handler threads, so stop() can
+        # end them before the writer's stop marker is queued.
+        self._connections: dict[socket.socket, threading.Thread] = {}
+        self._stopping = False
+        self._closed = False
+        self._queue: queue.Queue = queue.Queue(maxsize=self.config.queue_size)
+        self._server: _Server | None = None
+        self._threads: list[threading.Thread] = []
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """The bound (host, port); useful with `port: 0`."""
+        return self._server.server_address[:2]
+
+    def start(self) -> tuple[str, int]:
+        self._server = _Server((self.config.host, self.config.port), _Handler)
+        self._server.aggregator = self
+        self._threads = [
+            threading.Thread(target=self._write_loop, name="fleet-writer", daemon=True),
+            threading.Thread(
+                target=self._server.serve_forever, name="fleet-server", daemon=True
+            ),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(
+            "Fleet aggregator listening on %s:%s, storing to %s",
+            *self.address,
+            self.config.db_path,
+        )
+        return self.address
+
+    def _add_connection(self, sock: socket.socket) -> bool:
+        with self._count_lock:
+            if self._stopping:
+                return False
+            self._connections[sock] = threading.current_thread()
+            return True
+
+    def _remove_connection(self, sock: socket.socket) -> None:
+        with self._count_lock:
+            self._connections.pop(sock, None)
+
+    def submit_line(self, line: bytes) -> None:
+        """Parse one wire line and queue it for the writer thread."""
+        item = decode(line)
+        with self._count_lock:  # one handler thread per station
+            if item is None:
+                self.malformed += 1
+                return
+            self.received += 1
+            if self._closed:
+                # The writer has been told to stop; nothing queued now is stored.
+                self.dropped += 1
+                return
+        try:
+            # A short wait pushes back on the sender's TCP window before dropping.
+            self._queue.put(item, timeout=1.0)
+        except queue.Full:
+            with self._count_lock:
+                self.dropped += 1
+
+    def _write_loop(self) -> None:
+        store = FleetStore(self.config.db_path)
+        try:
+            running = True
+            while running:
+                running = self._write_next_batch(store)
+        finally:
+            store.close()
+
+    def _write_next_batch(self, store: FleetStore) -> bool:
+        """Wait for events, gather up to a batch, insert it. False once stopped."""
+        try:
+            first = self._queue.get(timeout=self.config.flush_interval_s)
+        except queue.Empty:
+            return True
+        batch = [first]
+        deadline = time.monotonic() + self.config.flush_interval_s
+        while batch[-1] is not _STOP and len(batch) < self.config.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                # Short lull: wait a little for more rather than writing tiny batches.
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=min(remaining, 0.01)))
+                except queue.Empty:
+                    break
+        stopping = batch[-1] is _STOP
+        if stopping:
+            batch.pop()
+        gestures = [row for kind, row in batch if kind == "gesture"]
+        perf = [row for kind, row in batch if kind == "perf"]
+        if batch:
+            try:
+                store.write_batch(gestures, perf)
+                self.inserted += len(batch)
+                self.batches += 1
+            except sqlite3.Error:
+                logger.exception("Failed to store %s fleet events", len(batch))
+                with self._count_lock:
+                    self.dropped += len(batch)
+        return not stopping
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything received so far is in the database."""
+        deadline = time.monotonic() + timeout
+        while self.inserted + self.dropped < self.received:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        with self._count_lock:
+            self._stopping = True
+            connections = list(self._connections.items())
+        # Stop reading from stations; lines already buffered are still queued.
+        for sock, _ in connections:
+            try:
+                sock.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+        for _, handler in connections:
+            handler.join(timeout=5.0)
+        self._server.server_close()
+        with self._count_lock:
+            self._closed = True
+        self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout=5.0)
+        self._server = None
+        logger.info(
+            "Fleet aggregator stopped: %s events in %s batches, %s dropped, "
+            "%s malformed",
+            self.inserted,
+            self.batches,
+            self.dropped,
+            self.malformed,
+        )
+
+
+class FleetReporter:
+    """
+    Station-side client. `gesture()` and `record_frame()` are cheap and never
+    block; a background thread sends queued events and reconnects after
+    network errors (events queued while disconnected are dropped once the
+    queue is full).
+    """
+
+    def __init__(self, config: FleetConfig | None = None):
+        self.config = config or FleetConfig()
+        self.station = self.config.station or socket.gethostname()
+        self.sent = 0
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=self.config.queue_size)
+        self._thread: threading.Thread | None = None
+        self._sock: socket.socket | None = None
+        self._interval_start = time.perf_counter()
+        self._interval_frames = 0
+        self._interval_ages: list[float] = []
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="fleet-reporter", daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, message: dict) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+
+    def gesture(self, gesture: str, ts: float | None = None) -> None:
+        self._put(
+            {
+                "kind": "gesture",
+                "station": self.station,
+                "ts": time.time() if ts is None else ts,
+                "gesture": gesture,
+            }
+        )
+
+    def perf(
+        self, fps: float, frames: int, frame_age_p95_ms: float | None = None
+    ) -> None:
+        self._put(
+            {
+                "kind": "perf",
+                "station": self.station,
+                "ts": time.time(),
+                "fps": round(fps, 2),
+                "frame_age_p95_ms": frame_age_p95_ms,
+                "frames": frames,
+            }
+        )
+
+    def record_frame(self, age_ms: float | None = None) -> None:
+        """Count one displayed frame; sends a perf summary every report_every_s."""
+        self._interval_frames += 1
+        if age_ms is not None:
+            self._interval_ages.append(age_ms)
+        elapsed = time.perf_counter() - self._interval_start
+        if elapsed < self.config.report_every_s:
+            return
+        p95 = None
+        if self._interval_ages:
+            ages = sorted(self._interval_ages)
+            p95 = round(ages[int(round(0.95 * (len(ages) - 1)))], 2)
+        self.perf(self._interval_frames / elapsed, self._interval_frames, p95)
+        self._interval_start += elapsed
+        self._interval_frames = 0
+        self._interval_ages = []
+
+    def _run(self) -> None:
+        while True:
+            message = self._queue.get()
+            if message is _STOP:
+                break
+            batch = [message]
+            while len(batch) < self.config.batch_size:
+                try:
+                    message = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if message is _STOP:
+                    self._send(batch)
+                    self._close_socket()
+                    return
+                batch.append(message)
+            self._send(batch)
+        self._close_socket()
+
+    def _send(self, batch: list[dict]) -> None:
+        payload = b"".join(encode(message) for message in batch)
+        for attempt in range(2):
+            try:
+                if self._sock is None:
+                    self._sock = socket.create_connection(
+                        (self.config.host, self.config.port), timeout=2.0
+                    )
+                self._sock.sendall(payload)
+                self.sent += len(batch)
+                return
+            except OSError as exc:
+                self._close_socket()
+                if attempt:
+                    self.dropped += len(batch)
+                    logger.warning(
+                        "Fleet aggregator unreachable (%s); dropped %s events",
+                        exc,
+                        len(batch),
+                    )
+                    time.sleep(1.0)  # back off before the next batch
+
+    def _close_socket(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Send what is queued, then close the connection."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+
+def print_report(store: FleetStore, start: float, end: float) -> None:
+    print(
+        f"\n=== Fleet report {time.strftime('%Y-%m-%d %H:%M', time.localtime(start))}"
+        f" to {time.strftime('%Y-%m-%d %H:%M', time.localtime(end))} ==="
+    )
+    print(f"{'station':20} {'frames':>9} {'mean FPS':>9} {'min FPS':>8} {'p95 age':>8}")
+    for row in store.station_fps(start, end):
+        age = "-" if row.frame_age_p95_ms is None else f"{row.frame_age_p95_ms:.0f}ms"
+        print(
+            f"{row.station:20} {row.frames:>9} {row.mean_fps:>9.1f} "
+            f"{row.min_fps:>8.1f} {age:>8}"
+        )
+    print(f"\n{'station':20} {'gesture':12} {'count':>7}")
+    for row in store.gesture_counts(start, end):
+        print(f"{row.station:20} {row.gesture:12} {row.count:>7}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Classroom fleet aggregator")
+    parser.add_argument("command", choices=("serve", "report"))
+    parser.add_argument("--host", help="override fleet.host from config.yaml")
+    parser.add_argument("--port", type=int, help="override fleet.port")
+    parser.add_argument("--db", help="override fleet.db_path")
+    parser.add_argument(
+        "--hours", type=float, default=24.0, help="report window ending now"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    if setup_logging is not None:
+        setup_logging()
+    else:
+        logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+    config = load_config().fleet
+    if args.host:
+        config.host = args.host
+    if args.port is not None:
+        config.port = args.port
+    if args.db:
+        config.db_path = args.db
+
+    if args.command == "report":
+        store = FleetStore(config.db_path)
+        end = time.time()
+        print_report(store, end - args.hours * 3600, end)
+        store.close()
+        return
+
+    aggregator = FleetAggregator(config)
+    aggregator.start()
+    try:
+        while True:
+            time.sleep(60)
+            logger.info(
+                "Fleet aggregator: %s events stored, %s dropped",
+                aggregator.inserted,
+                aggregator.dropped,
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        aggregator.stop()
+
+
+if __name__ == "__main__":
+    main()
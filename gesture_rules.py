@@ -0,0 +1,74 @@
+"""
+Rule-based gesture recogniser for the Makaton Gesture Recognition Tool.
+
+This module has no GUI or camera dependencies so it can be imported from
+the Tk app, the benchmark script and worker processes alike.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import numpy as np
+
+from config_loader import load_config
+
+logger = logging.getLogger(__name__)
+config = load_config()
+
+HELLO_MIN_DIST = config.gesture_thresholds.hello_min_distance
+GOODBYE_MAX_DIST = config.gesture_thresholds.goodbye_max_distance
+
+# Define the gesture descriptions
+GESTURE_DESCRIPTIONS = {
+    "Hello": "Open hand, palm facing forward, all fingers extended.",
+    "Goodbye": "Open hand, palm facing forward, moving fingers as if waving.",
+    "Please": "Flat hand, palm facing up, moving in a small circular motion.",
+    "Thank You": "Flat hand, palm facing up, moving away from the chin.",
+    "Yes": "Fist with thumb up.",
+}
+
+
+def recognize_gesture(landmarks):
+    """Recognize a gesture from Mediapipe hand landmarks."""
+    thumb_tip = landmarks[4]
+    index_tip = landmarks[8]
+    middle_tip = landmarks[12]
+    ring_tip = landmarks[16]
+    pinky_tip = landmarks[20]
+    wrist = landmarks[0]
+
+    def distance(p1, p2):
+        return np.sqrt((p1.x - p2.x) ** 2 + (p1.y - p2.y) ** 2)
+
+    # Distances and relative positions
+    thumb_index_dist = distance(thumb_tip, index_tip)
+    thumb_middle_dist = distance(thumb_tip, middle_tip)
+    thumb_ring_dist = distance(thumb_tip, ring_tip)
+    thumb_pinky_dist = distance(thumb_tip, pinky_tip)
+    wrist_index_dist = distance(wrist, index_tip)
+    wrist_thumb_dist = distance(wrist, thumb_tip)
+
+    # Simple gesture rules (placeholder logic)
+    if (
+        thumb_index_dist > HELLO_MIN_DIST
+        and thumb_middle_dist > HELLO_MIN_DIST
+        and thumb_ring_dist > HELLO_MIN_DIST
+        and thumb_pinky_dist > HELLO_MIN_DIST
+    ):
+        return "Hello"  # All fingers extended
+    elif (
+        thumb_index_dist < GOODBYE_MAX_DIST
+        and thumb_middle_dist < GOODBYE_MAX_DIST
+        and thumb_ring_dist < GOODBYE_MAX_DIST
+        and thumb_pinky_dist < GOODBYE_MAX_DIST
+    ):
+        return "Goodbye"  # Fingers together, waving
+    elif wrist_thumb_dist < wrist_index_dist and thumb_tip.y < wrist.y:
+        return "Please"  # Flat hand, palm up
+    elif wrist_thumb_dist < wrist_index_dist and thumb_tip.y > wrist.y:
+        return "Thank You"  # Flat hand moving away from chin
+    elif thumb_tip.x < index_tip.x:
+        return "Yes"  # Fist with thumb up
+    logger.debug("No gesture matched current landmark configuration")
+    return None
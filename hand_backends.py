@@ -0,0 +1,296 @@
+"""
+Pluggable hand-landmark backends.
+
+Every backend turns an RGB frame into a `HandResult` whose
+`multi_hand_landmarks` holds one `NormalizedLandmarkList` per hand, the same
+shape as the legacy `Hands.process()` output, so drawing code and
+`recognize_gesture()` work unchanged. Available backends:
+
+- `solutions`          legacy `mp.solutions.hands` graph (synchronous)
+- `tasks_video`        MediaPipe Tasks HandLandmarker, VIDEO mode (synchronous)
+- `tasks_live_stream`  HandLandmarker, LIVE_STREAM mode: `detect()` only
+                       submits the frame and returns the newest result that
+                       has arrived from MediaPipe's own thread, so inference
+                       never blocks the caller
+- `stub`               deterministic canonical hands from `synthetic_hands`,
+                       no model needed (headless tests, soak and latency runs)
+
+The Tasks backends need the `hand_landmarker.task` model file, see
+`hand_backend.model_path` in config.yaml.
+
+Usage:
+    backend = create_backend(config.hand_backend, on_result=callback)
+    result = backend.detect(rgb_frame, timestamp_ms)  # may be None if async
+    backend.close()
+"""
+
+from __future__ import annotations
+
+import abc
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import mediapipe as mp
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from config_loader import HandBackendConfig
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("solutions", "tasks_video", "tasks_live_stream", "stub")
+
+
+@dataclass(frozen=True)
+class BackendCapabilities:
+    name: str
+    asynchronous: bool = False  # detect() may return an earlier frame's result
+    max_num_hands: int = 1
+    handedness: bool = True
+    world_landmarks: bool = False
+    needs_model_file: bool = False
+
+
+@dataclass
+class HandResult:
+    # Named like the legacy solution output so existing callers work unchanged.
+    multi_hand_landmarks: list[landmark_pb2.NormalizedLandmarkList] = field(
+        default_factory=list
+    )
+    handedness: list[str] = field(default_factory=list)
+    timestamp_ms: int = 0  # timestamp of the frame this result belongs to
+    latency_ms: float = 0.0  # submission to result
+
+
+def to_landmark_list(landmarks) -> landmark_pb2.NormalizedLandmarkList:
+    """Objects with x, y, z (or (x, y, z) tuples) -> a drawable landmark proto."""
+    return landmark_pb2.NormalizedLandmarkList(
+        landmark=[
+            landmark_pb2.NormalizedLandmark(x=x, y=y, z=z)
+            for x, y, z in (
+                lm if isinstance(lm, (tuple, list)) else (lm.x, lm.y, lm.z)
+                for lm in landmarks
+            )
+        ]
+    )
+
+
+class HandBackend(abc.ABC):
+    """Base class: detect(), close() and capabilities."""
+
+    capabilities = BackendCapabilities("base")
+
+    def __init__(self, on_result: Callable[[HandResult], None] | None = None):
+        self.on_result = on_result
+        self.frames = 0
+        self.results = 0
+        self._last_ts = -1
+
+    @abc.abstractmethod
+    def detect(
+        self, rgb_frame: np.ndarray, timestamp_ms: int | None = None
+    ) -> HandResult | None:
+        """Run (or submit) detection. Returns None when no new result is ready."""
+
+    def close(self) -> None:  # noqa: B027 - optional, not every backend holds resources
+        pass
+
+    @property
+    def pending(self) -> int:
+        """Frames submitted whose results have not arrived yet."""
+        return 0
+
+    def _timestamp(self, timestamp_ms: int | None) -> int:
+        # MediaPipe graphs reject timestamps that do not strictly increase.
+        if timestamp_ms is None:
+            timestamp_ms = time.perf_counter_ns() // 1_000_000
+        self._last_ts = max(int(timestamp_ms), self._last_ts + 1)
+        return self._last_ts
+
+    def _emit(self, result: HandResult) -> HandResult:
+        self.results += 1
+        if self.on_result is not None:
+            self.on_result(result)
+        return result
+
+    def __enter__(self) -> HandBackend:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SolutionsBackend(HandBackend):
+    """The legacy `mp.solutions.hands.Hands` graph."""
+
+    def __init__(self, config: HandBackendConfig, on_result=None):
+        super().__init__(on_result)
+        self.capabilities = BackendCapabilities(
+            "solutions", max_num_hands=config.max_num_hands
+        )
+        self._hands = mp.solutions.hands.Hands(
+            max_num_hands=config.max_num_hands,
+            min_detection_confidence=config.min_detection_confidence,
+            min_tracking_confidence=config.min_tracking_confidence,
+        )
+
+    def detect(self, rgb_frame, timestamp_ms=None):
+        ts = self._timestamp(timestamp_ms)
+        self.frames += 1
+        start = time.perf_counter()
+        output = self._hands.process(rgb_frame)
+        handedness = [h.classification[0].label for h in output.multi_handedness or []]
+        return self._emit(
+            HandResult(
+                list(output.multi_hand_landmarks or []),
+                handedness,
+                ts,
+                (time.perf_counter() - start) * 1000,
+            )
+        )
+
+    def close(self):
+        self._hands.close()
+
+
+class TasksBackend(HandBackend):
+    """MediaPipe Tasks HandLandmarker in VIDEO or LIVE_STREAM mode."""
+
+    def __init__(self, config: HandBackendConfig, live_stream: bool, on_result=None):
+        super().__init__(on_result)
+        from mediapipe.tasks.python import BaseOptions, vision
+
+        model_path = Path(config.model_path)
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"HandLandmarker model {model_path} not found; download "
+                "hand_landmarker.task from the MediaPipe model page"
+            )
+        self.live_stream = live_stream
+        self.capabilities = BackendCapabilities(
+            "tasks_live_stream" if live_stream else "tasks_video",
+            asynchronous=live_stream,
+            max_num_hands=config.max_num_hands,
+            world_landmarks=True,
+            needs_model_file=True,
+        )
+        self._lock = threading.Lock()
+        self._submitted: dict[int, int] = {}  # timestamp_ms -> submit time (ns)
+        self._latest: HandResult | None = None
+        self.dropped = 0
+
+        mode = (
+            vision.RunningMode.LIVE_STREAM if live_stream else vision.RunningMode.VIDEO
+        )
+        options = vision.HandLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=str(model_path)),
+            running_mode=mode,
+            num_hands=config.max_num_hands,
+            min_hand_detection_confidence=config.min_detection_confidence,
+            min_tracking_confidence=config.min_tracking_confidence,
+            result_callback=self._on_async_result if live_stream else None,
+        )
+        self._landmarker = vision.HandLandmarker.create_from_options(options)
+
+    @staticmethod
+    def _convert(output, ts: int, latency_ms: float) -> HandResult:
+        return HandResult(
+            [to_landmark_list(hand) for hand in output.hand_landmarks],
+            [h[0].category_name for h in output.handedness],
+            ts,
+            latency_ms,
+        )
+
+    def detect(self, rgb_frame, timestamp_ms=None):
+        ts = self._timestamp(timestamp_ms)
+        self.frames += 1
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        if not self.live_stream:
+            start = time.perf_counter()
+            output = self._landmarker.detect_for_video(image, ts)
+            return self._emit(
+                self._convert(output, ts, (time.perf_counter() - start) * 1000)
+            )
+
+        with self._lock:
+            self._submitted[ts] = time.perf_counter_ns()
+        self._landmarker.detect_async(image, ts)
+        with self._lock:
+            latest, self._latest = self._latest, None
+        return latest
+
+    def _on_async_result(self, output, _image, timestamp_ms: int) -> None:
+        """Called on MediaPipe's thread for every frame it finished."""
+        done = time.perf_counter_ns()
+        with self._lock:
+            submitted = self._submitted.pop(timestamp_ms, done)
+            # Older frames that never got a result were dropped by the graph.
+            stale = [ts for ts in self._submitted if ts < timestamp_ms]
+            for ts in stale:
+                del self._submitted[ts]
+            self.dropped += len(stale)
+            result = self._convert(output, timestamp_ms, (done - submitted) / 1e6)
+            self._latest = result
+        self._emit(result)
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._submitted)
+
+    def close(self):
+        self._landmarker.close()
+
+
+class StubBackend(HandBackend):
+    """
+    Deterministic backend without a model: frame N gets the canonical
+    synthetic hand for `gestures[N % len(gestures)]` (None means no hand).
+    """
+
+    def __init__(self, config: HandBackendConfig, on_result=None):
+        super().__init__(on_result)
+        from synthetic_hands import generate_batch
+
+        self.capabilities = BackendCapabilities("stub", max_num_hands=1)
+        self.latency_ms = config.stub_latency_ms
+        self._hands = [
+            (
+                None
+                if g is None
+                else to_landmark_list(generate_batch(1, [g], seed=0).landmarks(0))
+            )
+            for g in config.stub_gestures or [None]
+        ]
+
+    def detect(self, _rgb_frame, timestamp_ms=None):
+        ts = self._timestamp(timestamp_ms)
+        hand = self._hands[self.frames % len(self._hands)]
+        self.frames += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return self._emit(
+            HandResult(
+                [] if hand is None else [hand],
+                [] if hand is None else ["Right"],
+                ts,
+                self.latency_ms,
+            )
+        )
+
+
+def create_backend(
+    config: HandBackendConfig, on_result: Callable[[HandResult], None] | None = None
+) -> HandBackend:
+    """Build the backend named by `config.name`."""
+    if config.name == "solutions":
+        return SolutionsBackend(config, on_result)
+    if config.name in ("tasks_video", "tasks_live_stream"):
+        return TasksBackend(config, config.name == "tasks_live_stream", on_result)
+    if config.name == "stub":
+        return StubBackend(config, on_result)
+    raise ValueError(f"Unknown hand backend {config.name!r}; choose from {BACKENDS}")
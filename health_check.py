@@ -6,7 +6,7 @@ System health check for the Makaton Gesture Recognition Tool.
 This script checks:
 - Python version
 - OpenCV installation and version
-- MediaPipe availability
+- MediaPipe availability and the configured hand-landmark backend
 - Config file loading
 - Logging setup
 - Webcam availability
@@ -21,6 +21,7 @@ from __future__ import annotations
 import logging
 import sys
 import time
+from dataclasses import replace
 from pathlib import Path
 
 try:
@@ -43,6 +44,29 @@ try:
 except ImportError:  # pragma: no cover
     load_config = None  # type: ignore[assignment]
 
+try:
+    from hand_backends import create_backend
+except ImportError:  # pragma: no cover
+    create_backend = None  # type: ignore[assignment]
+
+
+def _create_hand_backend():
+    """
+    The hand backend configured in config.yaml (legacy solutions by default).
+
+    `tasks_live_stream` is swapped for `tasks_video`: the same model, but
+    `detect()` waits for its result, so the smoke test measures detection
+    rather than how fast frames can be submitted.
+    """
+    from config_loader import HandBackendConfig
+
+    backend_config = (
+        load_config().hand_backend if load_config is not None else HandBackendConfig()
+    )
+    if backend_config.name == "tasks_live_stream":
+        backend_config = replace(backend_config, name="tasks_video")
+    return create_backend(backend_config)
+
 
 def setup_logger() -> logging.Logger:
     if setup_logging is not None:
@@ -89,15 +113,24 @@ def check_mediapipe(logger: logging.Logger) -> bool:
         logger.error("Mediapipe is not installed")
         print_status("MediaPipe", False, "mediapipe not importable")
         return False
+    if create_backend is None:
+        logger.error("hand_backends could not be imported")
+        print_status("MediaPipe", False, "hand_backends not importable")
+        return False
     try:
-        _ = mp.solutions.hands.Hands
-        details = "MediaPipe Hands solution available"
+        backend = _create_hand_backend()
+        capabilities = backend.capabilities
+        backend.close()
+        details = (
+            f"hand backend '{capabilities.name}' available"
+            f"{' (asynchronous)' if capabilities.asynchronous else ''}"
+        )
         logger.info(details)
         print_status("MediaPipe", True, details)
         return True
     except Exception as exc:  # pragma: no cover
         logger.exception("Error while checking Mediapipe: %s", exc)
-        print_status("MediaPipe", False, "Hands solution not available")
+        print_status("MediaPipe", False, f"hand backend not available: {exc}")
         return False
 
 
@@ -174,7 +207,7 @@ def quick_fps_smoke_test(logger: logging.Logger, camera_index: int = 0) -> bool:
     Run a very small FPS test over a limited number of frames
     to confirm basic real-time performance.
     """
-    if cv2 is None or mp is None:
+    if cv2 is None or mp is None or create_backend is None:
         print_status("FPS smoke test", False, "cv2 or mediapipe unavailable")
         return False
 
@@ -184,26 +217,36 @@ def quick_fps_smoke_test(logger: logging.Logger, camera_index: int = 0) -> bool:
         print_status("FPS smoke test", False, "cannot open webcam")
         return False
 
-    mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands(max_num_hands=1)
-
-    frame_count = 0
-    start_time = time.perf_counter()
-
-    while frame_count < num_frames:
-        ok, frame = cap.read()
-        if not ok:
-            logger.warning("Failed to read frame %s during FPS smoke test", frame_count)
-            break
-
-        # BGR -> RGB
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        _ = hands.process(rgb)
-        frame_count += 1
-
-    end_time = time.perf_counter()
-    cap.release()
-    hands.close()
+    hands = None
+    try:
+        try:
+            hands = _create_hand_backend()
+        except Exception as exc:
+            logger.exception("Could not create hand backend: %s", exc)
+            print_status("FPS smoke test", False, f"hand backend unavailable: {exc}")
+            return False
+
+        frame_count = 0
+        start_time = time.perf_counter()
+
+        while frame_count < num_frames:
+            ok, frame = cap.read()
+            if not ok:
+                logger.warning(
+                    "Failed to read frame %s during FPS smoke test", frame_count
+                )
+                break
+
+            # BGR -> RGB
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            _ = hands.detect(rgb)
+            frame_count += 1
+
+        end_time = time.perf_counter()
+    finally:
+        cap.release()
+        if hands is not None:
+            hands.close()
 
     if frame_count == 0:
         print_status("FPS smoke test", False, "no frames processed")
@@ -0,0 +1,188 @@
+"""
+Per-hand landmark tracking between sparse detections.
+
+Raw MediaPipe landmarks jitter by a few pixels from frame to frame, enough
+to flip `recognize_gesture()` across its distance thresholds, and when
+detection is skipped the output simply freezes. `LandmarkTracker` keeps a
+One-Euro filter per hand, vectorised over all 21 x (x, y, z) coordinates:
+
+- on detection frames, `update()` smooths the new landmarks. The cut-off
+  frequency rises with hand speed, so a still hand is heavily smoothed while
+  a moving one is followed with little lag;
+- on skipped frames, `predict()` extrapolates with the filtered velocity
+  (capped at `max_predict_s` after the last detection);
+- `hold()` returns the last estimate unchanged, for frames the motion gate
+  has already judged static.
+
+With `detect_every: N`, hand detection runs on every Nth frame only and the
+frames in between are predicted, so inference can run at a fraction of the
+display rate while the gesture label stays stable.
+
+Reference: Casiez, Roussel, Vogel, "1 Euro Filter" (CHI 2012).
+"""
+
+from __future__ import annotations
+
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from config_loader import TrackingConfig
+
+# A detection further than this (normalised wrist distance) from every
+# existing track starts a new track instead of updating one.
+MATCH_MAX_DIST = 0.25
+
+
+class Landmark(NamedTuple):
+    """Minimal stand-in for a MediaPipe landmark, accepted by recognize_gesture()."""
+
+    x: float
+    y: float
+    z: float
+
+
+def landmarks_to_array(landmarks) -> np.ndarray:
+    """MediaPipe landmarks (or (x, y, z) tuples) -> float array of shape (21, 3)."""
+    return np.array(
+        [
+            lm if isinstance(lm, (tuple, list)) else (lm.x, lm.y, lm.z)
+            for lm in landmarks
+        ],
+        dtype=np.float64,
+    )
+
+
+def as_landmarks(points: np.ndarray) -> list[Landmark]:
+    return [Landmark(*p) for p in points.tolist()]
+
+
+def _alpha(cutoff: np.ndarray | float, dt: float) -> np.ndarray | float:
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """One-Euro filter over an (N, 3) array of points, with velocity prediction."""
+
+    def __init__(
+        self, min_cutoff: float = 1.5, beta: float = 5.0, d_cutoff: float = 1.0
+    ):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.x: np.ndarray | None = None
+        self.dx: np.ndarray | None = None
+        self.t: float | None = None
+
+    def update(self, x: np.ndarray, t: float) -> np.ndarray:
+        if self.x is None:
+            self.x = x.copy()
+            self.dx = np.zeros_like(x)
+            self.t = t
+            return self.x.copy()
+        dt = max(t - self.t, 1e-6)
+        dx = (x - self.x) / dt
+        self.dx += _alpha(self.d_cutoff, dt) * (dx - self.dx)
+        # One cut-off per point, from the speed of that point.
+        speed = np.linalg.norm(self.dx, axis=-1, keepdims=True)
+        cutoff = self.min_cutoff + self.beta * speed
+        self.x += _alpha(cutoff, dt) * (x - self.x)
+        self.t = t
+        return self.x.copy()
+
+    def hold(self, x: np.ndarray, t: float) -> None:
+        """Pin the filter at `x` with zero velocity, e.g. while nothing moves."""
+        if self.x is None:
+            return
+        self.x = x.copy()
+        self.dx = np.zeros_like(x)
+        self.t = t
+
+    def predict(self, t: float, max_horizon_s: float = math.inf) -> np.ndarray:
+        """Extrapolate the filtered position to time `t`."""
+        horizon = min(max(t - self.t, 0.0), max_horizon_s)
+        return self.x + self.dx * horizon
+
+
+class _Track:
+    def __init__(self, filt: OneEuroFilter):
+        self.filter = filt
+        self.missed = 0
+        self.estimate: np.ndarray | None = None
+
+
+class LandmarkTracker:
+    """Keep one filtered landmark track per visible hand."""
+
+    def __init__(self, config: TrackingConfig | None = None):
+        self.config = config or TrackingConfig(enabled=True)
+        self.tracks: list[_Track] = []
+        # Frames since hand detection last ran; starts "overdue" so frame 1 detects.
+        self._since_detection = self.config.detect_every
+        self.detections = 0
+        self.predictions = 0
+
+    def detection_due(self) -> bool:
+        """True when hand detection should run on the current frame."""
+        return self._since_detection + 1 >= self.config.detect_every
+
+    def update(self, detections: list[np.ndarray], t: float) -> list[np.ndarray]:
+        """Smooth fresh detections; tracks with no detection are predicted."""
+        self._since_detection = 0
+        self.detections += 1
+        unmatched = list(self.tracks)
+        for points in detections:
+            track = self._match(points, unmatched)
+            if track is None:
+                track = _Track(
+                    OneEuroFilter(
+                        self.config.min_cutoff, self.config.beta, self.config.d_cutoff
+                    )
+                )
+                self.tracks.append(track)
+            else:
+                unmatched.remove(track)
+            track.missed = 0
+            track.estimate = track.filter.update(points, t)
+        for track in unmatched:
+            track.missed += 1
+            track.estimate = track.filter.predict(t, self.config.max_predict_s)
+        self.tracks = [tr for tr in self.tracks if tr.missed <= self.config.max_missed]
+        return self.current()
+
+    def predict(self, t: float) -> list[np.ndarray]:
+        """Estimate landmarks for a frame on which detection did not run."""
+        self._since_detection += 1
+        self.predictions += 1
+        for track in self.tracks:
+            track.estimate = track.filter.predict(t, self.config.max_predict_s)
+        return self.current()
+
+    def hold(self, t: float) -> list[np.ndarray]:
+        """
+        Last estimates unchanged, for frames with no motion at all. The
+        filters stop at those estimates with zero velocity, so prediction
+        after a still period does not extrapolate a stale velocity.
+        """
+        self._since_detection += 1
+        for track in self.tracks:
+            track.filter.hold(track.estimate, t)
+        return self.current()
+
+    def current(self) -> list[np.ndarray]:
+        return [track.estimate for track in self.tracks]
+
+    def reset(self) -> None:
+        self.tracks = []
+        self._since_detection = self.config.detect_every
+
+    @staticmethod
+    def _match(points: np.ndarray, tracks: list[_Track]) -> _Track | None:
+        best, best_dist = None, MATCH_MAX_DIST
+        for track in tracks:
+            dist = float(np.linalg.norm(track.estimate[0, :2] - points[0, :2]))
+            if dist < best_dist:
+                best, best_dist = track, dist
+        return best
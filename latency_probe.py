@@ -0,0 +1,440 @@
+"""
+Glass-to-label latency probe.
+
+Measures what a signer actually feels: the time from a frame coming into
+existence at the camera to its gesture being shown in `gesture_label`,
+including camera buffering, Tk scheduling (`after(REFRESH_MS)`), hand
+detection, gesture rules and the GUI update itself.
+
+Frames come from `StampedSource`, a camera stand-in that produces frames on
+a fixed clock (`--fps`) with a driver queue of `--buffer-size` frames, so a
+slow consumer either reads old frames or skips frames the way a webcam
+does. Every frame carries its sequence number and "glass" time
+(`perf_counter_ns()` when the frame existed) as a block barcode in two
+corners, protected by a CRC. The probe reads the barcode back from the
+frame handed to `show_result()`, after landmarks are drawn, and times it
+when Tk has redrawn the label. Nothing is passed alongside the frame, so
+every queue, copy and conversion in between is covered.
+
+Reported:
+- latency distribution (mean, p50/p90/p99/max and a histogram)
+- dropped frames (sequence numbers never shown) and the gaps between shown
+  frames, reordered frames, repeated frames and unreadable barcodes
+
+The single-process GUI path is driven by default; `--headless` calls the
+GUI's own `process_frame()` without Tk, sleeping `gui.refresh_ms` between
+frames like the GUI's `after()` loop, and leaves out only the image and
+label redraw. With an
+asynchronous backend (`tasks_live_stream`) the label may come from an
+earlier frame than the one it is shown with; the probe times the shown
+frame. Per-frame records are written to logs/latency_<timestamp>.csv.
+
+Usage:
+    python latency_probe.py --frames 600 --backend stub --stub-latency-ms 15
+    python latency_probe.py --headless --buffer-size 4 --grab-latest
+    python latency_probe.py --fps 0 --budget-ms 50   # unpaced; exit 1 over budget
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import logging
+import statistics
+import struct
+import sys
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from config_loader import AppConfig, load_config
+from hand_backends import BACKENDS, create_backend
+from logging_config import LOG_DIR, setup_logging
+from soak_benchmark import SyntheticSource
+
+logger = logging.getLogger(__name__)
+
+# Barcode layout: 128 bits (seq u32, glass time u64, CRC32) as 4 x 32 blocks
+# of BLOCK x BLOCK pixels, black or white in every channel so that colour
+# conversions leave it intact.
+BLOCK = 4
+_ROWS, _COLS = 4, 32
+STAMP_SHAPE = (_ROWS * BLOCK, _COLS * BLOCK)
+
+# Upper bounds (ms) of the latency histogram buckets.
+HISTOGRAM_MS = (10, 20, 33, 50, 67, 100, 150, 250, 500, float("inf"))
+
+
+def _stamp_patch(seq: int, glass_ns: int) -> np.ndarray:
+    payload = struct.pack("<IQ", seq & 0xFFFFFFFF, glass_ns)
+    payload += struct.pack("<I", zlib.crc32(payload))
+    bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8)).reshape(_ROWS, _COLS)
+    return np.kron(bits, np.ones((BLOCK, BLOCK), dtype=np.uint8)) * np.uint8(255)
+
+
+def embed_stamp(frame: np.ndarray, seq: int, glass_ns: int) -> np.ndarray:
+    """Write the barcode into the top-left and bottom-right corners, in place."""
+    h, w = STAMP_SHAPE
+    patch = _stamp_patch(seq, glass_ns)[:, :, None]
+    frame[:h, :w] = patch
+    frame[-h:, -w:] = patch
+    return frame
+
+
+def read_stamp(frame: np.ndarray) -> tuple[int, int] | None:
+    """(seq, glass_ns) from either corner, or None if both are damaged."""
+    h, w = STAMP_SHAPE
+    for region in (frame[:h, :w], frame[-h:, -w:]):
+        if region.shape[:2] != STAMP_SHAPE:
+            return None
+        blocks = region.reshape(_ROWS, BLOCK, _COLS, BLOCK, -1).mean(axis=(1, 3, 4))
+        payload = np.packbits(blocks > 127).tobytes()
+        seq, glass_ns, crc = struct.unpack("<IQI", payload)
+        if crc == zlib.crc32(payload[:12]):
+            return seq, glass_ns
+    return None
+
+
+class StampedSource(SyntheticSource):
+    """
+    Camera stand-in with a real clock: frame N exists at start + N / fps and
+    the driver keeps the newest `buffer_size` frames. `grab()` waits for the
+    next frame, or returns the oldest one still queued if the caller is late.
+    `fps=0` produces a fresh frame on every grab (no camera period).
+    """
+
+    def __init__(
+        self,
+        width: int = 640,
+        height: int = 480,
+        fps: float = 30.0,
+        buffer_size: int = 1,
+    ):
+        super().__init__(width, height, fps)
+        self.buffer_size = max(1, buffer_size)
+        self.seq = -1
+        self.glass_ns = 0
+        self._start_ns: int | None = None
+
+    def grab(self) -> bool:
+        if not self._opened:
+            return False
+        now = time.perf_counter_ns()
+        if self._start_ns is None:
+            self._start_ns = now
+        if self.fps <= 0:
+            self.seq += 1
+            self.glass_ns = now
+        else:
+            newest = int((now - self._start_ns) * self.fps // 1e9)
+            next_seq = self.seq + 1
+            if next_seq > newest:
+                due_ns = self._start_ns + int(next_seq * 1e9 / self.fps)
+                time.sleep(max(0, due_ns - now) / 1e9)
+                newest = next_seq
+            # Frames older than the driver queue have been overwritten.
+            self.seq = max(next_seq, newest - self.buffer_size + 1)
+            self.glass_ns = self._start_ns + int(self.seq * 1e9 / self.fps)
+        self.frames = self.seq  # moves the synthetic block
+        return True
+
+    def retrieve(self) -> tuple[bool, np.ndarray | None]:
+        ok, frame = super().retrieve()
+        if ok:
+            embed_stamp(frame, self.seq, self.glass_ns)
+        return ok, frame
+
+
+@dataclass
+class LatencyReport:
+    frames_shown: int
+    frames_emitted: int  # up to the last shown sequence number
+    dropped: int
+    reordered: int
+    repeated: int
+    unreadable: int
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    histogram: list[tuple[float, int]] = field(default_factory=list)
+    gaps: dict[int, int] = field(default_factory=dict)  # seq step -> count
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class LatencyProbe:
+    """Collect glass-to-label times from the stamps of displayed frames."""
+
+    def __init__(self):
+        self.records: list[tuple[int, int, int]] = []  # seq, glass_ns, label_ns
+        self.unreadable = 0
+        self.reordered = 0
+        self.repeated = 0
+        self._seen: set[int] = set()
+        self._last_seq = -1
+
+    @property
+    def frames_shown(self) -> int:
+        return len(self.records)
+
+    @property
+    def frames_seen(self) -> int:
+        """Every frame observed, including repeated and unreadable ones."""
+        return len(self.records) + self.repeated + self.unreadable
+
+    def finished(self, frames: int) -> bool:
+        return self.frames_seen >= frames
+
+    def observe(self, frame: np.ndarray, label_ns: int | None = None) -> float | None:
+        """Record a displayed frame; returns its latency in ms if it is new."""
+        label_ns = time.perf_counter_ns() if label_ns is None else label_ns
+        stamp = read_stamp(frame)
+        if stamp is None:
+            self.unreadable += 1
+            return None
+        seq, glass_ns = stamp
+        if seq in self._seen:
+            self.repeated += 1
+            return None
+        if seq < self._last_seq:
+            self.reordered += 1
+        self._seen.add(seq)
+        self._last_seq = seq
+        self.records.append((seq, glass_ns, label_ns))
+        return (label_ns - glass_ns) / 1e6
+
+    def report(self) -> LatencyReport:
+        latencies = [(label - glass) / 1e6 for _, glass, label in self.records]
+        ordered = sorted(latencies)
+        seqs = sorted(self._seen)
+        emitted = seqs[-1] + 1 if seqs else 0
+        histogram = []
+        lower = float("-inf")
+        for upper in HISTOGRAM_MS:
+            histogram.append(
+                (upper, sum(lower < latency <= upper for latency in ordered))
+            )
+            lower = upper
+        gaps = Counter(b - a for a, b in zip(seqs, seqs[1:], strict=False))
+        if not ordered:
+            ordered = [0.0]
+        return LatencyReport(
+            frames_shown=len(latencies),
+            frames_emitted=emitted,
+            dropped=emitted - len(seqs),
+            reordered=self.reordered,
+            repeated=self.repeated,
+            unreadable=self.unreadable,
+            mean_ms=statistics.mean(ordered),
+            p50_ms=_percentile(ordered, 0.5),
+            p90_ms=_percentile(ordered, 0.9),
+            p99_ms=_percentile(ordered, 0.99),
+            max_ms=ordered[-1],
+            histogram=histogram,
+            gaps=dict(sorted(gaps.items())),
+        )
+
+
+class _NullWidget:
+    """Stands in for the Tk widgets `update_phrases()` writes to."""
+
+    def config(self, **_options) -> None:
+        pass
+
+    def insert(self, *_args) -> None:
+        pass
+
+
+def run_headless(
+    source, config: AppConfig, probe: LatencyProbe, frames: int, hands=None
+) -> None:
+    """
+    Drive the GUI's own `process_frame()` (motion gate, tracker, backend,
+    rules, recorder, phrase decoder, speech and fleet reporting) without Tk,
+    sleeping `gui.refresh_ms` between frames like `after()`. Only the
+    PhotoImage and label redraw inside `show_result()` are left out.
+    """
+    gui = _load_gui(config)
+    own_hands = hands is None
+    saved = (gui.show_result, gui.phrase_label, gui.log_listbox, gui.hands)
+
+    def headless_show_result(rgb_frame, gesture, _log_event=True):
+        gui.update_phrases(gesture)
+        probe.observe(rgb_frame)
+
+    gui.show_result = headless_show_result
+    gui.phrase_label = gui.log_listbox = _NullWidget()
+    gui.hands = create_backend(config.hand_backend) if own_hands else hands
+    gui.cap = source
+    gui.last_hand_result = None
+    gui.motion_gate.reset()
+    if gui.tracker is not None:
+        gui.tracker.reset()
+    try:
+        while not probe.finished(frames):
+            if not gui.process_frame():
+                logger.warning("Frame source ended after %s frames", probe.frames_seen)
+                break
+            time.sleep(config.gui.refresh_ms / 1000)
+    finally:
+        if own_hands:
+            gui.hands.close()
+        gui.cap = None
+        gui.show_result, gui.phrase_label, gui.log_listbox, gui.hands = saved
+
+
+def _load_gui(config: AppConfig):
+    """The GUI module, with the probe's camera and backend settings applied."""
+    import makaton_gesture_recognition as gui
+
+    # The GUI reads these from its own config object on every frame.
+    gui.config.camera = config.camera
+    gui.config.hand_backend = config.hand_backend
+    return gui
+
+
+def run_gui(source, config: AppConfig, probe: LatencyProbe, frames: int) -> None:
+    """Run the real Tk main loop on `source` and probe every `show_result()`."""
+    gui = _load_gui(config)
+    if gui.PIPELINE_MODE != "single":
+        logger.warning("The probe drives the single-process GUI path only")
+        gui.PIPELINE_MODE = "single"
+    window = gui.build_ui()
+    show_result = gui.show_result
+
+    def probed_show_result(rgb_frame, gesture, log_event=True):
+        show_result(rgb_frame, gesture, log_event)
+        # label.config() queued Tk's redraw as an idle handler; an idle
+        # callback queued after it runs once the label is on screen.
+        window.after_idle(observe, rgb_frame)
+
+    def observe(rgb_frame):
+        probe.observe(rgb_frame)
+        if probe.finished(frames):
+            gui.exit_app()
+
+    gui.show_result = probed_show_result
+    gui.cap = source
+    try:
+        window.after(0, gui.start_video)
+        window.mainloop()
+    finally:
+        gui.show_result = show_result
+
+
+def write_records(probe: LatencyProbe, output_dir: Path = LOG_DIR) -> Path:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"latency_{datetime.now():%Y%m%d_%H%M%S}.csv"
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["seq", "glass_ns", "label_ns", "latency_ms"])
+        for seq, glass_ns, label_ns in probe.records:
+            writer.writerow(
+                [seq, glass_ns, label_ns, f"{(label_ns - glass_ns) / 1e6:.3f}"]
+            )
+    return path
+
+
+def print_report(report: LatencyReport) -> None:
+    print("\n=== Glass-to-Label Latency ===")
+    print(f"Frames shown:      {report.frames_shown} of {report.frames_emitted}")
+    print(
+        f"Dropped:           {report.dropped} "
+        f"({report.dropped / max(1, report.frames_emitted) * 100:.1f}%)"
+    )
+    print(f"Reordered:         {report.reordered}")
+    print(f"Repeated:          {report.repeated}")
+    print(f"Unreadable:        {report.unreadable}")
+    print(
+        f"Latency:           mean {report.mean_ms:.1f} ms, p50 {report.p50_ms:.1f}, "
+        f"p90 {report.p90_ms:.1f}, p99 {report.p99_ms:.1f}, max {report.max_ms:.1f}"
+    )
+    print("\nLatency histogram:")
+    lower = 0.0
+    for upper, count in report.histogram:
+        if count:
+            label = f"> {lower:g} ms" if upper == float("inf") else f"<= {upper:g} ms"
+            share = count / max(1, report.frames_shown)
+            print(f"  {label:>10} {count:>6}  {'#' * round(share * 40)}")
+        lower = upper
+    print("\nSequence step between shown frames (1 = nothing dropped):")
+    for step, count in report.gaps.items():
+        print(f"  {step:>4} {count:>6}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=300, help="frames to show")
+    parser.add_argument(
+        "--fps", type=float, default=30.0, help="camera rate, 0 = frame on demand"
+    )
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument(
+        "--buffer-size", type=int, default=1, help="frames queued by the camera"
+    )
+    parser.add_argument(
+        "--grab-latest", action="store_true", help="drain queued frames first"
+    )
+    parser.add_argument(
+        "--backend", choices=BACKENDS, help="hand backend (default: config.yaml)"
+    )
+    parser.add_argument(
+        "--stub-latency-ms", type=float, help="simulated inference time for stub"
+    )
+    parser.add_argument(
+        "--headless", action="store_true", help="run the frame loop without Tk"
+    )
+    parser.add_argument(
+        "--budget-ms", type=float, help="exit with 1 when p90 latency exceeds this"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    setup_logging()
+    args = parse_args(argv)
+    config = load_config()
+    if args.backend is not None:
+        config.hand_backend.name = args.backend
+    if args.stub_latency_ms is not None:
+        config.hand_backend.stub_latency_ms = args.stub_latency_ms
+    if args.grab_latest:
+        config.camera.grab_latest = True
+
+    source = StampedSource(args.width, args.height, args.fps, args.buffer_size)
+    probe = LatencyProbe()
+    logger.info(
+        "Probing %s latency over %s frames (%s backend, %s FPS, buffer %s)",
+        "headless" if args.headless else "GUI",
+        args.frames,
+        config.hand_backend.name,
+        args.fps or "unpaced",
+        args.buffer_size,
+    )
+    if args.headless:
+        run_headless(source, config, probe, args.frames)
+    else:
+        run_gui(source, config, probe, args.frames)
+    source.release()
+
+    report = probe.report()
+    print_report(report)
+    print(f"\nRecords:           {write_records(probe)}")
+    if args.budget_ms is not None and report.p90_ms > args.budget_ms:
+        print(f"Result:            FAIL (p90 over {args.budget_ms:g} ms budget)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
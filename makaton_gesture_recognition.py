@@ -1,13 +1,26 @@
+import argparse
+import functools
 import logging
+import time
 import tkinter as tk
 
 import cv2
 import mediapipe as mp
-import numpy as np
 from PIL import Image, ImageTk
 
+from camera_capture import FrameAgeStats, open_camera, read_frame
 from config_loader import load_config
+from fleet_aggregator import FleetReporter
+from gesture_rules import GESTURE_DESCRIPTIONS, recognize_gesture
+from hand_backends import create_backend, to_landmark_list
+from landmark_filter import LandmarkTracker, landmarks_to_array
 from logging_config import setup_logging
+from motion_gate import MotionGate
+from phrase_decoder import GestureEventDetector, PhraseDecoder, load_lexicon
+from profiling import FrameProfiler
+from session_recorder import SessionRecorder
+from shared_frame_ring import MultiprocessPipeline, probe_frame_shape
+from speech_output import SpeechQueue, create_engine
 
 # -----------------------------
 # Logging & Config
@@ -17,106 +30,110 @@ setup_logging()
 logger = logging.getLogger(__name__)
 config = load_config()
 
-HELLO_MIN_DIST = config.gesture_thresholds.hello_min_distance
-GOODBYE_MAX_DIST = config.gesture_thresholds.goodbye_max_distance
 REFRESH_MS = config.gui.refresh_ms
 CAMERA_INDEX = config.camera.index
+PIPELINE_MODE = config.pipeline.mode
 
 # -----------------------------
 # Setup
 # -----------------------------
 
-# Initialize Mediapipe hands module
+# Hand-landmark backend (created in build_ui() so that worker processes
+# importing this module do not each build one); mp_hands is used for drawing
 mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(max_num_hands=1)
+hands = None
 mp_drawing = mp.solutions.drawing_utils
 
 # Video capture handle (created when "Start Video" is pressed)
 cap = None
+frame_age = FrameAgeStats()
 
-# Define the gesture descriptions
-GESTURE_DESCRIPTIONS = {
-    "Hello": "Open hand, palm facing forward, all fingers extended.",
-    "Goodbye": "Open hand, palm facing forward, moving fingers as if waving.",
-    "Please": "Flat hand, palm facing up, moving in a small circular motion.",
-    "Thank You": "Flat hand, palm facing up, moving away from the chin.",
-    "Yes": "Fist with thumb up.",
-}
+# Skips hand detection on static scenes; the last result is reused meanwhile
+motion_gate = MotionGate(config.motion_gate)
+last_hand_result = None
 
+# Smooths landmarks and predicts them on frames where detection is skipped
+tracker = LandmarkTracker(config.tracking) if config.tracking.enabled else None
 
-# -----------------------------
-# Core logic
-# -----------------------------
+# Session recording (encoding happens on a background thread)
+recorder = SessionRecorder(config.recording)
 
+# Gesture-sequence-to-phrase decoding
+gesture_events = GestureEventDetector(hold_frames=config.phrases.hold_frames)
+phrase_decoder = (
+    PhraseDecoder(load_lexicon(config.phrases.lexicon_path), config.phrases.max_gap_s)
+    if config.phrases.enabled
+    else None
+)
 
-def recognize_gesture(landmarks):
-    """Recognize a gesture from Mediapipe hand landmarks."""
-    thumb_tip = landmarks[4]
-    index_tip = landmarks[8]
-    middle_tip = landmarks[12]
-    ring_tip = landmarks[16]
-    pinky_tip = landmarks[20]
-    wrist = landmarks[0]
-
-    def distance(p1, p2):
-        return np.sqrt((p1.x - p2.x) ** 2 + (p1.y - p2.y) ** 2)
-
-    # Distances and relative positions
-    thumb_index_dist = distance(thumb_tip, index_tip)
-    thumb_middle_dist = distance(thumb_tip, middle_tip)
-    thumb_ring_dist = distance(thumb_tip, ring_tip)
-    thumb_pinky_dist = distance(thumb_tip, pinky_tip)
-    wrist_index_dist = distance(wrist, index_tip)
-    wrist_thumb_dist = distance(wrist, thumb_tip)
-
-    # Simple gesture rules (placeholder logic)
-    if (
-        thumb_index_dist > HELLO_MIN_DIST
-        and thumb_middle_dist > HELLO_MIN_DIST
-        and thumb_ring_dist > HELLO_MIN_DIST
-        and thumb_pinky_dist > HELLO_MIN_DIST
-    ):
-        return "Hello"  # All fingers extended
-    elif (
-        thumb_index_dist < GOODBYE_MAX_DIST
-        and thumb_middle_dist < GOODBYE_MAX_DIST
-        and thumb_ring_dist < GOODBYE_MAX_DIST
-        and thumb_pinky_dist < GOODBYE_MAX_DIST
-    ):
-        return "Goodbye"  # Fingers together, waving
-    elif wrist_thumb_dist < wrist_index_dist and thumb_tip.y < wrist.y:
-        return "Please"  # Flat hand, palm up
-    elif wrist_thumb_dist < wrist_index_dist and thumb_tip.y > wrist.y:
-        return "Thank You"  # Flat hand moving away from chin
-    elif thumb_tip.x < index_tip.x:
-        return "Yes"  # Fist with thumb up
-    logger.debug("No gesture matched current landmark configuration")
-    return None
+# Spoken output (created in main() when speech.enabled; never blocks the frame loop)
+speech = None
+SPEAK = config.speech.speak if phrase_decoder is not None else "gestures"
 
+# Fleet reporting to the classroom aggregator (created in build_ui() when
+# fleet.enabled; events are sent by a background thread)
+fleet = None
 
-def update_frame():
-    """Grab a frame, run hand detection + gesture recognition, update GUI."""
-    if cap is None or not cap.isOpened():
-        logger.warning("update_frame called but camera is not open")
-        return
+# Optional hot-path profiler (enabled with --profile N)
+profiler = None
 
-    ok, frame = cap.read()
-    if not ok:
-        logger.warning("Failed to read frame from webcam")
-        return
+# Multi-process pipeline (used instead of `cap` when pipeline.mode is "multiprocess")
+pipeline = None
+last_result = None
+last_shown_seq = 0  # ring sequence number of the frame on screen
 
-    # Convert BGR->RGB for Mediapipe
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    result = hands.process(rgb_frame)
+# Tk widgets (created in main())
+window = None
+video_label = None
+gesture_label = None
+description_label = None
+phrase_label = None
+log_listbox = None
+record_button = None
 
-    gesture = None
-    if result.multi_hand_landmarks:
-        for hand_landmarks in result.multi_hand_landmarks:
-            mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-            gesture = recognize_gesture(hand_landmarks.landmark)
 
-    # Display frame in Tk
-    img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+# -----------------------------
+# Core logic
+# -----------------------------
+
+
+def speak(text, kind):
+    """Queue `text` for speech if spoken output is on for this kind of event."""
+    if speech is not None and kind == SPEAK:
+        speech.say(text)
+
+
+def update_phrases(gesture):
+    """Feed the gesture stream to the phrase decoder and show its output."""
+    event = gesture_events.update(gesture)
+    if event is not None:
+        speak(event, "gestures")
+        if fleet is not None:
+            fleet.gesture(event)
+    if phrase_decoder is None:
+        return
+    now = time.perf_counter()
+    events = phrase_decoder.tick(now)
+    if event is not None:
+        events += phrase_decoder.push(event, now)
+    for phrase_event in events:
+        if phrase_event.kind == "final":
+            speak(phrase_event.phrase, "phrases")
+            phrase_label.config(text=f"Phrase: {phrase_event.phrase}")
+            log_listbox.insert(tk.END, f"Phrase: {phrase_event.phrase}")
+            logger.info(
+                "Recognised phrase: %s (%s, %.2f s)",
+                phrase_event.phrase,
+                " + ".join(phrase_event.gestures),
+                phrase_event.end_t - phrase_event.start_t,
+            )
+        else:
+            phrase_label.config(text=f"Phrase: {phrase_event.phrase} …")
+
+
+def show_result(rgb_frame, gesture, log_event=True):
+    """Display an RGB frame and the recognised gesture in Tk."""
+    img = Image.fromarray(rgb_frame)
     imgtk = ImageTk.PhotoImage(image=img)
 
     video_label.imgtk = imgtk  # keep a reference!
@@ -127,14 +144,162 @@ def update_frame():
         description_label.config(
             text=f"Description: {GESTURE_DESCRIPTIONS.get(gesture, '')}"
         )
-        log_listbox.insert(tk.END, f"Gesture: {gesture}")
-        logger.info("Recognised gesture: %s", gesture)
+        if log_event:
+            log_listbox.insert(tk.END, f"Gesture: {gesture}")
+            logger.info("Recognised gesture: %s", gesture)
     else:
         gesture_label.config(text="Gesture: None")
         description_label.config(text="Description: None")
 
-    # Schedule next frame using configured refresh rate
-    video_label.after(REFRESH_MS, update_frame)
+    update_phrases(gesture)
+
+
+def profiled(frame_fn):
+    """Run a frame callback under the profiler while --profile is active."""
+
+    @functools.wraps(frame_fn)
+    def wrapper():
+        if profiler is None or profiler.report_path is not None:
+            return frame_fn()
+        with profiler.frame():
+            frame_fn()
+        if profiler.done:
+            profiler.write_report()
+
+    return wrapper
+
+
+@profiled
+def update_frame_multiprocess():
+    """Show the newest shared-memory frame with the newest worker result."""
+    global last_result, last_shown_seq
+    if pipeline is None:
+        return
+    if not pipeline.running:
+        logger.warning("Multi-process pipeline stopped unexpectedly")
+        return
+
+    # The timer ticks faster than the camera; only a new frame is shown,
+    # recorded and counted, so phrase hold counts stay in camera frames.
+    latest = None
+    if pipeline.frames_captured() != last_shown_seq:
+        latest = pipeline.latest_frame()
+    if latest is not None:
+        last_shown_seq, frame = latest
+        # Results are collected with the frame so each one is logged once.
+        results = pipeline.poll_results()
+        if results:
+            last_result = max(results, key=lambda r: r.seq)
+        gesture = None
+        landmarks = None
+        if last_result is not None:
+            gesture = last_result.gesture
+            landmarks = last_result.landmarks
+            if landmarks:
+                mp_drawing.draw_landmarks(
+                    frame,
+                    to_landmark_list(landmarks),
+                    mp_hands.HAND_CONNECTIONS,
+                )
+        recorder.submit(frame, gesture, landmarks, rgb=True)
+        show_result(frame, gesture, log_event=bool(results))
+        if fleet is not None:
+            fleet.record_frame()
+
+    video_label.after(REFRESH_MS, update_frame_multiprocess)
+
+
+def run_detection(rgb_frame, timestamp_ms):
+    """Run the hand backend. Asynchronous backends may return None until ready."""
+    global last_hand_result
+    result = hands.detect(rgb_frame, timestamp_ms)
+    if result is not None:
+        last_hand_result = result
+
+
+def detect_hands(frame, rgb_frame, timestamp_ms=None):
+    """
+    Hand landmark lists for this frame.
+
+    Detection is skipped on static frames (motion gate) and, with tracking
+    enabled, between every `detect_every` frames; the tracker then predicts
+    the landmarks and smooths the detections it does get.
+    """
+    # The gate's reference frame only moves when detection actually runs.
+    moved = motion_gate.check(frame) or last_hand_result is None
+    if tracker is None:
+        if moved:
+            motion_gate.mark_processed()
+            run_detection(rgb_frame, timestamp_ms)
+        else:
+            motion_gate.mark_skipped()
+        return last_hand_result.multi_hand_landmarks if last_hand_result else []
+
+    now = time.perf_counter()
+    if not moved:
+        motion_gate.mark_skipped()
+        tracked = tracker.hold(now)
+    elif tracker.detection_due():
+        motion_gate.mark_processed()
+        run_detection(rgb_frame, timestamp_ms)
+        detected = last_hand_result.multi_hand_landmarks if last_hand_result else []
+        tracked = tracker.update(
+            [landmarks_to_array(h.landmark) for h in detected], now
+        )
+    else:
+        motion_gate.mark_skipped()
+        tracked = tracker.predict(now)
+    return [to_landmark_list(points.tolist()) for points in tracked]
+
+
+def process_frame():
+    """
+    Grab a frame, run hand detection + gesture recognition, update GUI.
+
+    Returns False when no frame could be read.
+    """
+    if cap is None or not cap.isOpened():
+        logger.warning("process_frame called but camera is not open")
+        return False
+
+    captured = read_frame(cap, grab_latest=config.camera.grab_latest)
+    if captured is None:
+        logger.warning("Failed to read frame from webcam")
+        return False
+    frame = captured.frame
+
+    # Convert BGR->RGB for Mediapipe
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    gesture = None
+    landmarks = None
+    timestamp_ms = captured.capture_ns // 1_000_000
+    for hand_landmarks in detect_hands(frame, rgb_frame, timestamp_ms):
+        mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+        gesture = recognize_gesture(hand_landmarks.landmark)
+        landmarks = hand_landmarks.landmark
+
+    recorder.submit(frame, gesture, landmarks)
+
+    # Display frame in Tk
+    show_result(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), gesture)
+    age_ms = frame_age.record(captured)
+    if fleet is not None:
+        fleet.record_frame(age_ms)
+    if frame_age.frames % frame_age.window == 0:
+        frame_age.log_summary(logger)
+        if config.motion_gate.enabled:
+            logger.info(
+                "Motion gate skipped %.0f%% of frames", motion_gate.skip_ratio * 100
+            )
+    return True
+
+
+@profiled
+def update_frame():
+    """Process one frame, then schedule the next using the configured refresh rate."""
+    if process_frame():
+        video_label.after(REFRESH_MS, update_frame)
 
 
 # -----------------------------
@@ -142,11 +307,42 @@ def update_frame():
 # -----------------------------
 
 
+def start_multiprocess_pipeline():
+    global pipeline, last_result, last_shown_seq
+    if pipeline is not None and pipeline.running:
+        return True
+    shape = probe_frame_shape(CAMERA_INDEX, config.camera)
+    if shape is None:
+        logger.error("Failed to open webcam on index %s", CAMERA_INDEX)
+        return False
+    logger.info("Starting multi-process capture on index %s", CAMERA_INDEX)
+    pipeline = MultiprocessPipeline(
+        CAMERA_INDEX,
+        shape,
+        num_workers=config.pipeline.num_workers,
+        num_slots=config.pipeline.num_slots,
+        backend=config.hand_backend,
+        camera=config.camera,
+    )
+    last_result = None
+    last_shown_seq = 0
+    pipeline.start()
+    return True
+
+
 def start_video():
-    global cap
+    global cap, last_hand_result
+    last_hand_result = None
+    motion_gate.reset()
+    if tracker is not None:
+        tracker.reset()
+    if PIPELINE_MODE == "multiprocess":
+        if start_multiprocess_pipeline():
+            update_frame_multiprocess()
+        return
     if cap is None or not cap.isOpened():
         logger.info("Starting webcam capture on index %s", CAMERA_INDEX)
-        cap = cv2.VideoCapture(CAMERA_INDEX)
+        cap = open_camera(CAMERA_INDEX, config.camera)
         if not cap.isOpened():
             logger.error("Failed to open webcam on index %s", CAMERA_INDEX)
             return
@@ -154,14 +350,28 @@ def start_video():
 
 
 def stop_video():
-    global cap
+    global cap, pipeline
     if cap is not None and cap.isOpened():
         logger.info("Stopping webcam capture")
         cap.release()
+    if pipeline is not None:
+        pipeline.stop()
+        pipeline = None
     video_label.config(image="")
     video_label.imgtk = None
 
 
+def toggle_recording():
+    if recorder.recording:
+        recorder.stop()
+        record_button.config(text="Start Recording")
+        return
+    # Frames arrive at the GUI loop rate, not the camera's nominal rate, so
+    # unless recording.fps is set the recorder measures it from the submits.
+    recorder.start()
+    record_button.config(text="Stop Recording")
+
+
 def clear_log():
     logger.info("Clearing gesture log in UI")
     log_listbox.delete(0, tk.END)
@@ -169,6 +379,12 @@ def clear_log():
 
 def exit_app():
     logger.info("Exiting application from GUI")
+    if recorder.recording:
+        recorder.stop()
+    if speech is not None:
+        speech.stop()
+    if fleet is not None:
+        fleet.stop()
     stop_video()
     window.destroy()
 
@@ -177,44 +393,125 @@ def exit_app():
 # Tkinter UI
 # -----------------------------
 
-window = tk.Tk()
-window.title("Makaton Gesture Recognition")
-
-video_label = tk.Label(window)
-video_label.pack()
-
-gesture_label = tk.Label(window, text="Gesture: None", font=("Helvetica", 16))
-gesture_label.pack()
-
-description_label = tk.Label(window, text="Description: None", font=("Helvetica", 16))
-description_label.pack()
-
-toolbar = tk.Frame(window)
-toolbar.pack(pady=5)
-
-start_button = tk.Button(toolbar, text="Start Video", command=start_video)
-start_button.pack(side=tk.LEFT, padx=10)
-
-stop_button = tk.Button(toolbar, text="Stop Video", command=stop_video)
-stop_button.pack(side=tk.LEFT, padx=10)
-
-clear_log_button = tk.Button(toolbar, text="Clear Log", command=clear_log)
-clear_log_button.pack(side=tk.LEFT, padx=10)
-
-exit_button = tk.Button(toolbar, text="Exit", command=exit_app)
-exit_button.pack(side=tk.LEFT, padx=10)
-
-log_listbox = tk.Listbox(window, width=50, height=10)
-log_listbox.pack(pady=10)
-
-# -----------------------------
-# Run
-# -----------------------------
-
-window.mainloop()
 
-# Cleanup
-if cap is not None and cap.isOpened():
-    cap.release()
-    logger.info("Application shutdown complete")
-cv2.destroyAllWindows()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Makaton Gesture Recognition Tool")
+    parser.add_argument(
+        "--profile",
+        type=int,
+        metavar="N",
+        default=0,
+        help="profile the first N frames and write a hot-path report to logs/ "
+        "(not available with pipeline.mode: multiprocess)",
+    )
+    args = parser.parse_args(argv)
+    if args.profile and PIPELINE_MODE == "multiprocess":
+        # The work runs in worker processes, which the in-process profiler cannot see.
+        parser.error("--profile needs pipeline.mode: single in config.yaml")
+    return args
+
+
+def build_ui():
+    """Create the detector, speech, fleet reporter and widgets. Returns the window."""
+    global hands, window, video_label, gesture_label, description_label, log_listbox
+    global phrase_label
+    global record_button, speech, fleet
+
+    if PIPELINE_MODE != "multiprocess":
+        hands = create_backend(config.hand_backend)
+
+    if config.speech.enabled:
+        speech = SpeechQueue(
+            create_engine(config.speech),
+            cache_size=config.speech.cache_size,
+            queue_size=config.speech.queue_size,
+        )
+        speech.start()
+        # Render the fixed vocabulary up front so the first utterances are instant.
+        vocabulary = list(GESTURE_DESCRIPTIONS)
+        if phrase_decoder is not None:
+            vocabulary = phrase_decoder.trie.phrases() + vocabulary
+        speech.prewarm(vocabulary)
+
+    if config.fleet.enabled:
+        fleet = FleetReporter(config.fleet)
+        fleet.start()
+
+    window = tk.Tk()
+    window.title("Makaton Gesture Recognition")
+    # Closing from the title bar must finalise the recording like the Exit button.
+    window.protocol("WM_DELETE_WINDOW", exit_app)
+
+    video_label = tk.Label(window)
+    video_label.pack()
+
+    gesture_label = tk.Label(window, text="Gesture: None", font=("Helvetica", 16))
+    gesture_label.pack()
+
+    description_label = tk.Label(
+        window, text="Description: None", font=("Helvetica", 16)
+    )
+    description_label.pack()
+
+    phrase_label = tk.Label(window, text="Phrase: None", font=("Helvetica", 16))
+    phrase_label.pack()
+
+    toolbar = tk.Frame(window)
+    toolbar.pack(pady=5)
+
+    start_button = tk.Button(toolbar, text="Start Video", command=start_video)
+    start_button.pack(side=tk.LEFT, padx=10)
+
+    stop_button = tk.Button(toolbar, text="Stop Video", command=stop_video)
+    stop_button.pack(side=tk.LEFT, padx=10)
+
+    record_button = tk.Button(toolbar, text="Start Recording", command=toggle_recording)
+    record_button.pack(side=tk.LEFT, padx=10)
+
+    clear_log_button = tk.Button(toolbar, text="Clear Log", command=clear_log)
+    clear_log_button.pack(side=tk.LEFT, padx=10)
+
+    exit_button = tk.Button(toolbar, text="Exit", command=exit_app)
+    exit_button.pack(side=tk.LEFT, padx=10)
+
+    log_listbox = tk.Listbox(window, width=50, height=10)
+    log_listbox.pack(pady=10)
+    return window
+
+
+def main(argv=None):
+    global profiler
+
+    args = parse_args(argv)
+    if args.profile:
+        profiler = FrameProfiler("gui", num_frames=args.profile)
+
+    build_ui()
+
+    # -----------------------------
+    # Run
+    # -----------------------------
+
+    try:
+        window.mainloop()
+    finally:
+        # Cleanup; the recorder's encoder is a daemon thread, so stop it here
+        # or the video is cut off without its index.
+        if recorder.recording:
+            recorder.stop()
+        if speech is not None:
+            speech.stop()
+        if fleet is not None:
+            fleet.stop()
+        if cap is not None and cap.isOpened():
+            cap.release()
+        if pipeline is not None:
+            pipeline.stop()
+        if hands is not None:
+            hands.close()
+        cv2.destroyAllWindows()
+        logger.info("Application shutdown complete")
+
+
+if __name__ == "__main__":
+    main()
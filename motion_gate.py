@@ -0,0 +1,91 @@
+"""
+Motion-gated inference.
+
+Most classroom frames contain no hand movement at all, yet each one pays for
+a full MediaPipe `hands.process()`. `MotionGate` compares a heavily
+downscaled grayscale copy of each frame against the frame that was last sent
+to inference. If too few pixels changed, the caller can skip inference and
+reuse the previous result. A forced re-check every `max_skip` frames keeps
+slow drifts (or a hand that stopped still mid-gesture) from being missed.
+
+`should_process()` decides and records in one call. Callers that may still
+skip detection for other reasons (the landmark tracker predicting between
+detections) use `check()` and then `mark_processed()` or `mark_skipped()`,
+so the reference frame only moves when detection really runs.
+"""
+
+from __future__ import annotations
+
+import cv2
+import numpy as np
+
+from config_loader import MotionGateConfig
+
+
+class MotionGate:
+    """Decide per frame whether hand detection needs to run again."""
+
+    def __init__(self, config: MotionGateConfig | None = None):
+        self.config = config or MotionGateConfig(enabled=True)
+        self._reference: np.ndarray | None = None
+        self._checked: np.ndarray | None = None  # thumbnail from the last check()
+        self._since_process = 0
+        self.last_score = 1.0
+        self.processed = 0
+        self.skipped = 0
+
+    def _thumbnail(self, frame_bgr: np.ndarray) -> np.ndarray:
+        height, width = frame_bgr.shape[:2]
+        small_w = min(self.config.width, width)
+        small_h = max(1, round(height * small_w / width))
+        # INTER_AREA averages pixels, which doubles as noise suppression.
+        small = cv2.resize(frame_bgr, (small_w, small_h), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def should_process(self, frame_bgr: np.ndarray) -> bool:
+        """Return True if inference should run on this frame."""
+        if self.check(frame_bgr):
+            self.mark_processed()
+            return True
+        self.mark_skipped()
+        return False
+
+    def check(self, frame_bgr: np.ndarray) -> bool:
+        """True if the frame changed enough to need inference; records nothing."""
+        if not self.config.enabled:
+            return True
+
+        thumb = self._thumbnail(frame_bgr)
+        self._checked = thumb
+        if self._reference is None or self._reference.shape != thumb.shape:
+            self.last_score = 1.0
+            return True
+        diff = cv2.absdiff(thumb, self._reference)
+        self.last_score = (
+            float(np.count_nonzero(diff > self.config.pixel_delta)) / diff.size
+        )
+        return (
+            self.last_score >= self.config.threshold
+            or self._since_process >= self.config.max_skip
+        )
+
+    def mark_processed(self) -> None:
+        """Inference ran on the last checked frame: it becomes the reference."""
+        if self._checked is not None:
+            self._reference = self._checked
+        self._since_process = 0
+        self.processed += 1
+
+    def mark_skipped(self) -> None:
+        self._since_process += 1
+        self.skipped += 1
+
+    @property
+    def skip_ratio(self) -> float:
+        total = self.processed + self.skipped
+        return self.skipped / total if total else 0.0
+
+    def reset(self) -> None:
+        self._reference = None
+        self._checked = None
+        self._since_process = 0
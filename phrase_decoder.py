@@ -0,0 +1,232 @@
+"""
+Incremental gesture-sequence-to-phrase decoder.
+
+Per-frame labels from `recognize_gesture()` are first turned into discrete
+gesture events by `GestureEventDetector` (a label must hold for a few frames
+and differ from the previous event). `PhraseDecoder` then matches the event
+stream against a phrase lexicon stored as a prefix trie:
+
+- each event advances every active match by one dictionary lookup, and the
+  number of active matches is bounded by the longest phrase, so the cost
+  per event does not depend on the size of the lexicon;
+- a `partial` event is emitted while a sequence is still a valid prefix,
+  together with the shortest phrase it could complete to;
+- a `final` event is emitted as soon as a phrase cannot be extended any
+  further, or when the signer pauses for longer than `max_gap_s`.
+
+The lexicon is a YAML file, see phrases.yaml.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TrieNode:
+    children: dict[str, TrieNode] = field(default_factory=dict)
+    phrase: str | None = None  # set when a phrase ends at this node
+    depth: int = 0
+    # Shortest phrase reachable from here, shown as the partial hypothesis.
+    best: str | None = None
+    best_depth: int = 0
+
+
+class PhraseTrie:
+    """Prefix trie mapping gesture sequences to phrases."""
+
+    def __init__(self) -> None:
+        self.root = TrieNode()
+        self.size = 0
+
+    def insert(self, gestures: list[str] | tuple[str, ...], phrase: str) -> None:
+        if not gestures:
+            raise ValueError("A phrase needs at least one gesture")
+        path = [self.root]
+        node = self.root
+        for gesture in gestures:
+            node = node.children.setdefault(gesture, TrieNode(depth=node.depth + 1))
+            path.append(node)
+        if node.phrase is None:
+            self.size += 1
+        node.phrase = phrase
+        for ancestor in path:
+            if ancestor.best is None or len(gestures) < ancestor.best_depth:
+                ancestor.best = phrase
+                ancestor.best_depth = len(gestures)
+
+    def lookup(self, gestures: list[str] | tuple[str, ...]) -> TrieNode | None:
+        node = self.root
+        for gesture in gestures:
+            node = node.children.get(gesture)
+            if node is None:
+                return None
+        return node
+
+    def phrases(self) -> list[str]:
+        """All phrases in the trie, shortest gesture sequences first."""
+        found = []
+        level = [self.root]
+        while level:
+            found += [node.phrase for node in level if node.phrase is not None]
+            level = [child for node in level for child in node.children.values()]
+        return found
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def load_lexicon(path: str | Path = "phrases.yaml") -> PhraseTrie:
+    """Build a trie from a YAML lexicon of `{gestures: [...], phrase: "..."}` entries."""
+    trie = PhraseTrie()
+    path_obj = Path(path)
+    if not path_obj.exists():
+        logger.warning("Phrase lexicon %s not found. Phrases disabled.", path_obj)
+        return trie
+    with path_obj.open("r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    for entry in data.get("phrases") or []:
+        try:
+            trie.insert(entry["gestures"], entry["phrase"])
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Skipping malformed lexicon entry: %r", entry)
+    logger.info("Loaded %s phrases from %s", len(trie), path_obj)
+    return trie
+
+
+@dataclass(frozen=True)
+class PhraseEvent:
+    kind: str  # "partial" or "final"
+    phrase: str
+    gestures: tuple[str, ...]
+    start_t: float
+    end_t: float
+
+
+@dataclass(frozen=True)
+class _Match:
+    node: TrieNode
+    gestures: tuple[str, ...]
+    start_index: int
+    end_index: int
+    start_t: float
+    end_t: float
+
+    def advance(self, child: TrieNode, gesture: str, index: int, t: float) -> _Match:
+        return _Match(
+            child, (*self.gestures, gesture), self.start_index, index, self.start_t, t
+        )
+
+
+class GestureEventDetector:
+    """Turn per-frame gesture labels into discrete gesture events."""
+
+    def __init__(self, hold_frames: int = 3):
+        self.hold_frames = max(1, hold_frames)
+        self._candidate: str | None = None
+        self._count = 0
+        self._last_event: str | None = None
+
+    def update(self, gesture: str | None) -> str | None:
+        """Return a gesture once it has been stable for `hold_frames` frames."""
+        if gesture != self._candidate:
+            self._candidate = gesture
+            self._count = 0
+        self._count += 1
+        if self._count != self.hold_frames:
+            return None
+        if gesture is None:
+            # A stable "no gesture" lets the same gesture be signed twice in a row.
+            self._last_event = None
+            return None
+        if gesture == self._last_event:
+            return None
+        self._last_event = gesture
+        return gesture
+
+
+class PhraseDecoder:
+    """Streaming leftmost-longest decoder over a `PhraseTrie`."""
+
+    def __init__(self, trie: PhraseTrie, max_gap_s: float = 2.0):
+        self.trie = trie
+        self.max_gap_s = max_gap_s
+        self._active: list[_Match] = []
+        # Completed phrases not yet committed, kept even after their match
+        # stops advancing so a shorter phrase is not lost to a longer attempt.
+        self._completed: list[_Match] = []
+        self._index = 0
+        self._last_t: float | None = None
+
+    def push(self, gesture: str, t: float) -> list[PhraseEvent]:
+        """Consume one gesture event at time `t` and return phrase events."""
+        events = self.tick(t)
+        self._index += 1
+        self._last_t = t
+
+        advanced = []
+        for match in self._active:
+            child = match.node.children.get(gesture)
+            if child is not None:
+                advanced.append(match.advance(child, gesture, self._index, t))
+        start = self.trie.root.children.get(gesture)
+        if start is not None:
+            advanced.append(_Match(start, (gesture,), self._index, self._index, t, t))
+        self._active = advanced
+        self._completed += [m for m in advanced if m.node.phrase is not None]
+        events.extend(self._commit_ready())
+
+        if self._active:
+            best = min(self._active, key=lambda m: m.start_index)
+            events.append(
+                PhraseEvent("partial", best.node.best, best.gestures, best.start_t, t)
+            )
+        return events
+
+    def tick(self, t: float) -> list[PhraseEvent]:
+        """Finalise the pending phrase once the signer has paused long enough."""
+        if self._last_t is None or t - self._last_t <= self.max_gap_s:
+            return []
+        events = self._commit_ready(force=True)
+        self._active = []
+        self._completed = []
+        return events
+
+    def flush(self) -> list[PhraseEvent]:
+        """Finalise everything that is pending, e.g. when video stops."""
+        events = self._commit_ready(force=True)
+        self._active = []
+        self._completed = []
+        return events
+
+    def _commit_ready(self, force: bool = False) -> list[PhraseEvent]:
+        events = []
+        while self._completed:
+            # Leftmost start first, and the longest phrase from that start.
+            pending = min(self._completed, key=lambda m: (m.start_index, -m.end_index))
+            # Wait while a match starting at or before this one can still grow.
+            if not force and any(
+                m.start_index <= pending.start_index and m.node.children
+                for m in self._active
+            ):
+                break
+            events.append(self._final(pending))
+            self._active = [
+                m for m in self._active if m.start_index > pending.end_index
+            ]
+            self._completed = [
+                m for m in self._completed if m.start_index > pending.end_index
+            ]
+        return events
+
+    @staticmethod
+    def _final(match: _Match) -> PhraseEvent:
+        return PhraseEvent(
+            "final", match.node.phrase, match.gestures, match.start_t, match.end_t
+        )
@@ -0,0 +1,180 @@
+"""
+Built-in profiling mode for the GUI and benchmark entry points.
+
+`FrameProfiler` runs each of the next N frames under `cProfile` and keeps
+`tracemalloc` running alongside it. When the last frame finishes it writes
+three files to `logs/` so performance tickets come with evidence:
+
+- profile_<name>_<timestamp>_<id>.txt   hot functions (by total and
+                                        cumulative time) and a memory growth
+                                        summary
+- profile_<name>_<timestamp>_<id>.csv   per-frame time and allocation delta
+- profile_<name>_<timestamp>_<id>.prof  raw cProfile data (for snakeviz etc.)
+
+<id> is the process id and a per-process counter, so reports written in the
+same second do not overwrite each other.
+
+Usage:
+    profiler = FrameProfiler("gui", num_frames=300)
+    with profiler.frame():
+        process_one_frame()
+    if profiler.done:
+        profiler.write_report()
+"""
+
+from __future__ import annotations
+
+import cProfile
+import csv
+import io
+import itertools
+import logging
+import os
+import pstats
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from logging_config import LOG_DIR
+
+logger = logging.getLogger(__name__)
+
+TOP_FUNCTIONS = 30
+TOP_GROWTH = 15
+
+_report_ids = itertools.count(1)
+
+
+class FrameProfiler:
+    """Profile N frames with cProfile + tracemalloc and report to logs/."""
+
+    def __init__(
+        self,
+        name: str,
+        num_frames: int,
+        snapshot_every: int = 50,
+        output_dir: Path = LOG_DIR,
+        traceback_frames: int = 5,
+    ):
+        self.name = name
+        self.num_frames = num_frames
+        self.snapshot_every = max(1, snapshot_every)
+        self.output_dir = Path(output_dir)
+        self.traceback_frames = traceback_frames
+        self.frames = 0
+        self.frame_ms: list[float] = []
+        self.alloc_deltas: list[int] = []
+        self.snapshots: list[tuple[int, tracemalloc.Snapshot]] = []
+        self.report_path: Path | None = None
+        self._profile = cProfile.Profile()
+        self._started_tracemalloc = False
+
+    @property
+    def done(self) -> bool:
+        return self.frames >= self.num_frames
+
+    def _ensure_tracing(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.traceback_frames)
+            self._started_tracemalloc = True
+        if not self.snapshots:
+            self.snapshots.append((0, tracemalloc.take_snapshot()))
+
+    @contextmanager
+    def frame(self):
+        """Profile one frame. Does nothing once N frames have been recorded."""
+        if self.done:
+            yield
+            return
+        self._ensure_tracing()
+        mem_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        self._profile.enable()
+        try:
+            yield
+        finally:
+            self._profile.disable()
+            self.frame_ms.append((time.perf_counter() - start) * 1000)
+            self.alloc_deltas.append(tracemalloc.get_traced_memory()[0] - mem_before)
+            self.frames += 1
+            if self.frames % self.snapshot_every == 0 or self.done:
+                self.snapshots.append((self.frames, tracemalloc.take_snapshot()))
+
+    def hot_functions(
+        self, sort_key: str = "tottime", limit: int = TOP_FUNCTIONS
+    ) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.strip_dirs().sort_stats(sort_key).print_stats(limit)
+        return stream.getvalue()
+
+    def growth_summary(self, limit: int = TOP_GROWTH) -> list[str]:
+        """Top allocation sites that grew between the first and last snapshot."""
+        if len(self.snapshots) < 2:
+            return []
+        first = self.snapshots[0][1]
+        last = self.snapshots[-1][1]
+        stats = last.compare_to(first, "lineno")
+        return [str(stat) for stat in stats[:limit] if stat.size_diff > 0]
+
+    def snapshot_totals(self) -> list[tuple[int, int]]:
+        """(frame, traced bytes) at each snapshot, to spot steady growth."""
+        return [
+            (frame, sum(stat.size for stat in snap.statistics("filename")))
+            for frame, snap in self.snapshots
+        ]
+
+    def write_report(self) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stem = (
+            f"profile_{self.name}_{datetime.now():%Y%m%d_%H%M%S}"
+            f"_{os.getpid()}_{next(_report_ids)}"
+        )
+        report_path = self.output_dir / f"{stem}.txt"
+        self._profile.dump_stats(str(self.output_dir / f"{stem}.prof"))
+
+        with (self.output_dir / f"{stem}.csv").open(
+            "w", newline="", encoding="utf-8"
+        ) as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "time_ms", "alloc_delta_bytes"])
+            rows = zip(self.frame_ms, self.alloc_deltas, strict=True)
+            for i, (ms, delta) in enumerate(rows, 1):
+                writer.writerow([i, f"{ms:.3f}", delta])
+
+        lines = [f"=== Profile: {self.name} ({self.frames} frames) ===", ""]
+        if self.frame_ms:
+            lines += [
+                f"Frame time: mean {statistics.mean(self.frame_ms):.2f} ms, "
+                f"median {statistics.median(self.frame_ms):.2f} ms, "
+                f"max {max(self.frame_ms):.2f} ms",
+                f"Allocation delta per frame: mean {statistics.mean(self.alloc_deltas):.0f} B, "
+                f"max {max(self.alloc_deltas)} B, total {sum(self.alloc_deltas)} B",
+                "",
+            ]
+        lines.append("--- Traced memory at snapshots (frame: bytes) ---")
+        lines += [f"{frame}: {size}" for frame, size in self.snapshot_totals()]
+        lines += ["", "--- Memory growth, first vs last snapshot ---"]
+        lines += self.growth_summary() or ["(no growth)"]
+        lines += [
+            "",
+            "--- Hot functions by total time ---",
+            self.hot_functions("tottime"),
+        ]
+        lines += [
+            "--- Hot functions by cumulative time ---",
+            self.hot_functions("cumulative"),
+        ]
+        report_path.write_text("\n".join(lines), encoding="utf-8")
+
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.report_path = report_path
+        logger.info(
+            "Profile report for %s frames written to %s", self.frames, report_path
+        )
+        return report_path
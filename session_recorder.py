@@ -0,0 +1,232 @@
+"""
+Background session recorder.
+
+Teachers can record a session for later review. The live recognition path
+only ever calls `SessionRecorder.submit()`, which puts the annotated frame
+and its landmark/gesture data on a bounded queue and returns immediately.
+A background thread does the expensive part: encoding the video with
+`cv2.VideoWriter` and writing a JSON Lines stream of landmarks and gestures
+next to it. If the encoder falls behind and the queue is full, the frame is
+dropped and counted instead of blocking the Tk thread. When the frame rate
+is not known up front, it is measured from the first submitted frames.
+
+Each session produces two files in the output directory:
+- session_<timestamp>.mp4    annotated video
+- session_<timestamp>.jsonl  one line per recorded frame, plus a summary line
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from config_loader import RecordingConfig
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+# Without a known frame rate, the first frames are held back and the rate is
+# measured from their submit times, so the video plays at the right speed.
+FPS_PROBE_FRAMES = 30
+DEFAULT_FPS = 20.0
+
+
+@dataclass
+class _RecordedFrame:
+    frame: np.ndarray
+    rgb: bool
+    timestamp: float
+    seq: int
+    gesture: str | None
+    landmarks: list[list[float]] | None
+
+
+class SessionRecorder:
+    """Record annotated frames and landmark streams on a background thread."""
+
+    def __init__(self, config: RecordingConfig | None = None):
+        self.config = config or RecordingConfig()
+        self.video_path: Path | None = None
+        self.stream_path: Path | None = None
+        self.submitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.unencoded = 0  # frames in the landmark stream but not in the video
+        self._queue: queue.Queue = queue.Queue(maxsize=self.config.queue_size)
+        self._thread: threading.Thread | None = None
+        self._started_at = 0.0
+
+    @property
+    def recording(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, fps: float = 0.0) -> Path:
+        """Start a new session and return the path of the video file."""
+        if self.recording:
+            return self.video_path
+        out_dir = Path(self.config.output_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        stem = datetime.now().strftime("session_%Y%m%d_%H%M%S")
+        self.video_path = out_dir / f"{stem}.mp4"
+        self.stream_path = out_dir / f"{stem}.jsonl"
+        self.submitted = self.dropped = self.written = self.unencoded = 0
+        self._queue = queue.Queue(maxsize=self.config.queue_size)
+        self._started_at = time.perf_counter()
+
+        fps = self.config.fps or fps
+        self._thread = threading.Thread(
+            target=self._encode_loop, args=(fps,), name="session-recorder", daemon=True
+        )
+        self._thread.start()
+        logger.info("Recording session to %s", self.video_path)
+        return self.video_path
+
+    def submit(
+        self,
+        frame: np.ndarray,
+        gesture: str | None = None,
+        landmarks=None,
+        rgb: bool = False,
+    ) -> bool:
+        """
+        Queue one annotated frame without blocking.
+
+        `frame` is handed over to the encoder thread, so the caller must not
+        modify it afterwards. `landmarks` may be MediaPipe landmarks or
+        (x, y, z) tuples. Returns False if the frame was dropped.
+        """
+        if not self.recording:
+            return False
+        self.submitted += 1
+        if landmarks is not None:
+            landmarks = [
+                list(lm) if isinstance(lm, (tuple, list)) else [lm.x, lm.y, lm.z]
+                for lm in landmarks
+            ]
+        item = _RecordedFrame(
+            frame=frame,
+            rgb=rgb,
+            timestamp=time.perf_counter() - self._started_at,
+            seq=self.submitted,
+            gesture=gesture,
+            landmarks=landmarks,
+        )
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def stop(self, timeout: float = 5.0) -> dict[str, int]:
+        """Flush queued frames, close the files and return frame accounting."""
+        if self._thread is None:
+            return self.stats()
+        # The queue may be full; wait for the encoder to make room for the sentinel.
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Session recorder did not drain in time; stopping anyway")
+        self._thread.join(timeout=timeout)
+        self._thread = None
+        stats = self.stats()
+        logger.info(
+            "Recording stopped: %s written, %s dropped of %s submitted",
+            stats["written"],
+            stats["dropped"],
+            stats["submitted"],
+        )
+        return stats
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "unencoded": self.unencoded,
+        }
+
+    def _encode_loop(self, fps: float) -> None:
+        writer = None
+        video_failed = False
+        held: list[_RecordedFrame] = []  # frames waiting for the rate estimate
+        try:
+            with self.stream_path.open("w", encoding="utf-8") as stream:
+                while True:
+                    item = self._queue.get()
+                    stopping = item is _STOP
+                    if not stopping:
+                        held.append(item)
+                    ready = fps or stopping or len(held) >= FPS_PROBE_FRAMES
+                    if writer is None and not video_failed and held and ready:
+                        fps = fps or _measured_fps(held)
+                        writer = self._open_writer(held[0].frame, fps)
+                        video_failed = writer is None
+                    if writer is not None or video_failed:
+                        for held_item in held:
+                            self._write(held_item, writer, stream)
+                        held = []
+                    if stopping:
+                        break
+                stream.write(json.dumps({"summary": self.stats()}) + "\n")
+        except Exception:  # pragma: no cover
+            logger.exception("Session recorder failed")
+        finally:
+            if writer is not None:
+                writer.release()
+
+    def _open_writer(self, frame: np.ndarray, fps: float) -> cv2.VideoWriter | None:
+        height, width = frame.shape[:2]
+        fourcc = cv2.VideoWriter_fourcc(*self.config.codec)
+        writer = cv2.VideoWriter(str(self.video_path), fourcc, fps, (width, height))
+        if not writer.isOpened():
+            logger.error(
+                "Failed to open video writer for %s; recording landmarks only",
+                self.video_path,
+            )
+            writer.release()
+            return None
+        logger.info("Encoding %s at %.1f FPS", self.video_path, fps)
+        return writer
+
+    def _write(self, item: _RecordedFrame, writer, stream) -> None:
+        """Encode one frame (if the video is open) and add its stream line."""
+        frame_index = None
+        if writer is not None:
+            frame = item.frame
+            if item.rgb:
+                frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+            writer.write(frame)
+            frame_index = self.written
+            self.written += 1
+        else:
+            self.unencoded += 1
+        stream.write(
+            json.dumps(
+                {
+                    "frame": frame_index,  # None when the frame is not in the video
+                    "seq": item.seq,
+                    "t": round(item.timestamp, 4),
+                    "gesture": item.gesture,
+                    "landmarks": item.landmarks,
+                }
+            )
+            + "\n"
+        )
+
+
+def _measured_fps(items: list[_RecordedFrame]) -> float:
+    span = items[-1].timestamp - items[0].timestamp
+    if len(items) < 2 or span <= 0:
+        return DEFAULT_FPS
+    return (len(items) - 1) / span
@@ -0,0 +1,486 @@
+"""
+Shared-memory frame ring for the multi-process pipeline.
+
+A capture process writes RGB frames into a fixed number of equally sized
+slots inside one `multiprocessing.shared_memory` block. Inference worker
+processes read those slots in place (no pickling, no copying) and send only
+small `FrameResult` records back to the parent over a queue.
+
+Each slot carries a sequence number that works like a seqlock: the writer
+marks the slot as busy before overwriting it and publishes the new sequence
+number afterwards, so a reader can detect that a frame was overwritten while
+it was being processed and discard the result.
+
+Two scheduling policies are supported:
+- drop_stale=True (live GUI): workers always jump to the newest frame and
+  the capture process never waits, so old frames are simply overwritten.
+- drop_stale=False (benchmarks): workers take frames in order and the
+  capture process waits for a slot to be consumed before reusing it.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import queue
+import time
+from dataclasses import dataclass, replace
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config_loader import CameraConfig, HandBackendConfig
+
+logger = logging.getLogger(__name__)
+
+# Header layout (int64): [write_count, then per slot: seq, capture_ns, consumed_seq]
+_HEADER_ALIGN = 64
+_SLOT_FIELDS = 3
+_SLOT_BUSY = -1
+_POLL_S = 0.0005
+# How long capture waits for every inference worker to build its backend.
+WORKER_START_TIMEOUT_S = 60.0
+
+
+@dataclass(frozen=True)
+class RingSpec:
+    """Everything a child process needs to attach to an existing ring."""
+
+    name: str
+    shape: tuple[int, ...]
+    num_slots: int
+    dtype: str = "uint8"
+
+
+@dataclass(frozen=True)
+class FrameResult:
+    """Small, picklable result sent from an inference worker to the parent."""
+
+    seq: int
+    capture_ns: int
+    done_ns: int
+    worker_id: int
+    gesture: str | None
+    landmarks: tuple[tuple[float, float, float], ...] | None
+
+
+def _header_len(num_slots: int) -> int:
+    return 1 + _SLOT_FIELDS * num_slots
+
+
+def _header_bytes(num_slots: int) -> int:
+    raw = _header_len(num_slots) * np.dtype(np.int64).itemsize
+    return -(-raw // _HEADER_ALIGN) * _HEADER_ALIGN
+
+
+class SharedFrameRing:
+    """Fixed-size ring buffer of frames stored in shared memory."""
+
+    def __init__(self, spec: RingSpec, shm: shared_memory.SharedMemory, owner: bool):
+        self.spec = spec
+        self._shm = shm
+        self._owner = owner
+        self._header = np.ndarray(
+            (_header_len(spec.num_slots),), dtype=np.int64, buffer=shm.buf
+        )
+        self._frames = np.ndarray(
+            (spec.num_slots, *spec.shape),
+            dtype=np.dtype(spec.dtype),
+            buffer=shm.buf,
+            offset=_header_bytes(spec.num_slots),
+        )
+
+    @classmethod
+    def create(
+        cls, shape: tuple[int, ...], num_slots: int = 4, dtype: str = "uint8"
+    ) -> SharedFrameRing:
+        if num_slots < 2:
+            raise ValueError("num_slots must be at least 2")
+        frame_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        size = _header_bytes(num_slots) + num_slots * frame_bytes
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        spec = RingSpec(
+            name=shm.name, shape=tuple(shape), num_slots=num_slots, dtype=dtype
+        )
+        ring = cls(spec, shm, owner=True)
+        ring._header[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, spec: RingSpec) -> SharedFrameRing:
+        shm = shared_memory.SharedMemory(name=spec.name)
+        return cls(spec, shm, owner=False)
+
+    def _field(self, seq: int, index: int) -> int:
+        return 1 + _SLOT_FIELDS * (seq % self.spec.num_slots) + index
+
+    # -- writer side ------------------------------------------------------
+
+    def begin_write(self) -> tuple[int, np.ndarray]:
+        """
+        Reserve the next slot and return (seq, writable view).
+
+        The caller fills the view in place (e.g. `cv2.cvtColor(..., dst=view)`)
+        and then calls `commit(seq)`.
+        """
+        seq = int(self._header[0]) + 1
+        self._header[self._field(seq, 0)] = _SLOT_BUSY
+        return seq, self._frames[seq % self.spec.num_slots]
+
+    def commit(self, seq: int, timestamp_ns: int | None = None) -> None:
+        self._header[self._field(seq, 1)] = (
+            time.perf_counter_ns() if timestamp_ns is None else timestamp_ns
+        )
+        self._header[self._field(seq, 0)] = seq
+        self._header[0] = seq
+
+    def write(self, frame: np.ndarray, timestamp_ns: int | None = None) -> int:
+        seq, view = self.begin_write()
+        np.copyto(view, frame)
+        self.commit(seq, timestamp_ns)
+        return seq
+
+    def slot_free(self, seq: int) -> bool:
+        """True once the frame previously stored in `seq`'s slot was consumed."""
+        previous = seq - self.spec.num_slots
+        return previous < 1 or int(self._header[self._field(seq, 2)]) >= previous
+
+    # -- reader side ------------------------------------------------------
+
+    def latest_seq(self) -> int:
+        return int(self._header[0])
+
+    def view(self, seq: int) -> np.ndarray | None:
+        """Return a zero-copy view of frame `seq`, or None if it was overwritten."""
+        if seq < 1 or not self.is_valid(seq):
+            return None
+        return self._frames[seq % self.spec.num_slots]
+
+    def is_valid(self, seq: int) -> bool:
+        return int(self._header[self._field(seq, 0)]) == seq
+
+    def timestamp_ns(self, seq: int) -> int:
+        return int(self._header[self._field(seq, 1)])
+
+    def mark_consumed(self, seq: int) -> None:
+        self._header[self._field(seq, 2)] = seq
+
+    def read_latest(self) -> tuple[int, np.ndarray] | None:
+        """Return a private copy of the newest complete frame, for display."""
+        seq = self.latest_seq()
+        view = self.view(seq)
+        if view is None:
+            return None
+        frame = view.copy()
+        if not self.is_valid(seq):
+            return None
+        return seq, frame
+
+    # -- lifecycle --------------------------------------------------------
+
+    def close(self) -> None:
+        # Drop numpy views before closing, otherwise the buffer stays exported.
+        self._header = None  # type: ignore[assignment]
+        self._frames = None  # type: ignore[assignment]
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def capture_process(
+    spec: RingSpec,
+    source: int | str,
+    stop_event,
+    capture_done,
+    workers_ready,
+    num_workers: int,
+    drop_stale: bool = True,
+    max_frames: int = 0,
+    camera: CameraConfig | None = None,
+) -> None:
+    """Read frames from `source` and write them into the ring as RGB."""
+    import cv2
+
+    from camera_capture import open_camera, read_frame
+
+    ring = SharedFrameRing.attach(spec)
+    cap = open_camera(source, camera)
+    grab_latest = camera is not None and camera.grab_latest
+    written = 0
+    try:
+        if not cap.isOpened():
+            logger.error("Capture process failed to open source %s", source)
+            return
+        # Do not start the clock until every worker has built its graph. A
+        # worker that crashed while starting never signals, so give up.
+        deadline = time.monotonic() + WORKER_START_TIMEOUT_S
+        for ready in range(num_workers):
+            remaining = max(0.0, deadline - time.monotonic())
+            if not workers_ready.acquire(timeout=remaining):
+                logger.error(
+                    "Only %s of %s inference workers started within %.0f s; "
+                    "stopping capture",
+                    ready,
+                    num_workers,
+                    WORKER_START_TIMEOUT_S,
+                )
+                return
+        while not stop_event.is_set():
+            captured = read_frame(cap, grab_latest=grab_latest)
+            if captured is None:
+                logger.info(
+                    "Capture source %s exhausted after %s frames", source, written
+                )
+                break
+            frame = captured.frame
+            if frame.shape != spec.shape:
+                frame = cv2.resize(frame, (spec.shape[1], spec.shape[0]))
+            if not drop_stale:
+                while (
+                    not ring.slot_free(ring.latest_seq() + 1)
+                    and not stop_event.is_set()
+                ):
+                    time.sleep(_POLL_S)
+            seq, view = ring.begin_write()
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=view)
+            ring.commit(seq, captured.capture_ns)
+            written += 1
+            if max_frames and written >= max_frames:
+                break
+    finally:
+        cap.release()
+        ring.close()
+        capture_done.set()
+
+
+def _next_seq(
+    latest: int, last_seq: int, worker_id: int, num_workers: int, drop_stale: bool
+):
+    """Pick the next frame for this worker; frames are dealt round-robin."""
+    if drop_stale:
+        return latest - ((latest - 1 - worker_id) % num_workers)
+    return last_seq + num_workers if last_seq else worker_id + 1
+
+
+def inference_worker(
+    spec: RingSpec,
+    worker_id: int,
+    num_workers: int,
+    result_queue,
+    stop_event,
+    capture_done,
+    workers_ready,
+    drop_stale: bool = True,
+    backend: HandBackendConfig | None = None,
+) -> None:
+    """Run hand detection + gesture recognition on frames read in place."""
+    from gesture_rules import recognize_gesture
+    from hand_backends import create_backend
+
+    backend = backend or HandBackendConfig()
+    if backend.name == "tasks_live_stream":
+        # Each worker needs the result for the frame it holds; the pipeline
+        # already overlaps frames across processes, so use the sync mode.
+        backend = replace(backend, name="tasks_video")
+    ring = SharedFrameRing.attach(spec)
+    hands = create_backend(backend)
+    workers_ready.release()
+    last_seq = 0
+    try:
+        while not stop_event.is_set():
+            latest = ring.latest_seq()
+            seq = _next_seq(latest, last_seq, worker_id, num_workers, drop_stale)
+            if seq > latest or seq <= last_seq or seq < 1:
+                if capture_done.is_set() and ring.latest_seq() == latest:
+                    break
+                time.sleep(_POLL_S)
+                continue
+            view = ring.view(seq)
+            if view is None:
+                last_seq = seq
+                continue
+            capture_ns = ring.timestamp_ns(seq)
+            result = hands.detect(view, capture_ns // 1_000_000)
+            last_seq = seq
+            if not ring.is_valid(seq):
+                # Frame was overwritten mid-inference; the result is unreliable.
+                continue
+            ring.mark_consumed(seq)
+
+            gesture = None
+            landmarks = None
+            if result.multi_hand_landmarks:
+                hand = result.multi_hand_landmarks[0]
+                gesture = recognize_gesture(hand.landmark)
+                landmarks = tuple((lm.x, lm.y, lm.z) for lm in hand.landmark)
+            result_queue.put(
+                FrameResult(
+                    seq=seq,
+                    capture_ns=capture_ns,
+                    done_ns=time.perf_counter_ns(),
+                    worker_id=worker_id,
+                    gesture=gesture,
+                    landmarks=landmarks,
+                )
+            )
+    finally:
+        hands.close()
+        ring.close()
+
+
+def probe_frame_shape(
+    source: int | str, camera: CameraConfig | None = None
+) -> tuple[int, int, int] | None:
+    """Open `source` briefly and return the shape of its frames."""
+    from camera_capture import open_camera
+
+    cap = open_camera(source, camera)
+    try:
+        ok, frame = cap.read()
+    finally:
+        cap.release()
+    if not ok:
+        return None
+    return frame.shape
+
+
+class MultiprocessPipeline:
+    """Capture process + N inference processes around a `SharedFrameRing`."""
+
+    def __init__(
+        self,
+        source: int | str,
+        frame_shape: tuple[int, ...],
+        num_workers: int = 1,
+        num_slots: int = 4,
+        backend: HandBackendConfig | None = None,
+        drop_stale: bool = True,
+        max_frames: int = 0,
+        camera: CameraConfig | None = None,
+    ):
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+        self.source = source
+        self.frame_shape = tuple(frame_shape)
+        self.num_workers = num_workers
+        # Keep at least one spare slot per worker so the writer rarely laps a reader.
+        self.num_slots = max(num_slots, num_workers + 2)
+        self.backend = backend
+        self.drop_stale = drop_stale
+        self.max_frames = max_frames
+        self.camera = camera
+        self.ring: SharedFrameRing | None = None
+        # Always spawn: forking a parent that already holds a MediaPipe graph or
+        # OpenCV threads is unsafe, and spawn matches Windows/macOS behaviour.
+        self._ctx = multiprocessing.get_context("spawn")
+        self._capture = None
+        self._workers: list = []
+        self._results = None
+        self._stop_event = None
+        self._capture_done = None
+        self._workers_ready = None
+
+    def start(self) -> None:
+        self.ring = SharedFrameRing.create(self.frame_shape, self.num_slots)
+        self._results = self._ctx.Queue()
+        self._stop_event = self._ctx.Event()
+        self._capture_done = self._ctx.Event()
+        # Held on self: spawned children unpickle it after start() returns.
+        self._workers_ready = workers_ready = self._ctx.Semaphore(0)
+        for worker_id in range(self.num_workers):
+            self._workers.append(
+                self._ctx.Process(
+                    target=inference_worker,
+                    args=(
+                        self.ring.spec,
+                        worker_id,
+                        self.num_workers,
+                        self._results,
+                        self._stop_event,
+                        self._capture_done,
+                        workers_ready,
+                        self.drop_stale,
+                        self.backend,
+                    ),
+                    daemon=True,
+                )
+            )
+        self._capture = self._ctx.Process(
+            target=capture_process,
+            args=(
+                self.ring.spec,
+                self.source,
+                self._stop_event,
+                self._capture_done,
+                workers_ready,
+                self.num_workers,
+                self.drop_stale,
+                self.max_frames,
+                self.camera,
+            ),
+            daemon=True,
+        )
+        for proc in [*self._workers, self._capture]:
+            proc.start()
+        logger.info(
+            "Started multi-process pipeline: %s worker(s), %s slots of %s",
+            self.num_workers,
+            self.num_slots,
+            self.frame_shape,
+        )
+
+    @property
+    def running(self) -> bool:
+        """True while frames are still being captured."""
+        return self._capture_done is not None and not self._capture_done.is_set()
+
+    @property
+    def finished(self) -> bool:
+        """True once capture and every worker process have exited."""
+        return all(
+            not proc.is_alive() for proc in [*self._workers, self._capture] if proc
+        )
+
+    def latest_frame(self) -> tuple[int, np.ndarray] | None:
+        if self.ring is None:
+            return None
+        return self.ring.read_latest()
+
+    def frames_captured(self) -> int:
+        return 0 if self.ring is None else self.ring.latest_seq()
+
+    def poll_results(self, timeout: float = 0.0) -> list[FrameResult]:
+        """Drain all available results without blocking the caller (by default)."""
+        results: list[FrameResult] = []
+        if self._results is None:
+            return results
+        try:
+            if timeout > 0:
+                results.append(self._results.get(timeout=timeout))
+            while True:
+                results.append(self._results.get_nowait())
+        except queue.Empty:
+            pass
+        return results
+
+    def stop(self) -> list[FrameResult]:
+        """Stop all processes and return any results that were still queued."""
+        if self._stop_event is not None:
+            self._stop_event.set()
+        # Drain so workers blocked on a full pipe can exit.
+        leftover = self.poll_results()
+        for proc in [*self._workers, self._capture]:
+            if proc is None:
+                continue
+            proc.join(timeout=2.0)
+            if proc.is_alive():
+                logger.warning("Terminating unresponsive pipeline process %s", proc.pid)
+                proc.terminate()
+        leftover.extend(self.poll_results())
+        self._workers.clear()
+        self._capture = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+        logger.info("Stopped multi-process pipeline")
+        return leftover
@@ -0,0 +1,451 @@
+"""
+Soak benchmark: run the recognition pipeline for hours and check for drift.
+
+Frames come from a synthetic source (a moving block on a noisy background)
+or a looped recording, and are processed as fast as the machine allows, so
+a school day of camera time passes in a fraction of it. Simulated time is
+`frames / nominal_fps`.
+
+Every `sample_every_s` simulated seconds the benchmark records:
+- process RSS and the number of live Python objects (`gc.get_objects()`)
+- p50 / p99 frame time over the frames since the previous sample
+- log records written, and the number of GUI log lines kept in memory
+
+After `warmup_s`, a least-squares line is fitted to RSS and object count
+against simulated hours, and the p99 frame time of the last samples is
+compared with the first ones. The run fails (exit code 1) when a slope or
+the p99 drift exceeds the limits in the `soak:` section of config.yaml.
+Samples are written to logs/soak_<timestamp>.csv.
+
+RSS is read with `psutil` when it is installed, otherwise from /proc on
+Linux. Without either, the memory check cannot run and the soak fails
+rather than passing on RSS readings of 0.
+
+By default the real Tk GUI is driven (`process_frame()` plus a Tk update
+per frame), which covers the log list, PhotoImage churn and log volume.
+`--headless` runs capture, hand detection, gesture rules and the phrase
+decoder without Tk, for CI machines without a display. The hand backend is
+`hand_backend` from config.yaml; `--backend stub` takes MediaPipe out of
+the loop to isolate the application's own growth.
+
+Usage:
+    python soak_benchmark.py --hours 8
+    python soak_benchmark.py --source classroom_clip.mp4 --hours 2
+    python soak_benchmark.py --headless --hours 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import gc
+import logging
+import os
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from camera_capture import read_frame
+from config_loader import AppConfig, SoakConfig, load_config
+from gesture_rules import recognize_gesture
+from hand_backends import BACKENDS, create_backend
+from logging_config import LOG_DIR, setup_logging
+from motion_gate import MotionGate
+from phrase_decoder import GestureEventDetector, PhraseDecoder, load_lexicon
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover
+    psutil = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# Number of samples averaged at each end when measuring p99 drift.
+DRIFT_SAMPLES = 3
+
+
+class SyntheticSource:
+    """
+    `cv2.VideoCapture` stand-in producing deterministic frames forever.
+
+    A bright block sweeps across a noisy background, so the motion gate keeps
+    sending frames to inference the way a signing child would.
+    """
+
+    def __init__(self, width: int = 640, height: int = 480, fps: float = 30.0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frames = 0
+        self._opened = True
+        rng = np.random.default_rng(0)
+        # A few noise frames are cycled to avoid generating noise per frame.
+        self._backgrounds = rng.integers(
+            80, 120, size=(8, height, width, 3), dtype=np.uint8
+        )
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def grab(self) -> bool:
+        self.frames += 1
+        return self._opened
+
+    def retrieve(self) -> tuple[bool, np.ndarray | None]:
+        if not self._opened:
+            return False, None
+        frame = self._backgrounds[self.frames % len(self._backgrounds)].copy()
+        size = self.height // 4
+        x = (self.frames * 7) % (self.width - size)
+        y = self.height // 2 - size // 2
+        frame[y : y + size, x : x + size] = 230
+        return True, frame
+
+    def read(self) -> tuple[bool, np.ndarray | None]:
+        return self.retrieve() if self.grab() else (False, None)
+
+    def get(self, prop: int) -> float:
+        return {
+            cv2.CAP_PROP_FRAME_WIDTH: self.width,
+            cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+            cv2.CAP_PROP_FPS: self.fps,
+        }.get(prop, 0.0)
+
+    def set(self, _prop: int, _value: float) -> bool:
+        return False
+
+    def release(self) -> None:
+        self._opened = False
+
+
+class LoopingVideoSource:
+    """Wrap a video file and rewind it at the end, so it can run for hours."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        self.loops = 0
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def grab(self) -> bool:
+        if self.cap.grab():
+            return True
+        self.loops += 1
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return self.cap.grab()
+
+    def retrieve(self):
+        return self.cap.retrieve()
+
+    def read(self):
+        return self.retrieve() if self.grab() else (False, None)
+
+    def get(self, prop: int) -> float:
+        return self.cap.get(prop)
+
+    def set(self, prop: int, value: float) -> bool:
+        return self.cap.set(prop, value)
+
+    def release(self) -> None:
+        self.cap.release()
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process, or 0 if it cannot be read."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class _LogCounter(logging.Handler):
+    """Counts log records, to measure log volume during the soak."""
+
+    def __init__(self) -> None:
+        super().__init__(level=logging.DEBUG)
+        self.records = 0
+
+    def emit(self, _record: logging.LogRecord) -> None:
+        self.records += 1
+
+
+@dataclass
+class SoakSample:
+    sim_s: float
+    wall_s: float
+    frames: int
+    rss_mb: float
+    objects: int
+    p50_ms: float
+    p99_ms: float
+    log_records: int
+    log_items: int
+
+
+@dataclass
+class SoakVerdict:
+    passed: bool
+    rss_slope_mb_per_hour: float | None
+    object_growth_per_hour: float | None
+    p99_drift: float | None
+    failures: list[str] = field(default_factory=list)
+
+
+class SoakMonitor:
+    """Collects per-frame times and takes a sample every N frames."""
+
+    def __init__(
+        self,
+        soak: SoakConfig,
+        log_items: Callable[[], int] = lambda: 0,
+    ):
+        self.soak = soak
+        self.total_frames = int(soak.hours * 3600 * soak.nominal_fps)
+        self.sample_every = max(1, int(soak.sample_every_s * soak.nominal_fps))
+        self.log_items = log_items
+        self.frames = 0
+        self.samples: list[SoakSample] = []
+        self._window_ms: list[float] = []
+        self._log_counter = _LogCounter()
+        self._start = time.perf_counter()
+
+    @property
+    def done(self) -> bool:
+        return self.frames >= self.total_frames
+
+    def __enter__(self) -> SoakMonitor:
+        logging.getLogger().addHandler(self._log_counter)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._window_ms:
+            self.sample()
+        logging.getLogger().removeHandler(self._log_counter)
+
+    def record_frame(self, frame_ms: float) -> None:
+        self.frames += 1
+        self._window_ms.append(frame_ms)
+        if self.frames % self.sample_every == 0:
+            self.sample()
+
+    def sample(self) -> SoakSample:
+        p50, p99 = (
+            np.percentile(self._window_ms, [50, 99]) if self._window_ms else (0, 0)
+        )
+        self._window_ms = []
+        sample = SoakSample(
+            sim_s=self.frames / self.soak.nominal_fps,
+            wall_s=time.perf_counter() - self._start,
+            frames=self.frames,
+            rss_mb=current_rss_bytes() / 1e6,
+            objects=len(gc.get_objects()),
+            p50_ms=float(p50),
+            p99_ms=float(p99),
+            log_records=self._log_counter.records,
+            log_items=self.log_items(),
+        )
+        self.samples.append(sample)
+        logger.info(
+            "Soak %.2f h simulated: RSS %.1f MB, %s objects, p99 %.1f ms",
+            sample.sim_s / 3600,
+            sample.rss_mb,
+            sample.objects,
+            sample.p99_ms,
+        )
+        return sample
+
+
+def _slope_per_hour(samples: list[SoakSample], attr: str) -> float:
+    hours = np.array([s.sim_s / 3600 for s in samples])
+    values = np.array([getattr(s, attr) for s in samples], dtype=float)
+    return float(np.polyfit(hours, values, 1)[0])
+
+
+def analyse(samples: list[SoakSample], soak: SoakConfig) -> SoakVerdict:
+    """Fit memory trends after warm-up and compare p99 frame time end to end."""
+    steady = [s for s in samples if s.sim_s >= soak.warmup_s]
+    if len(steady) < 2:
+        return SoakVerdict(
+            False, None, None, None, ["not enough samples after warm-up"]
+        )
+
+    rss_known = any(s.rss_mb > 0 for s in steady)
+    rss_slope = _slope_per_hour(steady, "rss_mb") if rss_known else None
+    object_slope = _slope_per_hour(steady, "objects")
+    n = min(DRIFT_SAMPLES, len(steady) // 2)
+    first_p99 = float(np.median([s.p99_ms for s in steady[:n]]))
+    last_p99 = float(np.median([s.p99_ms for s in steady[-n:]]))
+    drift = last_p99 / first_p99 - 1 if first_p99 > 0 else 0.0
+
+    failures = []
+    if rss_slope is None:
+        failures.append("RSS unavailable on this platform (install psutil)")
+    elif rss_slope > soak.max_rss_slope_mb_per_hour:
+        failures.append(
+            f"RSS grows {rss_slope:.1f} MB/h "
+            f"(limit {soak.max_rss_slope_mb_per_hour:.1f})"
+        )
+    if object_slope > soak.max_object_growth_per_hour:
+        failures.append(
+            f"Python objects grow {object_slope:.0f}/h "
+            f"(limit {soak.max_object_growth_per_hour:.0f})"
+        )
+    if drift > soak.max_p99_drift:
+        failures.append(
+            f"p99 frame time drifted {drift * 100:.0f}% "
+            f"({first_p99:.1f} -> {last_p99:.1f} ms, "
+            f"limit {soak.max_p99_drift * 100:.0f}%)"
+        )
+    return SoakVerdict(not failures, rss_slope, object_slope, drift, failures)
+
+
+def run_headless(source, config: AppConfig, monitor: SoakMonitor, hands=None) -> None:
+    """Capture -> hands -> rules -> phrase decoder, without Tk."""
+    own_hands = hands is None
+    if own_hands:
+        hands = create_backend(config.hand_backend)
+    gate = MotionGate(config.motion_gate)
+    events = GestureEventDetector(config.phrases.hold_frames)
+    decoder = PhraseDecoder(
+        load_lexicon(config.phrases.lexicon_path), config.phrases.max_gap_s
+    )
+    result = None
+    try:
+        while not monitor.done:
+            start = time.perf_counter()
+            captured = read_frame(source)
+            if captured is None:
+                logger.warning("Frame source ended after %s frames", monitor.frames)
+                break
+            if gate.should_process(captured.frame) or result is None:
+                rgb = cv2.cvtColor(captured.frame, cv2.COLOR_BGR2RGB)
+                detected = hands.detect(rgb, captured.capture_ns // 1_000_000)
+                if detected is not None:
+                    result = detected
+            gesture = None
+            for hand_landmarks in result.multi_hand_landmarks if result else []:
+                gesture = recognize_gesture(hand_landmarks.landmark)
+            event = events.update(gesture)
+            sim_t = monitor.frames / monitor.soak.nominal_fps
+            decoder.tick(sim_t)
+            if event is not None:
+                decoder.push(event, sim_t)
+            monitor.record_frame((time.perf_counter() - start) * 1000)
+    finally:
+        if own_hands:
+            hands.close()
+
+
+def run_gui(source, config: AppConfig, monitor: SoakMonitor) -> None:
+    """Drive the real GUI frame path, updating Tk after every frame."""
+    import makaton_gesture_recognition as gui
+
+    gui.config.hand_backend = config.hand_backend
+    window = gui.build_ui()
+    monitor.log_items = gui.log_listbox.size
+    gui.cap = source
+    try:
+        while not monitor.done:
+            start = time.perf_counter()
+            if not gui.process_frame():
+                logger.warning("Frame source ended after %s frames", monitor.frames)
+                break
+            window.update()
+            monitor.record_frame((time.perf_counter() - start) * 1000)
+    finally:
+        gui.exit_app()
+
+
+def write_samples(samples: list[SoakSample], output_dir: Path = LOG_DIR) -> Path:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"soak_{datetime.now():%Y%m%d_%H%M%S}.csv"
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(SoakSample.__dataclass_fields__))
+        writer.writeheader()
+        writer.writerows(asdict(s) for s in samples)
+    return path
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--hours", type=float, help="simulated hours (default: config.yaml)"
+    )
+    parser.add_argument(
+        "--source", help="video file to loop instead of synthetic frames"
+    )
+    parser.add_argument(
+        "--headless", action="store_true", help="run the pipeline without the Tk GUI"
+    )
+    parser.add_argument(
+        "--backend", choices=BACKENDS, help="hand backend (default: config.yaml)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    setup_logging()
+    args = parse_args(argv)
+    config = load_config()
+    soak = config.soak
+    if args.hours is not None:
+        soak.hours = args.hours
+    if args.backend is not None:
+        config.hand_backend.name = args.backend
+
+    source = LoopingVideoSource(args.source) if args.source else SyntheticSource()
+    if not source.isOpened():
+        logger.error("Failed to open frame source %s", args.source)
+        return 1
+
+    logger.info(
+        "Starting %s soak: %.2f simulated hours (%s frames) on %s",
+        "headless" if args.headless else "GUI",
+        soak.hours,
+        int(soak.hours * 3600 * soak.nominal_fps),
+        args.source or "synthetic frames",
+    )
+    with SoakMonitor(soak) as monitor:
+        if args.headless:
+            run_headless(source, config, monitor)
+        else:
+            run_gui(source, config, monitor)
+    source.release()
+
+    csv_path = write_samples(monitor.samples)
+    verdict = analyse(monitor.samples, soak)
+    wall_s = monitor.samples[-1].wall_s if monitor.samples else 0.0
+    sim_s = monitor.frames / soak.nominal_fps
+
+    print("\n=== Soak Benchmark ===")
+    print(f"Frames processed:  {monitor.frames}")
+    print(
+        f"Simulated time:    {sim_s / 3600:.2f} h in {wall_s / 3600:.2f} h wall clock"
+    )
+    if verdict.rss_slope_mb_per_hour is not None:
+        print(f"RSS slope:         {verdict.rss_slope_mb_per_hour:.2f} MB/h")
+    if verdict.object_growth_per_hour is not None:
+        print(f"Object growth:     {verdict.object_growth_per_hour:.0f} objects/h")
+        print(f"p99 drift:         {verdict.p99_drift * 100:+.1f}%")
+    print(f"Samples:           {csv_path}")
+    print(f"Result:            {'PASS' if verdict.passed else 'FAIL'}")
+    for failure in verdict.failures:
+        print(f"  - {failure}")
+    return 0 if verdict.passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
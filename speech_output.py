@@ -0,0 +1,242 @@
+"""
+Asynchronous text-to-speech output.
+
+A TTS call takes hundreds of milliseconds, far too long for the Tk frame
+loop. `SpeechQueue.say()` only puts the text on a queue; a worker thread
+synthesises and plays it. Synthesised audio is kept in an LRU cache, and
+the fixed vocabulary (gesture names and lexicon phrases) can be
+pre-rendered at start-up so repeated gestures play instantly.
+
+Engines:
+- `Pyttsx3Engine` - offline system voices via the optional `pyttsx3`
+  package (SAPI5 on Windows, NSSpeechSynthesizer on macOS, eSpeak on Linux)
+- `StubEngine`    - silent, deterministic local stub for tests and machines
+  without a speech engine
+"""
+
+from __future__ import annotations
+
+import abc
+import io
+import itertools
+import logging
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import wave
+from collections import OrderedDict
+from collections.abc import Iterable
+from pathlib import Path
+
+from config_loader import SpeechConfig
+
+try:
+    import pyttsx3
+except ImportError:  # pragma: no cover
+    pyttsx3 = None  # type: ignore[assignment]
+
+try:
+    import winsound
+except ImportError:
+    winsound = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# Lower numbers are served first: speaking always beats pre-rendering.
+_PRIORITY_STOP = 0
+_PRIORITY_SPEAK = 1
+_PRIORITY_RENDER = 2
+
+
+class SpeechEngine(abc.ABC):
+    """Synthesise text to WAV bytes and play them back."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def synthesize(self, text: str) -> bytes: ...
+
+    @abc.abstractmethod
+    def play(self, audio: bytes) -> None: ...
+
+
+class StubEngine(SpeechEngine):
+    """Silent engine: renders a short silent WAV and records what was played."""
+
+    name = "stub"
+
+    def __init__(self, sample_rate: int = 8000):
+        self.sample_rate = sample_rate
+        self.synthesized: list[str] = []
+        self.played: list[bytes] = []
+
+    def synthesize(self, text: str) -> bytes:
+        self.synthesized.append(text)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            # Roughly 60 ms per character, like a real voice.
+            wav.writeframes(b"\x00\x00" * (self.sample_rate * 60 * len(text) // 1000))
+        return buffer.getvalue()
+
+    def play(self, audio: bytes) -> None:
+        self.played.append(audio)
+
+
+def _play_wav(audio: bytes) -> None:
+    """Play WAV bytes with the platform's built-in player."""
+    if winsound is not None:
+        winsound.PlaySound(audio, winsound.SND_MEMORY)
+        return
+    player = next((p for p in ("afplay", "aplay", "paplay") if shutil.which(p)), None)
+    if player is None:
+        logger.warning("No audio player found (afplay/aplay/paplay); speech is silent")
+        return
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
+        f.write(audio)
+        path = Path(f.name)
+    try:
+        subprocess.run([player, str(path)], check=False, capture_output=True)
+    finally:
+        path.unlink(missing_ok=True)
+
+
+class Pyttsx3Engine(SpeechEngine):
+    """Offline system TTS through pyttsx3. Must be used from a single thread."""
+
+    name = "pyttsx3"
+
+    def __init__(self, rate: int = 0):
+        if pyttsx3 is None:
+            raise RuntimeError("pyttsx3 is not installed")
+        self.rate = rate
+        self._engine = None
+
+    def synthesize(self, text: str) -> bytes:
+        if self._engine is None:
+            # pyttsx3 drivers are thread-affine, so create it on the worker thread.
+            self._engine = pyttsx3.init()
+            if self.rate:
+                self._engine.setProperty("rate", self.rate)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "utterance.wav"
+            self._engine.save_to_file(text, str(path))
+            self._engine.runAndWait()
+            return path.read_bytes()
+
+    def play(self, audio: bytes) -> None:
+        _play_wav(audio)
+
+
+def create_engine(config: SpeechConfig) -> SpeechEngine:
+    if config.engine == "pyttsx3":
+        if pyttsx3 is not None:
+            return Pyttsx3Engine(rate=config.rate)
+        logger.warning("pyttsx3 not installed; falling back to the silent stub engine")
+    elif config.engine != "stub":
+        logger.warning("Unknown speech engine %r; using the silent stub", config.engine)
+    return StubEngine()
+
+
+class SpeechQueue:
+    """Worker thread that speaks queued text, with an LRU cache of rendered audio."""
+
+    def __init__(
+        self, engine: SpeechEngine, cache_size: int = 128, queue_size: int = 8
+    ):
+        self.engine = engine
+        self.cache_size = cache_size
+        self.queue_size = queue_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.dropped = 0
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._pending_speech = 0
+        self._pending_lock = threading.Lock()
+        self._counter = itertools.count()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="speech-output", daemon=True
+        )
+        self._thread.start()
+
+    def say(self, text: str) -> bool:
+        """Queue `text` to be spoken. Never blocks; returns False if dropped."""
+        if not text:
+            return False
+        with self._pending_lock:
+            if self._pending_speech >= self.queue_size:
+                # Speech is far behind the signer; new utterances would come too late.
+                self.dropped += 1
+                return False
+            self._pending_speech += 1
+        self._put(_PRIORITY_SPEAK, text)
+        return True
+
+    def prewarm(self, texts: Iterable[str]) -> None:
+        """Render a fixed vocabulary in the background, up to the cache size."""
+        for text in itertools.islice(dict.fromkeys(texts), self.cache_size):
+            self._put(_PRIORITY_RENDER, text)
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Wait until everything queued so far has been rendered or spoken."""
+        done = self._queue.all_tasks_done
+        with done:
+            return done.wait_for(lambda: self._queue.unfinished_tasks == 0, timeout)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        if self._thread is None:
+            return
+        self._put(_PRIORITY_STOP, None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def cached(self, text: str) -> bool:
+        with self._cache_lock:
+            return text in self._cache
+
+    def _put(self, priority: int, text: str | None) -> None:
+        self._queue.put((priority, next(self._counter), text))
+
+    def _render(self, text: str, count: bool = True) -> bytes:
+        with self._cache_lock:
+            audio = self._cache.get(text)
+            if audio is not None:
+                self._cache.move_to_end(text)
+                self.cache_hits += count
+                return audio
+        self.cache_misses += count
+        audio = self.engine.synthesize(text)
+        with self._cache_lock:
+            self._cache[text] = audio
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return audio
+
+    def _run(self) -> None:
+        while True:
+            priority, _, text = self._queue.get()
+            if priority == _PRIORITY_STOP:
+                self._queue.task_done()
+                break
+            try:
+                if priority == _PRIORITY_SPEAK:
+                    with self._pending_lock:
+                        self._pending_speech -= 1
+                    self.engine.play(self._render(text))
+                else:
+                    self._render(text, count=False)
+            except Exception:
+                logger.exception("Speech output failed for %r", text)
+            finally:
+                self._queue.task_done()
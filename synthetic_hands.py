@@ -0,0 +1,236 @@
+"""
+Synthetic 21-point hand landmarks for stress benchmarks and randomised tests.
+
+Hands are built from a simple kinematic model in MediaPipe's landmark order
+(0 wrist, 1-4 thumb, 5-8 index, 9-12 middle, 13-16 ring, 17-20 pinky):
+each finger is a chain of three bones from its knuckle, with a splay angle
+in the palm plane and flexion at every joint that curls the finger towards
+the palm (and the camera, giving negative z). Every gesture in
+`GESTURE_DESCRIPTIONS` has a canonical pose that `recognize_gesture()`
+labels correctly; `HandSpec` then adds per-sample variation:
+
+- `pose_jitter`  random change of every joint angle (radians)
+- `rotation`     in-plane rotation about the wrist, uniform in +/- rotation
+- `scale`        (min, max) multiplier on the hand size
+- `handedness`   "right", "left" or "both" (left hands are mirrored)
+- `noise`        Gaussian landmark noise, in normalised image units
+
+Everything is vectorised over the batch, so millions of hands take seconds.
+Coordinates are normalised image coordinates (y grows downwards) and each
+hand is placed at a random position that keeps it inside the frame.
+"right" means a right hand as seen in a mirrored selfie view, palm to the
+camera: the thumb is on the left of the image.
+
+Usage:
+    batch = generate_batch(100_000, spec=HandSpec(noise=0.003), seed=0)
+    for chunk in stream_batches(10_000_000, chunk_size=250_000):
+        ...
+"""
+
+from __future__ import annotations
+
+import gc
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from gesture_rules import GESTURE_DESCRIPTIONS
+from landmark_filter import Landmark, as_landmarks
+
+GESTURES: tuple[str, ...] = tuple(GESTURE_DESCRIPTIONS)
+
+# Hand size (wrist to middle knuckle) in normalised image units at scale 1.
+HAND_SIZE = 0.18
+
+# Finger order: thumb, index, middle, ring, pinky. Units are hand sizes, in
+# a frame with the wrist at the origin, fingers along +y and the thumb on +x.
+_KNUCKLES = np.array(
+    [[0.25, 0.20], [0.30, 1.00], [0.05, 1.05], [-0.17, 0.98], [-0.37, 0.88]]
+)
+_BONES = np.array(
+    [
+        [0.40, 0.30, 0.25],
+        [0.45, 0.27, 0.22],
+        [0.50, 0.30, 0.23],
+        [0.46, 0.28, 0.22],
+        [0.35, 0.20, 0.19],
+    ]
+)
+
+
+@dataclass(frozen=True)
+class _Pose:
+    """Canonical joint angles for one gesture."""
+
+    splay: tuple[float, ...]  # per finger, radians from +y towards the thumb
+    flexion: tuple[tuple[float, float, float], ...]  # per finger and joint
+    rotation: float = 0.0  # in-plane rotation of the whole hand
+
+
+_OPEN = ((0.0, 0.0, 0.0),) * 4
+_FIST = ((1.6, 1.6, 1.0),) * 4
+
+POSES: dict[str, _Pose] = {
+    # Open hand, thumb spread wide.
+    "Hello": _Pose(
+        splay=(1.1, 0.12, 0.0, -0.1, -0.22),
+        flexion=((0.0, 0.0, 0.0), *_OPEN),
+    ),
+    # All fingertips bunched against the thumb tip.
+    "Goodbye": _Pose(
+        splay=(0.45, -0.2, -0.06, 0.12, 0.5),
+        flexion=((0.4, 0.5, 0.4), *(((0.9, 0.9, 0.4),) * 4)),
+    ),
+    # Flat hand, fingers up, thumb alongside the index finger.
+    "Please": _Pose(
+        splay=(0.25, 0.05, 0.0, -0.05, -0.1),
+        flexion=((0.0, 0.0, 0.0), *_OPEN),
+    ),
+    # The same flat hand pointing down and away.
+    "Thank You": _Pose(
+        splay=(0.25, 0.05, 0.0, -0.05, -0.1),
+        flexion=((0.0, 0.0, 0.0), *_OPEN),
+        rotation=np.pi,
+    ),
+    # Fist with the thumb up.
+    "Yes": _Pose(
+        splay=(0.2, 0.05, 0.0, -0.05, -0.1),
+        flexion=((0.0, 0.0, 0.0), *_FIST),
+    ),
+}
+
+
+@dataclass
+class HandSpec:
+    noise: float = 0.0
+    rotation: float = 0.0
+    scale: tuple[float, float] = (1.0, 1.0)
+    handedness: str = "right"  # "right", "left" or "both"
+    pose_jitter: float = 0.0
+
+
+@dataclass
+class HandBatch:
+    points: np.ndarray  # (n, 21, 3) float32
+    labels: np.ndarray  # (n,) index into GESTURES
+    left: np.ndarray  # (n,) True for left hands
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def gesture(self, i: int) -> str:
+        return GESTURES[self.labels[i]]
+
+    def landmarks(self, i: int) -> list[Landmark]:
+        """Hand `i` as landmark objects accepted by recognize_gesture()."""
+        return as_landmarks(self.points[i])
+
+    def all_landmarks(self) -> list[list[Landmark]]:
+        """Every hand as landmark objects, converted in one pass."""
+        # Millions of small acyclic tuples would otherwise trigger the cyclic
+        # garbage collector over and over, tripling the conversion time.
+        was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return [list(map(Landmark._make, hand)) for hand in self.points.tolist()]
+        finally:
+            if was_enabled:
+                gc.enable()
+
+
+def _pose_arrays(labels: np.ndarray) -> tuple[np.ndarray, ...]:
+    poses = [POSES[name] for name in GESTURES]
+    splay = np.array([p.splay for p in poses])[labels]
+    flexion = np.array([p.flexion for p in poses])[labels]
+    rotation = np.array([p.rotation for p in poses])[labels]
+    return splay, flexion, rotation
+
+
+def _build_hands(splay: np.ndarray, flexion: np.ndarray) -> np.ndarray:
+    """Forward kinematics: (n, 5) splay, (n, 5, 3) flexion -> (n, 21, 3) points."""
+    n = len(splay)
+    bend = np.cumsum(flexion, axis=2)  # (n, 5, 3) angle of each bone
+    # Fingers curl towards the palm; the thumb mostly folds across it in-plane.
+    is_thumb = (np.arange(5) == 0)[None, :, None]
+    heading = splay[:, :, None] - np.where(is_thumb, bend, 0.0)
+    curl = np.where(is_thumb, 0.3 * bend, bend)
+    direction = np.stack(
+        [
+            np.sin(heading) * np.cos(curl),
+            np.cos(heading) * np.cos(curl),
+            -np.sin(curl),
+        ],
+        axis=-1,
+    )  # (n, 5, 3 bones, xyz)
+    segments = direction * _BONES[None, :, :, None]
+    knuckles = np.concatenate([_KNUCKLES, np.zeros((5, 1))], axis=1)
+    joints = knuckles[None, :, None, :] + np.cumsum(segments, axis=2)
+    points = np.zeros((n, 21, 3))
+    points[:, 1::4] = knuckles
+    points[:, 2::4] = joints[:, :, 0]
+    points[:, 3::4] = joints[:, :, 1]
+    points[:, 4::4] = joints[:, :, 2]
+    return points
+
+
+def generate_batch(
+    n: int,
+    gestures: Sequence[str] | None = None,
+    spec: HandSpec | None = None,
+    seed: int | np.random.Generator | None = None,
+) -> HandBatch:
+    """Generate `n` labelled hands, drawn uniformly from `gestures`."""
+    spec = spec or HandSpec()
+    rng = np.random.default_rng(seed)
+    choices = np.array([GESTURES.index(g) for g in (gestures or GESTURES)])
+    labels = rng.choice(choices, size=n)
+
+    splay, flexion, rotation = _pose_arrays(labels)
+    if spec.pose_jitter:
+        splay = splay + rng.normal(0, spec.pose_jitter, splay.shape)
+        flexion = flexion + rng.normal(0, spec.pose_jitter, flexion.shape)
+    points = _build_hands(splay, flexion)
+
+    if spec.handedness == "left":
+        left = np.ones(n, dtype=bool)
+    elif spec.handedness == "both":
+        left = rng.random(n) < 0.5
+    else:
+        left = np.zeros(n, dtype=bool)
+    # The model has the thumb on +x, which is a left hand in the mirrored view.
+    points[~left, :, 0] *= -1
+
+    angle = rotation + rng.uniform(-spec.rotation, spec.rotation, n)
+    # Model y points up; image y points down, so the rotation is applied
+    # in model space and y flipped afterwards.
+    cos, sin = np.cos(angle)[:, None], np.sin(angle)[:, None]
+    x, y = points[:, :, 0].copy(), points[:, :, 1].copy()
+    points[:, :, 0] = cos * x - sin * y
+    points[:, :, 1] = -(sin * x + cos * y)
+
+    size = HAND_SIZE * rng.uniform(spec.scale[0], spec.scale[1], n)
+    points *= size[:, None, None]
+
+    # Random placement that keeps the whole hand inside the image.
+    low = points[:, :, :2].min(axis=1)
+    high = points[:, :, :2].max(axis=1)
+    room = np.clip(1.0 - (high - low), 0.0, None)
+    points[:, :, :2] += (-low + rng.random((n, 2)) * room)[:, None, :]
+
+    if spec.noise:
+        points += rng.normal(0, spec.noise, points.shape)
+    return HandBatch(points.astype(np.float32), labels, left)
+
+
+def stream_batches(
+    total: int,
+    chunk_size: int = 100_000,
+    gestures: Sequence[str] | None = None,
+    spec: HandSpec | None = None,
+    seed: int | None = None,
+) -> Iterator[HandBatch]:
+    """Yield `total` hands in chunks, so memory stays flat for any volume."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, total, chunk_size):
+        yield generate_batch(min(chunk_size, total - start), gestures, spec, rng)
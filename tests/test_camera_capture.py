@@ -0,0 +1,132 @@
+"""
+Unit tests for camera_capture.py.
+
+A fake capture object stands in for cv2.VideoCapture so the drain logic can
+be tested without a webcam.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+import camera_capture
+from camera_capture import CapturedFrame, FrameAgeStats, read_frame
+from config_loader import CameraConfig
+
+
+class FakeCapture:
+    """Serves `queued` frames instantly, then blocks `live_delay_s` per frame."""
+
+    def __init__(self, queued: int, live_delay_s: float = 0.005, fail_after: int = 100):
+        self.queued = queued
+        self.live_delay_s = live_delay_s
+        self.fail_after = fail_after
+        self.grabs = 0
+        self.props: dict[int, float] = {}
+
+    def grab(self) -> bool:
+        self.grabs += 1
+        if self.grabs > self.fail_after:
+            return False
+        if self.queued:
+            self.queued -= 1
+        else:
+            camera_capture.time.sleep(self.live_delay_s)
+        return True
+
+    def retrieve(self):
+        return True, np.full((2, 2, 3), self.grabs, dtype=np.uint8)
+
+    def isOpened(self) -> bool:
+        return True
+
+    def set(self, prop: int, value: float) -> bool:
+        self.props[prop] = value
+        return True
+
+    def get(self, prop: int) -> float:
+        return self.props.get(prop, 0.0)
+
+
+def test_read_frame_without_grab_latest_returns_queued_frame():
+    cap = FakeCapture(queued=3)
+    captured = read_frame(cap, grab_latest=False)
+    assert cap.grabs == 1
+    assert captured.drained == 0
+    assert captured.stale is True
+
+
+def test_read_frame_grab_latest_drains_queue():
+    cap = FakeCapture(queued=3)
+    captured = read_frame(cap, grab_latest=True)
+    # Three instant grabs are drained, the fourth waits for a live frame.
+    assert captured.drained == 3
+    assert cap.grabs == 4
+    assert captured.stale is False
+    assert int(captured.frame[0, 0, 0]) == 4
+
+
+def test_read_frame_grab_latest_respects_max_drain():
+    cap = FakeCapture(queued=50)
+    captured = read_frame(cap, grab_latest=True, max_drain=5)
+    assert captured.drained == 5
+
+
+def test_read_frame_returns_none_when_grab_fails():
+    cap = FakeCapture(queued=0, fail_after=0)
+    assert read_frame(cap) is None
+
+
+def test_read_frame_uses_driver_timestamp_when_on_the_same_clock():
+    cap = FakeCapture(queued=1)
+    # A V4L2-style buffer timestamp, 40 ms before now on the monotonic clock.
+    exposed_ns = camera_capture.time.perf_counter_ns() - 40_000_000
+    cap.props[camera_capture.cv2.CAP_PROP_POS_MSEC] = exposed_ns / 1e6
+    captured = read_frame(cap)
+    assert captured.driver_timestamp is True
+    assert abs(captured.capture_ns - exposed_ns) < 1_000
+
+
+def test_read_frame_ignores_stream_positions():
+    cap = FakeCapture(queued=1)
+    cap.props[camera_capture.cv2.CAP_PROP_POS_MSEC] = 33.3  # video file position
+    before = camera_capture.time.perf_counter_ns()
+    captured = read_frame(cap)
+    assert captured.driver_timestamp is False
+    assert captured.capture_ns >= before
+
+
+def test_open_camera_applies_configured_properties(monkeypatch):
+    fake = FakeCapture(queued=0)
+    monkeypatch.setattr(camera_capture.cv2, "VideoCapture", lambda _source: fake)
+
+    camera = CameraConfig(width=640, height=480, fps=30, fourcc="MJPG", buffer_size=1)
+    camera_capture.open_camera(0, camera)
+
+    cv2 = camera_capture.cv2
+    assert fake.props[cv2.CAP_PROP_FRAME_WIDTH] == 640
+    assert fake.props[cv2.CAP_PROP_FRAME_HEIGHT] == 480
+    assert fake.props[cv2.CAP_PROP_FPS] == 30
+    assert fake.props[cv2.CAP_PROP_BUFFERSIZE] == 1
+    assert fake.props[cv2.CAP_PROP_FOURCC] == cv2.VideoWriter_fourcc(*"MJPG")
+
+
+def test_open_camera_leaves_driver_defaults_alone(monkeypatch):
+    fake = FakeCapture(queued=0)
+    monkeypatch.setattr(camera_capture.cv2, "VideoCapture", lambda _source: fake)
+    camera_capture.open_camera(0, CameraConfig())
+    assert fake.props == {}
+
+
+def test_frame_age_stats_summary():
+    stats = FrameAgeStats(window=10)
+    frame = np.zeros((1, 1, 3), dtype=np.uint8)
+    for i in range(5):
+        captured = CapturedFrame(frame=frame, capture_ns=0, waited_ns=0, drained=i)
+        stats.record(captured, result_ns=(i + 1) * 1_000_000)
+
+    summary = stats.summary()
+    assert summary["mean_ms"] == 3.0
+    assert summary["max_ms"] == 5.0
+    assert summary["stale_ratio"] == 1.0
+    assert summary["drained"] == 10
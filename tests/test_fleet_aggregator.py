@@ -0,0 +1,117 @@
+"""
+Unit tests for the classroom fleet aggregator: wire format, SQLite queries and
+a loopback run from reporter to database.
+"""
+
+from __future__ import annotations
+
+import socket
+import time
+
+from config_loader import FleetConfig
+from fleet_aggregator import (
+    FleetAggregator,
+    FleetReporter,
+    FleetStore,
+    GestureCount,
+    decode,
+    encode,
+)
+
+
+def test_decode_round_trip_and_malformed_lines():
+    line = encode({"kind": "gesture", "station": "a", "ts": 5, "gesture": "Yes"})
+    assert decode(line) == ("gesture", ("a", 5.0, "Yes"))
+    perf = encode({"kind": "perf", "station": "a", "ts": 1, "fps": 29.5, "frames": 3})
+    assert decode(perf) == ("perf", ("a", 1.0, 29.5, None, 3))
+    assert decode(b"not json\n") is None
+    assert decode(encode({"kind": "gesture", "station": "a", "ts": 1})) is None
+    assert decode(encode({"kind": "other", "station": "a", "ts": 1})) is None
+
+
+def test_store_queries_respect_time_range_and_station(tmp_path):
+    store = FleetStore(tmp_path / "fleet.db")
+    store.write_batch(
+        [("a", 10.0, "Hello"), ("a", 11.0, "Hello"), ("a", 12.0, "Yes")]
+        + [("b", 11.0, "Yes"), ("b", 99.0, "Yes")],
+        [("a", 10.0, 30.0, 40.0, 300), ("a", 20.0, 20.0, 80.0, 200)]
+        + [("b", 10.0, 15.0, None, 150)],
+    )
+    assert store.gesture_counts(0, 50) == [
+        GestureCount("a", "Hello", 2),
+        GestureCount("a", "Yes", 1),
+        GestureCount("b", "Yes", 1),
+    ]
+    assert store.gesture_counts(11, 100, station="b") == [GestureCount("b", "Yes", 2)]
+
+    a, b = store.station_fps(0, 50)
+    assert (a.station, a.summaries, a.frames) == ("a", 2, 500)
+    assert (a.mean_fps, a.min_fps, a.frame_age_p95_ms) == (25.0, 20.0, 80.0)
+    assert (b.station, b.frame_age_p95_ms) == ("b", None)
+    store.close()
+
+
+def test_reporter_sends_periodic_perf_summaries():
+    reporter = FleetReporter(FleetConfig(station="room-1", report_every_s=0.0))
+    reporter.record_frame(10.0)
+    reporter.record_frame(30.0)
+    messages = [reporter._queue.get_nowait() for _ in range(2)]
+    assert [m["kind"] for m in messages] == ["perf", "perf"]
+    assert messages[1]["frames"] == 1
+    assert messages[1]["frame_age_p95_ms"] == 30.0
+    assert messages[1]["station"] == "room-1"
+
+
+def test_loopback_events_are_batched_into_sqlite(tmp_path):
+    config = FleetConfig(
+        port=0, db_path=str(tmp_path / "fleet.db"), batch_size=500, queue_size=50_000
+    )
+    aggregator = FleetAggregator(config)
+    host, port = aggregator.start()
+    stations = [
+        FleetReporter(FleetConfig(port=port, station=name, queue_size=50_000))
+        for name in ("room-1", "room-2")
+    ]
+    for reporter in stations:
+        reporter.start()
+        for i in range(3000):
+            reporter.gesture("Hello" if i % 3 else "Yes", ts=1000.0 + i)
+        reporter.perf(29.0, 290)
+        reporter.stop()
+    assert all(r.sent == 3001 and r.dropped == 0 for r in stations)
+    assert aggregator.flush(timeout=10)
+    aggregator.stop()
+
+    assert aggregator.inserted == 6002
+    assert aggregator.batches < 6002 / 10  # many events per transaction
+    store = FleetStore(config.db_path)
+    counts = store.gesture_counts(1000, 4000, station="room-2")
+    assert counts == [
+        GestureCount("room-2", "Hello", 2000),
+        GestureCount("room-2", "Yes", 1000),
+    ]
+    assert [s.station for s in store.station_fps(0, 1e12)] == ["room-1", "room-2"]
+    store.close()
+
+
+def test_stop_ends_open_connections_before_the_writer(tmp_path):
+    config = FleetConfig(port=0, db_path=str(tmp_path / "fleet.db"))
+    aggregator = FleetAggregator(config)
+    host, port = aggregator.start()
+    station = socket.create_connection((host, port))
+    line = encode({"kind": "gesture", "station": "a", "ts": 1, "gesture": "Yes"})
+    station.sendall(line * 5)
+    deadline = time.monotonic() + 5
+    while aggregator.received < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert aggregator.flush(timeout=5)
+
+    aggregator.stop()  # the station is still connected
+    assert not aggregator._connections
+    aggregator.submit_line(line)  # a late line is counted, not silently lost
+    assert (aggregator.received, aggregator.inserted) == (6, 5)
+    assert aggregator.dropped == 1
+    station.close()
+    assert FleetStore(config.db_path).gesture_counts(0, 10) == [
+        GestureCount("a", "Yes", 5)
+    ]
@@ -0,0 +1,128 @@
+"""
+Unit tests for the pluggable hand-landmark backends.
+
+The Tasks backends are exercised against a fake HandLandmarker so no model
+file download is needed.
+"""
+
+from __future__ import annotations
+
+import types
+
+import numpy as np
+import pytest
+from mediapipe.tasks.python import vision
+
+from config_loader import HandBackendConfig
+from gesture_rules import recognize_gesture
+from hand_backends import HandBackend, StubBackend, TasksBackend, create_backend
+
+FRAME = np.zeros((48, 64, 3), dtype=np.uint8)
+
+
+def fake_output(x=0.5):
+    landmark = types.SimpleNamespace(x=x, y=0.5, z=0.0)
+    category = types.SimpleNamespace(category_name="Left")
+    return types.SimpleNamespace(
+        hand_landmarks=[[landmark] * 21], handedness=[[category]]
+    )
+
+
+class FakeLandmarker:
+    def __init__(self, options):
+        self.callback = options.result_callback
+        self.video_calls = []
+        self.async_calls = []
+        self.closed = False
+
+    def detect_for_video(self, _image, timestamp_ms):
+        self.video_calls.append(timestamp_ms)
+        return fake_output()
+
+    def detect_async(self, _image, timestamp_ms):
+        self.async_calls.append(timestamp_ms)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def tasks_config(monkeypatch, tmp_path):
+    model = tmp_path / "hand_landmarker.task"
+    model.write_bytes(b"model")
+    monkeypatch.setattr(
+        vision.HandLandmarker, "create_from_options", staticmethod(FakeLandmarker)
+    )
+    return HandBackendConfig(model_path=str(model))
+
+
+def test_stub_cycles_through_gestures():
+    config = HandBackendConfig(name="stub", stub_gestures=["Hello", None, "Yes"])
+    results = []
+    with create_backend(config, on_result=results.append) as backend:
+        labels = []
+        for _ in range(6):
+            result = backend.detect(FRAME)
+            hands = result.multi_hand_landmarks
+            labels.append(recognize_gesture(hands[0].landmark) if hands else None)
+    assert labels == ["Hello", None, "Yes"] * 2
+    assert backend.frames == backend.results == len(results) == 6
+
+
+def test_timestamps_strictly_increase():
+    backend = StubBackend(HandBackendConfig(name="stub"))
+    stamps = [backend.detect(FRAME, ts).timestamp_ms for ts in (10, 10, 5, 40)]
+    assert stamps == [10, 11, 12, 40]
+
+
+def test_backend_without_detect_fails_when_created():
+    class Incomplete(HandBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown hand backend"):
+        create_backend(HandBackendConfig(name="opencl"))
+
+
+def test_tasks_backend_needs_the_model_file(tmp_path):
+    config = HandBackendConfig(name="tasks_video", model_path=str(tmp_path / "x.task"))
+    with pytest.raises(FileNotFoundError):
+        create_backend(config)
+
+
+def test_tasks_video_mode_is_synchronous(tasks_config):
+    backend = TasksBackend(tasks_config, live_stream=False)
+    result = backend.detect(FRAME, 100)
+    assert backend._landmarker.video_calls == [100]
+    assert len(result.multi_hand_landmarks) == 1
+    assert len(result.multi_hand_landmarks[0].landmark) == 21
+    assert result.handedness == ["Left"]
+    backend.close()
+    assert backend._landmarker.closed
+
+
+def test_tasks_live_stream_returns_results_as_they_arrive(tasks_config):
+    received = []
+    backend = TasksBackend(tasks_config, live_stream=True, on_result=received.append)
+    landmarker = backend._landmarker
+    assert backend.capabilities.asynchronous
+
+    # Submitting never blocks and returns nothing until a result arrives.
+    assert backend.detect(FRAME, 10) is None
+    assert backend.detect(FRAME, 20) is None
+    assert backend.detect(FRAME, 30) is None
+    assert landmarker.async_calls == [10, 20, 30] and backend.pending == 3
+
+    # The graph skips frame 10 and answers 20; 10 is counted as dropped.
+    landmarker.callback(fake_output(0.2), None, 20)
+    assert backend.dropped == 1 and backend.pending == 1
+    assert [r.timestamp_ms for r in received] == [20]
+
+    result = backend.detect(FRAME, 40)
+    assert result.timestamp_ms == 20
+    assert result.multi_hand_landmarks[0].landmark[0].x == pytest.approx(0.2)
+    assert backend.detect(FRAME, 50) is None  # the newest result is handed out once
@@ -10,6 +10,7 @@ from __future__ import annotations
 import types
 
 import health_check
+from config_loader import AppConfig
 
 
 class DummyLogger:
@@ -93,3 +94,46 @@ def test_check_mediapipe_available(monkeypatch, capsys):
     out = capsys.readouterr().out
     assert ok is True
     assert "[OK]" in out
+
+
+class FakeCapture:
+    def __init__(self, _index):
+        self.released = False
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        self.released = True
+
+
+def test_fps_smoke_test_reports_missing_model_and_releases_camera(monkeypatch, capsys):
+    captures = []
+
+    def open_capture(index):
+        captures.append(FakeCapture(index))
+        return captures[-1]
+
+    def missing_model():
+        raise FileNotFoundError("hand_landmarker.task")
+
+    monkeypatch.setattr(health_check.cv2, "VideoCapture", open_capture)
+    monkeypatch.setattr(health_check, "_create_hand_backend", missing_model)
+
+    ok = health_check.quick_fps_smoke_test(DummyLogger())
+    out = capsys.readouterr().out
+    assert ok is False
+    assert "[FAIL] FPS smoke test" in out
+    assert "hand_landmarker.task" in out
+    assert captures[0].released
+
+
+def test_fps_smoke_test_waits_for_live_stream_results(monkeypatch):
+    created = []
+    config = AppConfig()
+    config.hand_backend.name = "tasks_live_stream"
+    monkeypatch.setattr(health_check, "load_config", lambda: config)
+    monkeypatch.setattr(health_check, "create_backend", created.append)
+
+    health_check._create_hand_backend()
+    assert created[0].name == "tasks_video"
@@ -0,0 +1,119 @@
+"""
+Unit tests for the One-Euro landmark tracker.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from config_loader import TrackingConfig
+from gesture_rules import HELLO_MIN_DIST, recognize_gesture
+from landmark_filter import (
+    LandmarkTracker,
+    OneEuroFilter,
+    as_landmarks,
+    landmarks_to_array,
+)
+
+DT = 1 / 30
+
+
+def make_hand(offset=(0.5, 0.5)) -> np.ndarray:
+    rng = np.random.default_rng(1)
+    points = rng.uniform(-0.1, 0.1, size=(21, 3))
+    points[:, :2] += offset
+    return points
+
+
+def test_filter_reduces_jitter_on_still_hand():
+    rng = np.random.default_rng(0)
+    truth = make_hand()
+    filt = OneEuroFilter()
+    raw_err, filt_err = [], []
+    for i in range(120):
+        noisy = truth + rng.normal(0, 0.005, truth.shape)
+        smoothed = filt.update(noisy, i * DT)
+        if i > 30:
+            raw_err.append(np.abs(noisy - truth).mean())
+            filt_err.append(np.abs(smoothed - truth).mean())
+    assert np.mean(filt_err) < 0.5 * np.mean(raw_err)
+
+
+def test_predict_extrapolates_constant_velocity():
+    velocity = np.array([0.3, -0.1, 0.0])  # normalised units per second
+    hand = make_hand()
+    filt = OneEuroFilter(beta=50.0)
+    for i in range(60):
+        filt.update(hand + velocity * i * DT, i * DT)
+    last_t = 59 * DT
+    predicted = filt.predict(last_t + 3 * DT)
+    expected = hand + velocity * (last_t + 3 * DT)
+    assert np.abs(predicted - expected).max() < 0.01
+    # The horizon cap stops runaway extrapolation.
+    capped = filt.predict(last_t + 10, max_horizon_s=0.1)
+    assert np.abs(capped - (filt.x + filt.dx * 0.1)).max() < 1e-12
+
+
+def test_tracker_detects_every_nth_frame_and_predicts_between():
+    tracker = LandmarkTracker(TrackingConfig(enabled=True, detect_every=3))
+    hand = make_hand()
+    pattern = []
+    for i in range(9):
+        if tracker.detection_due():
+            pattern.append("D")
+            tracker.update([hand], i * DT)
+        else:
+            pattern.append("p")
+            assert len(tracker.predict(i * DT)) == 1
+    assert "".join(pattern) == "DppDppDpp"
+
+
+def test_hold_clears_velocity_so_prediction_does_not_jump():
+    tracker = LandmarkTracker(TrackingConfig(enabled=True, max_predict_s=0.5))
+    hand = make_hand()
+    for i in range(20):  # a hand moving right, then it stops still
+        tracker.update([hand + [0.5 * i * DT, 0.0, 0.0]], i * DT)
+    held = tracker.hold(1.0)[0]
+    predicted = tracker.predict(1.0 + DT)[0]
+    assert np.abs(predicted - held).max() < 1e-12
+
+
+def test_tracker_keeps_hands_apart_and_drops_lost_ones():
+    tracker = LandmarkTracker(TrackingConfig(enabled=True, max_missed=1))
+    left, right = make_hand((0.25, 0.5)), make_hand((0.75, 0.5))
+    tracker.update([left, right], 0.0)
+    tracked = tracker.update([right + 0.01, left + 0.01], DT)
+    assert len(tracked) == 2
+    assert tracked[0][0, 0] < 0.5 < tracked[1][0, 0]  # track order is stable
+
+    assert len(tracker.update([left], 2 * DT)) == 2  # right missed once: predicted
+    assert len(tracker.update([left], 3 * DT)) == 1  # missed twice: dropped
+
+
+def test_smoothing_stops_gesture_flicker_near_threshold():
+    """A hand hovering on the Hello threshold flickers raw but not filtered."""
+    rng = np.random.default_rng(2)
+    hand = np.zeros((21, 3))
+    # Fingertips sit just beyond the Hello distance from the thumb tip.
+    for tip, angle in zip((8, 12, 16, 20), (0.0, 0.5, 1.0, 1.5), strict=True):
+        hand[tip, :2] = (HELLO_MIN_DIST + 0.004) * np.array(
+            [np.cos(angle), np.sin(angle)]
+        )
+    tracker = LandmarkTracker(TrackingConfig(enabled=True))
+    raw, smoothed = [], []
+    for i in range(90):
+        noisy = hand + rng.normal(0, 0.004, hand.shape)
+        raw.append(recognize_gesture(as_landmarks(noisy)))
+        smoothed.append(
+            recognize_gesture(as_landmarks(tracker.update([noisy], i * DT)[0]))
+        )
+
+    def flips(labels):
+        return sum(a != b for a, b in zip(labels[:-1], labels[1:], strict=True))
+
+    assert flips(smoothed[30:]) < flips(raw[30:]) / 3
+
+
+def test_landmark_round_trip():
+    hand = make_hand()
+    assert np.allclose(landmarks_to_array(as_landmarks(hand)), hand)
@@ -0,0 +1,91 @@
+"""
+Unit tests for the glass-to-label latency probe: frame barcodes, the paced
+camera stand-in and drop/reorder accounting.
+"""
+
+from __future__ import annotations
+
+import time
+
+import cv2
+import numpy as np
+
+from camera_capture import read_frame
+from config_loader import AppConfig, HandBackendConfig
+from latency_probe import (
+    LatencyProbe,
+    StampedSource,
+    embed_stamp,
+    read_stamp,
+    run_headless,
+)
+from soak_benchmark import SyntheticSource
+
+
+def stamped(seq, glass_ns, shape=(120, 160, 3)):
+    return embed_stamp(np.full(shape, 100, dtype=np.uint8), seq, glass_ns)
+
+
+def test_stamp_survives_colour_conversion_and_one_damaged_corner():
+    frame = stamped(123456, 987654321012)
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    assert read_stamp(rgb) == (123456, 987654321012)
+    cv2.line(rgb, (0, 0), (120, 15), (0, 255, 0), 2)  # landmarks drawn on top
+    assert read_stamp(rgb) == (123456, 987654321012)
+    rgb[-16:, -128:] = 0
+    assert read_stamp(rgb) is None
+
+
+def test_paced_source_skips_frames_when_the_reader_is_late():
+    source = StampedSource(160, 120, fps=200.0, buffer_size=1)
+    first = read_stamp(read_frame(source).frame)
+    time.sleep(0.05)  # about ten frame periods
+    before = time.perf_counter_ns()
+    second = read_stamp(read_frame(source).frame)
+    assert first[0] == 0
+    assert second[0] >= 5
+    assert second[1] <= before  # glass time is when the frame existed
+
+
+def test_buffered_source_returns_the_oldest_queued_frame():
+    source = StampedSource(160, 120, fps=200.0, buffer_size=4)
+    read_frame(source)
+    time.sleep(0.05)
+    seq, _ = read_stamp(read_frame(source).frame)
+    assert seq >= 5  # frames older than the queue are gone ...
+    assert read_stamp(read_frame(source).frame)[0] == seq + 1  # ... the rest wait
+
+
+def test_probe_counts_drops_reorders_and_repeats():
+    probe = LatencyProbe()
+    for seq in (0, 1, 3, 2, 3, 6):
+        probe.observe(stamped(seq, 1_000_000), label_ns=1_000_000 + 5_000_000 * seq)
+    probe.observe(np.zeros((120, 160, 3), dtype=np.uint8))
+    report = probe.report()
+    assert report.frames_shown == 5
+    assert report.frames_emitted == 7
+    assert report.dropped == 2  # 4 and 5
+    assert (report.reordered, report.repeated, report.unreadable) == (1, 1, 1)
+    assert report.gaps == {1: 3, 3: 1}
+    assert report.max_ms == 30.0
+    assert sum(count for _, count in report.histogram) == 5
+
+
+def test_headless_run_measures_every_frame():
+    config = AppConfig(hand_backend=HandBackendConfig(name="stub"))
+    config.gui.refresh_ms = 0
+    probe = LatencyProbe()
+    run_headless(StampedSource(160, 120, fps=0), config, probe, frames=20)
+    report = probe.report()
+    assert report.frames_shown == 20
+    assert report.dropped == report.reordered == report.unreadable == 0
+    assert 0 < report.p50_ms < 1000
+
+
+def test_headless_run_ends_when_no_stamp_is_readable():
+    config = AppConfig(hand_backend=HandBackendConfig(name="stub"))
+    config.gui.refresh_ms = 0
+    probe = LatencyProbe()
+    run_headless(SyntheticSource(160, 120), config, probe, frames=5)
+    assert probe.unreadable == 5
+    assert probe.frames_shown == 0
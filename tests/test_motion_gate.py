@@ -0,0 +1,76 @@
+"""
+Unit tests for the motion gate that skips hand detection on static scenes.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from config_loader import MotionGateConfig
+from motion_gate import MotionGate
+
+
+def make_frame(value: int = 100) -> np.ndarray:
+    return np.full((120, 160, 3), value, dtype=np.uint8)
+
+
+def test_first_frame_is_always_processed():
+    gate = MotionGate(MotionGateConfig(enabled=True))
+    assert gate.should_process(make_frame()) is True
+
+
+def test_static_frames_are_skipped():
+    gate = MotionGate(MotionGateConfig(enabled=True, max_skip=100))
+    gate.should_process(make_frame())
+    results = [gate.should_process(make_frame()) for _ in range(10)]
+    assert results == [False] * 10
+    assert gate.skipped == 10
+    assert gate.skip_ratio == 10 / 11
+
+
+def test_motion_triggers_processing():
+    gate = MotionGate(MotionGateConfig(enabled=True, max_skip=100))
+    gate.should_process(make_frame())
+    moved = make_frame()
+    moved[30:90, 40:120] = 255  # a bright "hand" enters the frame
+    assert gate.should_process(moved) is True
+    assert gate.last_score > 0.1
+
+
+def test_check_keeps_reference_until_processing_is_confirmed():
+    gate = MotionGate(MotionGateConfig(enabled=True, max_skip=100))
+    gate.should_process(make_frame())
+    moved = make_frame()
+    moved[30:90, 40:120] = 255
+    assert gate.check(moved) is True
+    gate.mark_skipped()  # e.g. the tracker predicted instead of detecting
+    assert gate.check(moved) is True  # still compared with the old reference
+    gate.mark_processed()
+    assert gate.check(moved) is False
+    assert (gate.processed, gate.skipped) == (2, 1)
+
+
+def test_small_noise_is_ignored():
+    gate = MotionGate(MotionGateConfig(enabled=True, pixel_delta=15, max_skip=100))
+    gate.should_process(make_frame(100))
+    assert gate.should_process(make_frame(105)) is False
+
+
+def test_forced_recheck_after_max_skip():
+    gate = MotionGate(MotionGateConfig(enabled=True, max_skip=3))
+    gate.should_process(make_frame())
+    results = [gate.should_process(make_frame()) for _ in range(4)]
+    assert results == [False, False, False, True]
+
+
+def test_disabled_gate_processes_everything():
+    gate = MotionGate(MotionGateConfig(enabled=False))
+    assert all(gate.should_process(make_frame()) for _ in range(5))
+    assert gate.skip_ratio == 0.0
+
+
+def test_reset_forces_next_frame():
+    gate = MotionGate(MotionGateConfig(enabled=True, max_skip=100))
+    gate.should_process(make_frame())
+    gate.reset()
+    assert gate.should_process(make_frame()) is True
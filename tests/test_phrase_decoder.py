@@ -0,0 +1,144 @@
+"""
+Unit tests for the gesture-sequence-to-phrase decoder.
+"""
+
+from __future__ import annotations
+
+import itertools
+import random
+
+from gesture_rules import GESTURE_DESCRIPTIONS
+from phrase_decoder import (
+    GestureEventDetector,
+    PhraseDecoder,
+    PhraseTrie,
+    load_lexicon,
+)
+
+
+def make_trie() -> PhraseTrie:
+    trie = PhraseTrie()
+    trie.insert(["Hello"], "Hello!")
+    trie.insert(["Yes"], "Yes.")
+    trie.insert(["Yes", "Please"], "Yes, please.")
+    trie.insert(["Hello", "Yes", "Please"], "Hello, yes please.")
+    trie.insert(["Goodbye"], "Goodbye!")
+    return trie
+
+
+def finals(events) -> list[str]:
+    return [e.phrase for e in events if e.kind == "final"]
+
+
+def test_trie_lookup_and_shortest_completion():
+    trie = make_trie()
+    assert len(trie) == 5
+    assert trie.lookup(["Yes", "Please"]).phrase == "Yes, please."
+    assert trie.lookup(["Please"]) is None
+    # "Hello" is a phrase itself, so it is the shortest completion of its prefix.
+    assert trie.lookup(["Hello"]).best == "Hello!"
+    assert trie.lookup(["Hello", "Yes"]).best == "Hello, yes please."
+
+
+def test_leaf_phrase_is_final_immediately():
+    decoder = PhraseDecoder(make_trie())
+    assert finals(decoder.push("Goodbye", 0.0)) == ["Goodbye!"]
+
+
+def test_prefix_phrase_waits_for_longer_match():
+    decoder = PhraseDecoder(make_trie())
+    events = decoder.push("Yes", 0.0)
+    assert finals(events) == []
+    assert events[-1].kind == "partial"
+    assert events[-1].phrase == "Yes."
+
+    events = decoder.push("Please", 0.5)
+    assert finals(events) == ["Yes, please."]
+    assert events[0].start_t == 0.0
+    assert events[0].end_t == 0.5
+
+
+def test_pause_finalises_pending_phrase():
+    decoder = PhraseDecoder(make_trie(), max_gap_s=1.0)
+    decoder.push("Yes", 0.0)
+    assert decoder.tick(0.5) == []
+    assert finals(decoder.tick(1.5)) == ["Yes."]
+
+
+def test_non_extending_gesture_commits_pending_then_continues():
+    decoder = PhraseDecoder(make_trie())
+    decoder.push("Yes", 0.0)
+    assert finals(decoder.push("Goodbye", 0.5)) == ["Yes.", "Goodbye!"]
+
+
+def test_non_extending_gesture_keeps_abandoned_shorter_phrases():
+    decoder = PhraseDecoder(make_trie())
+    decoder.push("Hello", 0.0)
+    decoder.push("Yes", 0.5)
+    # "Goodbye" extends neither "Hello, Yes" nor "Yes"; both phrases survive.
+    events = decoder.push("Goodbye", 1.0)
+    assert finals(events) == ["Hello!", "Yes.", "Goodbye!"]
+    assert decoder.flush() == []
+
+
+def test_abandoned_long_match_falls_back_to_shorter_phrases():
+    decoder = PhraseDecoder(make_trie())
+    decoder.push("Hello", 0.0)
+    decoder.push("Yes", 0.5)
+    # "Hello, Yes, Please" never completes; both single phrases are recovered.
+    assert finals(decoder.flush()) == ["Hello!", "Yes."]
+
+
+def test_unknown_gestures_are_ignored():
+    decoder = PhraseDecoder(make_trie())
+    assert decoder.push("Thank You", 0.0) == []
+    assert finals(decoder.push("Goodbye", 0.5)) == ["Goodbye!"]
+
+
+def test_event_detector_requires_stable_and_new_gesture():
+    detector = GestureEventDetector(hold_frames=3)
+    labels = ["Hello", "Hello", "Hello", "Hello", "Yes", "Yes", "Yes"]
+    assert [e for e in map(detector.update, labels) if e] == ["Hello", "Yes"]
+
+
+def test_event_detector_allows_repeat_after_pause():
+    detector = GestureEventDetector(hold_frames=2)
+    labels = ["Yes", "Yes", None, None, "Yes", "Yes"]
+    assert [e for e in map(detector.update, labels) if e] == ["Yes", "Yes"]
+
+
+def test_shipped_lexicon_uses_known_gestures():
+    trie = load_lexicon("phrases.yaml")
+    assert len(trie) > 0
+    assert set(trie.root.children) <= set(GESTURE_DESCRIPTIONS)
+
+
+def test_load_lexicon_skips_malformed_entries(tmp_path):
+    path = tmp_path / "phrases.yaml"
+    path.write_text(
+        'phrases:\n  - gestures: ["Hello"]\n    phrase: "Hi"\n  - phrase: "broken"\n',
+        encoding="utf-8",
+    )
+    assert len(load_lexicon(path)) == 1
+
+
+def test_large_lexicon_decodes_every_phrase():
+    """Thousands of phrases: each one decodes back to itself."""
+    vocab = [f"g{i}" for i in range(20)]
+    rng = random.Random(0)
+    trie = PhraseTrie()
+    phrases = {}
+    for length in (2, 3):
+        for combo in itertools.product(vocab, repeat=length):
+            if rng.random() < 0.4:
+                phrases[combo] = " ".join(combo)
+                trie.insert(combo, phrases[combo])
+    assert len(trie) > 2000
+
+    decoder = PhraseDecoder(trie, max_gap_s=1.0)
+    for t, (combo, phrase) in enumerate(list(phrases.items())[:200]):
+        events = []
+        for i, gesture in enumerate(combo):
+            events += decoder.push(gesture, t * 10 + i * 0.1)
+        events += decoder.tick(t * 10 + 5)
+        assert phrase in finals(events)
@@ -0,0 +1,83 @@
+"""
+Unit tests for the built-in frame profiler.
+"""
+
+from __future__ import annotations
+
+import csv
+import tracemalloc
+
+import pytest
+
+from profiling import FrameProfiler
+
+_leak: list[bytes] = []
+
+
+def leaky_frame_work() -> None:
+    """Stand-in for update_frame() that allocates and keeps ~10 KB per frame."""
+    _leak.append(bytes(10_000))
+    sum(i * i for i in range(1000))
+
+
+def test_profiles_exactly_n_frames(tmp_path):
+    profiler = FrameProfiler("test", num_frames=3, output_dir=tmp_path)
+    for _ in range(5):
+        with profiler.frame():
+            leaky_frame_work()
+    assert profiler.done
+    assert profiler.frames == 3
+    assert len(profiler.frame_ms) == 3
+    profiler.write_report()
+
+
+def test_report_contains_hot_functions_and_growth(tmp_path):
+    _leak.clear()
+    profiler = FrameProfiler(
+        "test", num_frames=20, snapshot_every=10, output_dir=tmp_path
+    )
+    for _ in range(20):
+        with profiler.frame():
+            leaky_frame_work()
+    report_path = profiler.write_report()
+
+    report = report_path.read_text(encoding="utf-8")
+    assert "leaky_frame_work" in report
+    assert "Memory growth" in report
+    assert "test_profiling.py" in report  # the leaking line is named
+    assert min(profiler.alloc_deltas) >= 10_000
+    assert len(profiler.snapshots) == 3  # baseline + frames 10 and 20
+
+    with report_path.with_suffix(".csv").open(encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 20
+    assert report_path.with_suffix(".prof").exists()
+
+
+def test_stops_tracemalloc_it_started(tmp_path):
+    assert not tracemalloc.is_tracing()
+    profiler = FrameProfiler("test", num_frames=1, output_dir=tmp_path)
+    with profiler.frame():
+        leaky_frame_work()
+    profiler.write_report()
+    assert not tracemalloc.is_tracing()
+
+
+def test_reports_in_the_same_second_do_not_overwrite(tmp_path):
+    paths = set()
+    for _ in range(2):
+        profiler = FrameProfiler("test", num_frames=1, output_dir=tmp_path)
+        with profiler.frame():
+            leaky_frame_work()
+        paths.add(profiler.write_report())
+    assert len(paths) == 2
+    assert len(list(tmp_path.glob("*.txt"))) == 2
+
+
+def test_gui_rejects_profile_in_multiprocess_mode(monkeypatch):
+    import makaton_gesture_recognition as app
+
+    monkeypatch.setattr(app, "PIPELINE_MODE", "multiprocess")
+    with pytest.raises(SystemExit):
+        app.parse_args(["--profile", "5"])
+    assert app.parse_args([]).profile == 0
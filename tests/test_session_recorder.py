@@ -0,0 +1,151 @@
+"""
+Unit tests for the background session recorder.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import types
+
+import numpy as np
+
+import session_recorder
+from config_loader import RecordingConfig
+from session_recorder import SessionRecorder
+
+
+def make_frame() -> np.ndarray:
+    return np.zeros((48, 64, 3), dtype=np.uint8)
+
+
+def read_stream(recorder: SessionRecorder) -> list[dict]:
+    lines = recorder.stream_path.read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines]
+
+
+def test_submit_without_start_is_ignored():
+    recorder = SessionRecorder()
+    assert recorder.submit(make_frame()) is False
+    assert recorder.stats()["submitted"] == 0
+
+
+def test_records_video_and_landmark_stream(tmp_path):
+    recorder = SessionRecorder(RecordingConfig(output_dir=str(tmp_path)))
+    recorder.start(fps=10)
+    landmarks = [(0.1, 0.2, 0.0)] * 21
+    for i in range(5):
+        recorder.submit(make_frame(), "Hello" if i % 2 else None, landmarks)
+    stats = recorder.stop()
+
+    assert stats == {"submitted": 5, "written": 5, "dropped": 0, "unencoded": 0}
+    assert recorder.video_path.exists()
+    records = read_stream(recorder)
+    assert [r["frame"] for r in records[:-1]] == [0, 1, 2, 3, 4]
+    assert records[1]["gesture"] == "Hello"
+    assert records[0]["landmarks"][0] == [0.1, 0.2, 0.0]
+    assert records[-1] == {"summary": stats}
+
+
+def test_accepts_mediapipe_style_landmarks(tmp_path):
+    recorder = SessionRecorder(RecordingConfig(output_dir=str(tmp_path)))
+    recorder.start()
+    point = types.SimpleNamespace(x=0.5, y=0.25, z=-0.1)
+    recorder.submit(make_frame(), "Yes", [point] * 21)
+    recorder.stop()
+    assert read_stream(recorder)[0]["landmarks"][0] == [0.5, 0.25, -0.1]
+
+
+def test_drops_frames_instead_of_blocking_when_encoder_is_slow(tmp_path, monkeypatch):
+    release = threading.Event()
+
+    class BlockingWriter:
+        def __init__(self, *args, **kwargs): ...
+
+        def isOpened(self):
+            return True
+
+        def write(self, _frame):
+            release.wait(timeout=5)
+
+        def release(self): ...
+
+    monkeypatch.setattr(session_recorder.cv2, "VideoWriter", BlockingWriter)
+
+    recorder = SessionRecorder(RecordingConfig(output_dir=str(tmp_path), queue_size=2))
+    recorder.start(fps=10)
+    accepted = [recorder.submit(make_frame()) for _ in range(10)]
+    release.set()
+    stats = recorder.stop()
+
+    assert accepted.count(False) == stats["dropped"]
+    assert stats["dropped"] >= 7
+    assert stats["written"] + stats["dropped"] == stats["submitted"] == 10
+    # Dropped frames show up as gaps in the submit sequence numbers.
+    seqs = [r["seq"] for r in read_stream(recorder)[:-1]]
+    assert len(seqs) == stats["written"]
+
+
+def fake_writer(opened=True):
+    class FakeWriter:
+        instances = []
+
+        def __init__(self, _path, _fourcc, fps, _size):
+            self.fps = fps
+            self.frames = 0
+            FakeWriter.instances.append(self)
+
+        def isOpened(self):
+            return opened
+
+        def write(self, _frame):
+            self.frames += 1
+
+        def release(self): ...
+
+    return FakeWriter
+
+
+def test_unknown_frame_rate_is_measured_from_submit_times(tmp_path, monkeypatch):
+    writer = fake_writer()
+    monkeypatch.setattr(session_recorder.cv2, "VideoWriter", writer)
+    clock = iter(i / 25 for i in range(1000))
+    monkeypatch.setattr(session_recorder.time, "perf_counter", lambda: next(clock))
+
+    recorder = SessionRecorder(RecordingConfig(output_dir=str(tmp_path), fps=0))
+    recorder.start()
+    for _ in range(40):
+        recorder.submit(make_frame())
+    stats = recorder.stop()
+
+    assert abs(writer.instances[0].fps - 25.0) < 1e-6
+    assert writer.instances[0].frames == stats["written"] == 40
+
+
+def test_failed_video_writer_keeps_landmark_stream_honest(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_recorder.cv2, "VideoWriter", fake_writer(False))
+    recorder = SessionRecorder(RecordingConfig(output_dir=str(tmp_path)))
+    recorder.start(fps=10)
+    for _ in range(3):
+        recorder.submit(make_frame(), "Yes")
+    stats = recorder.stop()
+
+    assert stats == {"submitted": 3, "written": 0, "dropped": 0, "unencoded": 3}
+    records = read_stream(recorder)
+    assert [r["frame"] for r in records[:-1]] == [None, None, None]
+    assert [r["gesture"] for r in records[:-1]] == ["Yes"] * 3
+
+
+def test_gui_shutdown_finalises_an_active_recording(tmp_path, monkeypatch):
+    import makaton_gesture_recognition as app
+
+    recorder = SessionRecorder(RecordingConfig(output_dir=str(tmp_path)))
+    recorder.start(fps=10)
+    recorder.submit(make_frame())
+    window = types.SimpleNamespace(mainloop=lambda: None)  # window closed at once
+    monkeypatch.setattr(app, "recorder", recorder)
+    monkeypatch.setattr(app, "build_ui", lambda: window)
+    monkeypatch.setattr(app, "window", window)
+    app.main([])
+    assert not recorder.recording
+    assert read_stream(recorder)[-1]["summary"]["written"] == 1
@@ -0,0 +1,118 @@
+"""
+Unit tests for the shared-memory frame ring.
+
+These tests exercise the ring within a single process; the full capture and
+inference processes need a webcam and MediaPipe, so they are covered by
+`benchmark.py --mode multiprocess` instead.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+import shared_frame_ring
+from shared_frame_ring import SharedFrameRing, _next_seq, capture_process
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.create((4, 6, 3), num_slots=3)
+    yield ring
+    ring.close()
+
+
+def test_write_then_view_returns_frame_without_copy(ring):
+    frame = np.full((4, 6, 3), 7, dtype=np.uint8)
+    seq = ring.write(frame, timestamp_ns=123)
+
+    view = ring.view(seq)
+    assert seq == 1
+    assert ring.latest_seq() == 1
+    assert ring.timestamp_ns(seq) == 123
+    assert np.array_equal(view, frame)
+    assert np.shares_memory(view, ring.view(seq))
+
+
+def test_overwritten_frame_is_invalid(ring):
+    frame = np.zeros((4, 6, 3), dtype=np.uint8)
+    first = ring.write(frame)
+    for _ in range(ring.spec.num_slots):
+        ring.write(frame)
+
+    assert ring.is_valid(first) is False
+    assert ring.view(first) is None
+
+
+def test_slot_marked_busy_during_write(ring):
+    seq, view = ring.begin_write()
+    assert ring.view(seq) is None
+
+    view[:] = 1
+    ring.commit(seq)
+    assert ring.view(seq) is not None
+
+
+def test_attached_ring_sees_writes(ring):
+    other = SharedFrameRing.attach(ring.spec)
+    try:
+        seq = ring.write(np.full((4, 6, 3), 42, dtype=np.uint8))
+        assert other.latest_seq() == seq
+        assert int(other.view(seq)[0, 0, 0]) == 42
+    finally:
+        other.close()
+
+
+def test_slot_free_waits_for_consumer(ring):
+    frame = np.zeros((4, 6, 3), dtype=np.uint8)
+    for _ in range(ring.spec.num_slots):
+        ring.write(frame)
+
+    next_seq = ring.latest_seq() + 1
+    assert ring.slot_free(next_seq) is False
+
+    ring.mark_consumed(next_seq - ring.spec.num_slots)
+    assert ring.slot_free(next_seq) is True
+
+
+def test_read_latest_returns_private_copy(ring):
+    ring.write(np.full((4, 6, 3), 5, dtype=np.uint8))
+    seq, frame = ring.read_latest()
+    frame[:] = 0
+    assert int(ring.view(seq)[0, 0, 0]) == 5
+
+
+def test_next_seq_round_robin_in_order():
+    # Two workers, lossless: worker 0 takes 1, 3, 5...; worker 1 takes 2, 4, 6...
+    assert _next_seq(10, 0, 0, 2, drop_stale=False) == 1
+    assert _next_seq(10, 1, 0, 2, drop_stale=False) == 3
+    assert _next_seq(10, 0, 1, 2, drop_stale=False) == 2
+
+
+def test_next_seq_drop_stale_jumps_to_newest_owned_frame():
+    assert _next_seq(10, 1, 0, 2, drop_stale=True) == 9
+    assert _next_seq(10, 2, 1, 2, drop_stale=True) == 10
+    assert _next_seq(7, 0, 0, 1, drop_stale=True) == 7
+
+
+def test_capture_gives_up_when_a_worker_never_starts(tmp_path, monkeypatch):
+    clip = tmp_path / "clip.avi"
+    writer = cv2.VideoWriter(str(clip), cv2.VideoWriter_fourcc(*"MJPG"), 30, (6, 4))
+    for _ in range(3):
+        writer.write(np.zeros((4, 6, 3), dtype=np.uint8))
+    writer.release()
+    monkeypatch.setattr(shared_frame_ring, "WORKER_START_TIMEOUT_S", 0.1)
+
+    ring = SharedFrameRing.create((4, 6, 3), num_slots=3)
+    done = threading.Event()
+    try:
+        capture_process(
+            ring.spec, str(clip), threading.Event(), done, threading.Semaphore(0), 2
+        )
+        assert done.is_set()
+        assert ring.latest_seq() == 0  # no frame was written
+    finally:
+        ring.close()
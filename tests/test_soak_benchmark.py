@@ -0,0 +1,102 @@
+"""
+Unit tests for the soak benchmark's sources, sampling and drift checks.
+"""
+
+from __future__ import annotations
+
+from camera_capture import read_frame
+from config_loader import AppConfig, SoakConfig
+from hand_backends import HandResult
+from soak_benchmark import (
+    SoakMonitor,
+    SoakSample,
+    SyntheticSource,
+    analyse,
+    run_headless,
+)
+
+
+class FakeBackend:
+    def __init__(self):
+        self.calls = 0
+
+    def detect(self, _rgb, _timestamp_ms=None):
+        self.calls += 1
+        return HandResult()
+
+
+def make_samples(rss_per_hour=0.0, p99_end=10.0, hours=4):
+    samples = []
+    for i in range(hours * 6 + 1):
+        sim_s = i * 600.0
+        p99 = 10.0 + (p99_end - 10.0) * i / (hours * 6)
+        samples.append(
+            SoakSample(
+                sim_s=sim_s,
+                wall_s=sim_s / 10,
+                frames=int(sim_s * 30),
+                rss_mb=200 + rss_per_hour * sim_s / 3600,
+                objects=90_000,
+                p50_ms=5.0,
+                p99_ms=p99,
+                log_records=0,
+                log_items=0,
+            )
+        )
+    return samples
+
+
+def test_synthetic_source_is_deterministic_and_moving():
+    a, b = SyntheticSource(160, 120), SyntheticSource(160, 120)
+    frames_a = [read_frame(a).frame for _ in range(3)]
+    frames_b = [read_frame(b).frame for _ in range(3)]
+    assert all((fa == fb).all() for fa, fb in zip(frames_a, frames_b, strict=True))
+    assert (frames_a[0] != frames_a[1]).any()
+    a.release()
+    assert read_frame(a) is None
+
+
+def test_flat_run_passes():
+    verdict = analyse(make_samples(), SoakConfig())
+    assert verdict.passed
+    assert abs(verdict.rss_slope_mb_per_hour) < 1e-6
+    assert verdict.p99_drift == 0.0
+
+
+def test_memory_slope_fails():
+    verdict = analyse(make_samples(rss_per_hour=50.0), SoakConfig())
+    assert not verdict.passed
+    assert abs(verdict.rss_slope_mb_per_hour - 50.0) < 1e-6
+    assert "RSS grows" in verdict.failures[0]
+
+
+def test_unreadable_rss_is_not_a_pass():
+    samples = make_samples()
+    for sample in samples:
+        sample.rss_mb = 0.0
+    verdict = analyse(samples, SoakConfig())
+    assert not verdict.passed
+    assert verdict.rss_slope_mb_per_hour is None
+    assert "RSS unavailable" in verdict.failures[0]
+
+
+def test_p99_drift_fails():
+    verdict = analyse(make_samples(p99_end=30.0), SoakConfig(max_p99_drift=0.5))
+    assert not verdict.passed
+    assert verdict.p99_drift > 0.5
+
+
+def test_short_run_is_not_a_pass():
+    verdict = analyse(make_samples()[:1], SoakConfig())
+    assert not verdict.passed
+
+
+def test_headless_run_samples_on_simulated_time():
+    soak = SoakConfig(hours=60 / 3600, nominal_fps=10, sample_every_s=10)
+    hands = FakeBackend()
+    with SoakMonitor(soak) as monitor:
+        run_headless(SyntheticSource(160, 120), AppConfig(), monitor, hands=hands)
+    assert monitor.frames == 600
+    assert hands.calls == 600
+    assert [s.sim_s for s in monitor.samples] == [10, 20, 30, 40, 50, 60]
+    assert all(s.rss_mb > 0 and s.objects > 0 for s in monitor.samples)
@@ -0,0 +1,97 @@
+"""
+Unit tests for the asynchronous speech queue.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from config_loader import SpeechConfig
+from speech_output import SpeechEngine, SpeechQueue, StubEngine, create_engine
+
+
+class SlowEngine(StubEngine):
+    """Stub whose playback blocks until released, like a real voice."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def play(self, audio: bytes) -> None:
+        self.release.wait(5)
+        super().play(audio)
+
+
+def test_say_plays_on_worker_thread_and_caches_audio():
+    engine = StubEngine()
+    speech = SpeechQueue(engine, cache_size=8)
+    speech.start()
+    speech.say("Hello!")
+    speech.say("Hello!")
+    assert speech.wait_idle(5)
+    speech.stop()
+
+    assert len(engine.played) == 2
+    assert engine.synthesized == ["Hello!"]
+    assert (speech.cache_hits, speech.cache_misses) == (1, 1)
+
+
+def test_say_never_blocks_and_drops_when_backlogged():
+    engine = SlowEngine()
+    speech = SpeechQueue(engine, queue_size=2)
+    speech.start()
+
+    start = time.perf_counter()
+    results = [speech.say(f"phrase {i}") for i in range(10)]
+    assert time.perf_counter() - start < 0.05
+    assert results.count(False) >= 7
+    assert speech.dropped == results.count(False)
+
+    engine.release.set()
+    assert speech.wait_idle(5)
+    speech.stop()
+    assert len(engine.played) == results.count(True)
+
+
+def test_prewarm_fills_cache_without_counting_misses():
+    engine = StubEngine()
+    speech = SpeechQueue(engine, cache_size=2)
+    speech.start()
+    speech.prewarm(["Hello", "Yes", "Hello", "Goodbye"])
+    assert speech.wait_idle(5)
+    assert speech.cached("Hello") and speech.cached("Yes")
+    assert not speech.cached("Goodbye")  # beyond the cache size
+
+    speech.say("Yes")
+    assert speech.wait_idle(5)
+    speech.stop()
+    assert engine.synthesized == ["Hello", "Yes"]
+    assert (speech.cache_hits, speech.cache_misses) == (1, 0)
+
+
+def test_cache_evicts_least_recently_used():
+    engine = StubEngine()
+    speech = SpeechQueue(engine, cache_size=2)
+    speech.start()
+    for text in ["a", "b", "a", "c"]:
+        speech.say(text)
+    assert speech.wait_idle(5)
+    speech.stop()
+    assert speech.cached("a") and speech.cached("c")
+    assert not speech.cached("b")
+
+
+def test_stub_engine_requested_explicitly():
+    assert isinstance(create_engine(SpeechConfig(engine="stub")), StubEngine)
+
+
+def test_incomplete_engine_fails_when_created():
+    class SilentEngine(SpeechEngine):
+        def synthesize(self, _text: str) -> bytes:
+            return b""
+
+    with pytest.raises(TypeError):
+        SilentEngine()
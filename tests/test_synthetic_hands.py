@@ -0,0 +1,72 @@
+"""
+Randomised checks of recognize_gesture() against synthetic hands.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from gesture_rules import recognize_gesture
+from synthetic_hands import GESTURES, HandSpec, generate_batch, stream_batches
+
+# Gestures whose rules only use distances and vertical order, so they do not
+# depend on which hand signs them.
+MIRROR_SAFE = ("Hello", "Goodbye", "Please", "Thank You")
+
+
+def agreement(batch) -> float:
+    hands = batch.all_landmarks()
+    hits = sum(
+        recognize_gesture(hand) == GESTURES[label]
+        for hand, label in zip(hands, batch.labels, strict=True)
+    )
+    return hits / len(batch)
+
+
+@pytest.mark.parametrize("gesture", GESTURES)
+def test_canonical_pose_is_recognised(gesture):
+    batch = generate_batch(200, [gesture], HandSpec(scale=(0.8, 1.3)), seed=0)
+    assert agreement(batch) == 1.0
+
+
+def test_batch_shape_range_and_determinism():
+    spec = HandSpec(noise=0.002, rotation=0.3, handedness="both", pose_jitter=0.05)
+    a = generate_batch(1000, spec=spec, seed=42)
+    b = generate_batch(1000, spec=spec, seed=42)
+    assert a.points.shape == (1000, 21, 3)
+    assert a.points.dtype == np.float32
+    assert np.array_equal(a.points, b.points)
+    assert np.array_equal(a.labels, b.labels)
+    assert 0.3 < a.left.mean() < 0.7
+    xy = a.points[:, :, :2]
+    assert xy.min() > -0.02 and xy.max() < 1.02  # inside the frame, up to noise
+
+
+def test_stream_batches_covers_total_in_chunks():
+    sizes = [len(batch) for batch in stream_batches(2500, chunk_size=1000, seed=0)]
+    assert sizes == [1000, 1000, 500]
+
+
+def test_realistic_variation_keeps_high_agreement():
+    spec = HandSpec(noise=0.002, rotation=0.15, scale=(0.8, 1.3), pose_jitter=0.04)
+    assert agreement(generate_batch(5000, spec=spec, seed=1)) > 0.95
+
+
+def test_translation_does_not_change_the_label():
+    batch = generate_batch(500, spec=HandSpec(noise=0.003), seed=2)
+    original = [recognize_gesture(hand) for hand in batch.all_landmarks()]
+    batch.points[:, :, :2] += np.float32(0.01)
+    shifted = [recognize_gesture(hand) for hand in batch.all_landmarks()]
+    assert original == shifted
+
+
+def test_mirror_safe_gestures_work_for_left_hands():
+    batch = generate_batch(1000, MIRROR_SAFE, HandSpec(handedness="left"), seed=3)
+    assert agreement(batch) == 1.0
+
+
+def test_yes_rule_assumes_a_right_hand():
+    """Documents a rule limitation: `thumb.x < index.x` fails for left hands."""
+    batch = generate_batch(100, ["Yes"], HandSpec(handedness="left"), seed=4)
+    assert agreement(batch) == 0.0